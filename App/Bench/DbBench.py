@@ -0,0 +1,121 @@
+"""
+数据库基准
+模拟并发消息分发时的数据库访问：若干协程同时循环执行与 DbAdminServer 相同的查询和写入（每次写入单独提交），对比:
+- 原方式: 默认日志模式（DELETE）和同步级别（FULL），读写共用一个连接（近似原 AsyncDbManager）
+- 调优后: [DbConfig] 缺省值，WAL + synchronous=NORMAL + mmap，独立写连接 + 只读连接池，预编译语句缓存
+输出每秒完成的读/写次数和单次操作延迟。每种方式使用临时目录中的新数据库文件。
+
+用法（在 App 目录下运行）:
+    python -m Bench.DbBench --tasks 16 --seconds 3 --write-ratio 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from statistics import quantiles
+from typing import Dict, List
+
+from DbServer.DbDomServer import AsyncDbManager, DEFAULT_DB_CONFIG
+
+GROUPS = 200
+PLUGINS = 20
+MODES = {
+    "legacy": ("原方式", dict(DEFAULT_DB_CONFIG, journal_mode="DELETE", synchronous="FULL", mmap_size=0,
+                               cache_size=-2000, read_connections=0, cached_statements=128)),
+    "tuned": ("调优后", DEFAULT_DB_CONFIG),
+}
+
+
+async def prepare(manager: AsyncDbManager, db_path: str) -> None:
+    async with manager.get_connection(db_path) as conn:
+        await conn.execute("""CREATE TABLE IF NOT EXISTS admin
+            (id INTEGER PRIMARY KEY AUTOINCREMENT, wxid TEXT NOT NULL UNIQUE, group_id TEXT NOT NULL)""")
+        await conn.execute("""CREATE TABLE IF NOT EXISTS group_mode
+            (id INTEGER PRIMARY KEY AUTOINCREMENT, group_id TEXT NOT NULL UNIQUE, mode INTEGER NOT NULL DEFAULT 0)""")
+        await conn.execute("""CREATE TABLE IF NOT EXISTS plugin_config
+            (mode TEXT NOT NULL, plugin_name TEXT NOT NULL, enabled INTEGER NOT NULL DEFAULT 1,
+            UNIQUE(mode, plugin_name))""")
+        await conn.executemany("INSERT INTO admin (group_id, wxid) VALUES (?, ?)",
+                               [(f"{i}@chatroom", f"wxid_admin{i}") for i in range(GROUPS)])
+        await conn.executemany("INSERT INTO group_mode (group_id, mode) VALUES (?, ?)",
+                               [(f"{i}@chatroom", "custom") for i in range(GROUPS)])
+        await conn.executemany("INSERT INTO plugin_config (mode, plugin_name, enabled) VALUES (?, ?, ?)",
+                               [("custom", f"Plugin{i}", 1) for i in range(PLUGINS)])
+        await conn.commit()
+
+
+async def read_once(manager: AsyncDbManager, db_path: str, rng: random.Random) -> None:
+    """一条群消息的查询：群组模式、发送者是否为管理员、插件配置"""
+    group_id = f"{rng.randrange(GROUPS)}@chatroom"
+    async with manager.get_reader(db_path) as conn:
+        async with conn.execute("SELECT mode FROM group_mode WHERE group_id=?", (group_id,)) as cursor:
+            await cursor.fetchone()
+        async with conn.execute("SELECT 1 FROM admin WHERE group_id=? AND wxid=?",
+                                (group_id, f"wxid_user{rng.randrange(1000)}")) as cursor:
+            await cursor.fetchone()
+        async with conn.execute("SELECT enabled FROM plugin_config WHERE mode=? AND plugin_name=?",
+                                ("custom", f"Plugin{rng.randrange(PLUGINS)}")) as cursor:
+            await cursor.fetchone()
+
+
+async def write_once(manager: AsyncDbManager, db_path: str, rng: random.Random) -> None:
+    """一次写入并提交，与 DbAdminServer.set_plugin_config 相同"""
+    enabled = rng.random() < 0.5
+    async with manager.get_connection(db_path) as conn:
+        await conn.execute(
+            """INSERT INTO plugin_config (mode, plugin_name, enabled) VALUES (?, ?, ?)
+            ON CONFLICT(mode, plugin_name) DO UPDATE SET enabled = ?""",
+            ("custom", f"Plugin{rng.randrange(PLUGINS)}", enabled, enabled)
+        )
+        await conn.commit()
+
+
+async def run_mode(config: Dict, tasks: int, seconds: float, write_ratio: float) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        manager = AsyncDbManager(config)
+        await prepare(manager, db_path)
+        latencies: Dict[str, List[float]] = {"read": [], "write": []}
+        deadline = time.perf_counter() + seconds
+
+        async def worker(seed: int):
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                kind = "write" if rng.random() < write_ratio else "read"
+                start = time.perf_counter()
+                await (write_once if kind == "write" else read_once)(manager, db_path, rng)
+                latencies[kind].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(tasks)))
+        elapsed = time.perf_counter() - start
+        await manager.close_all()
+
+    result = {"elapsed": elapsed}
+    for kind, values in latencies.items():
+        result[f"{kind}_ops"] = len(values) / elapsed
+        result[f"{kind}_p50_ms"] = quantiles(values, n=100)[49] * 1000 if len(values) > 1 else 0.0
+        result[f"{kind}_p99_ms"] = quantiles(values, n=100)[98] * 1000 if len(values) > 1 else 0.0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库基准")
+    parser.add_argument("--tasks", type=int, default=16, help="并发协程数（对应 [DispatchConfig] workers）")
+    parser.add_argument("--seconds", type=float, default=3, help="每种方式运行的秒数")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="写入占全部操作的比例")
+    args = parser.parse_args()
+
+    print(f"并发 {args.tasks}，写入比例 {args.write_ratio:.0%}，每种方式 {args.seconds:g} 秒")
+    print(f"{'方式':<8}{'总计(次/秒)':>12}{'读(次/秒)':>12}{'写(次/秒)':>12}"
+          f"{'读 p50/p99(ms)':>18}{'写 p50/p99(ms)':>18}")
+    for label, config in MODES.values():
+        r = asyncio.run(run_mode(config, args.tasks, args.seconds, args.write_ratio))
+        print(f"{label:<8}{r['read_ops'] + r['write_ops']:>12.0f}{r['read_ops']:>12.0f}{r['write_ops']:>12.0f}"
+              f"{r['read_p50_ms']:>9.2f}/{r['read_p99_ms']:<8.2f}{r['write_p50_ms']:>9.2f}/{r['write_p99_ms']:<8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+消息解码基准
+对比原来的 json.loads + WxMsg 与 Core.MsgDecoder 各解码方式的每条消息 CPU 耗时。
+
+用法（在 App 目录下运行）:
+    python -m Bench.DecodeBench Config/traffic.gz     # 使用 TrafficRecorder 录制的消息
+    python -m Bench.DecodeBench                       # 使用合成消息
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+from Core.msg import WxMsg
+from Core.MsgDecoder import MsgDecoder, msgspec, orjson
+from Bench.MsgBench import SELF_WXID, synthetic_payloads, touch_dispatch_fields
+
+
+def load_frames(path: str, count: int) -> List[bytes]:
+    """读取原始消息（UTF-8 字节，与 WS 收到的帧一致）"""
+    if path:
+        from Core.TrafficRecorder import read_traffic
+        return [message.encode("utf-8") for _, message in read_traffic(path)]
+    return [json.dumps(p, ensure_ascii=False).encode("utf-8") for p in synthetic_payloads(count)]
+
+
+def cpu_per_frame(decode: Callable, frames: List[bytes]) -> float:
+    """每条消息的 CPU 耗时（微秒），解码失败的帧按原路径的异常处理计入"""
+    gc.collect()
+    start = time.process_time()
+    for frame in frames:
+        try:
+            touch_dispatch_fields(decode(frame))
+        except (ValueError, AttributeError):
+            pass
+    return (time.process_time() - start) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="消息解码基准")
+    parser.add_argument("path", nargs="?", default="", help="TrafficRecorder 录制的文件，默认使用合成消息")
+    parser.add_argument("--count", type=int, default=50000, help="合成消息数量")
+    parser.add_argument("--rounds", type=int, default=5, help="计时轮数，取最优")
+    args = parser.parse_args()
+
+    frames = load_frames(args.path, args.count)
+    if not frames:
+        print("没有可用的消息")
+        sys.exit(1)
+
+    candidates: Dict[str, Callable] = {"json.loads + WxMsg": lambda raw: WxMsg(json.loads(raw), SELF_WXID)}
+    available = [("msgspec", msgspec), ("orjson", orjson), ("json", json)]
+    decoders = {}
+    for backend, module in available:
+        if module is None:
+            print(f"{backend} 未安装，跳过")
+            continue
+        decoder = MsgDecoder(SELF_WXID, backend)
+        decoders[backend] = decoder
+        candidates[f"MsgDecoder({backend})"] = decoder.decode
+
+    # 各实现交替测量多轮取最优，减少机器负载波动的影响
+    best = {name: float("inf") for name in candidates}
+    for _ in range(args.rounds):
+        for name, decode in candidates.items():
+            best[name] = min(best[name], cpu_per_frame(decode, frames))
+
+    baseline = best["json.loads + WxMsg"]
+    print(f"消息数: {len(frames)}")
+    for name, cost in best.items():
+        print(f"{name:<22}{cost:>10.2f} us/条  {(1 - cost / baseline) * 100:>6.1f}%")
+    if "msgspec" in decoders and decoders["msgspec"].fallbacks:
+        print(f"msgspec 结构校验失败回退次数: {decoders['msgspec'].fallbacks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+本地模拟 Wxapi 服务
+纯 Python 实现机器人用到的协议接口，用于在一台 Linux 机器上对完整机器人做端到端压测：
+- /ws/{wxid}: 按设定速率推送合成的群聊/私聊消息
+- /api/Msg/*、/api/Group/*、/api/Friend/*、/api/Tools/*、/api/Login/*: 返回与 Wxapi 结构一致的成功响应
+- 可配置接口延迟、错误率和限流，记录所有出站调用
+
+用法（在 App 目录下运行，端口与 Config/Login.toml 中的 DPBotPort 保持一致）:
+    python -m Bench.FakeWxapi --wxid wxid_bot --rate 50 --latency 20 --error-rate 0.01 --rate-limit 100
+然后正常启动机器人（python main.py，登录选项选择“跳过登录”）
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web, WSMsgType
+
+# 合成消息默认使用的文本，包含常见插件指令和普通聊天
+DEFAULT_WORDS = [
+    '签到', '菜单', '热搜', '点歌 晴天', '舔狗日记', '美女图片', '看腿',
+    '哈哈哈', '在吗', '今天吃什么', '收到', '好的', '+1', '明天见',
+]
+
+
+class TokenBucket:
+    """简单令牌桶，用于模拟协议服务限流"""
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class TrafficGenerator:
+    """合成入站消息，格式与 Wxapi WebSocket 推送一致"""
+    def __init__(self, self_wxid: str, rooms: int = 20, senders: int = 200,
+                 private_ratio: float = 0.1, words: Optional[List[str]] = None):
+        self.self_wxid = self_wxid
+        self.rooms = [f"{4000000000 + i}@chatroom" for i in range(max(1, rooms))]
+        self.senders = [f"wxid_fake{i:05d}" for i in range(max(1, senders))]
+        self.private_ratio = private_ratio
+        self.words = words or DEFAULT_WORDS
+        self._seq = int(time.time() * 1000)
+
+    def next_message(self) -> Dict[str, Any]:
+        """生成一条消息（已包装为 {"data": ...}）"""
+        self._seq += 1
+        sender = random.choice(self.senders)
+        text = random.choice(self.words)
+        if random.random() < self.private_ratio:
+            from_user, content, source = sender, text, ""
+        else:
+            from_user = random.choice(self.rooms)
+            content = f"{sender}:\n{text}"
+            source = "<msgsource>\n\t<atuserlist></atuserlist>\n\t<membercount>500</membercount>\n</msgsource>\n"
+        return {"data": {
+            "MsgId": self._seq % 2 ** 31,
+            "FromUserName": {"string": from_user},
+            "ToUserName": {"string": self.self_wxid},
+            "MsgType": 1,
+            "Content": {"string": content},
+            "Status": 3,
+            "ImgStatus": 1,
+            "ImgBuf": {"iLen": 0},
+            "CreateTime": int(time.time()),
+            "MsgSource": source,
+            "PushContent": "",
+            "NewMsgId": self._seq * 1000 + random.randint(0, 999),
+            "MsgSeq": self._seq % 2 ** 31,
+        }}
+
+
+class FakeWxapi:
+    """模拟 Wxapi 服务"""
+    def __init__(self, self_wxid: str, rate: float = 10, latency: float = 0, jitter: float = 0,
+                 error_rate: float = 0, rate_limit: float = 0, record_path: str = "",
+                 generator: Optional[TrafficGenerator] = None):
+        """
+        Args:
+            self_wxid: 模拟的机器人wxid
+            rate: 每个WebSocket连接每秒推送的消息数，0 表示不推送
+            latency: 接口固定延迟（毫秒）
+            jitter: 接口随机延迟上限（毫秒）
+            error_rate: 接口返回 500 错误的概率
+            rate_limit: 接口每秒请求上限，0 表示不限流，超出返回 429
+            record_path: 出站调用记录文件（JSON Lines），为空则只在内存中计数
+            generator: 合成消息生成器
+        """
+        self.self_wxid = self_wxid
+        self.rate = rate
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit) if rate_limit > 0 else None
+        self.generator = generator or TrafficGenerator(self_wxid)
+        self._record_file = open(record_path, mode='a', encoding='UTF-8', buffering=1) if record_path else None
+        self.calls: Counter = Counter()
+        self.errors = 0
+        self.limited = 0
+        self.pushed = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/", self.handle_index)
+        app.router.add_get("/ws/{wxid}", self.handle_ws)
+        app.router.add_get("/__stats", self.handle_stats)
+        for group in ("Msg", "Group", "Friend", "Tools", "Login"):
+            app.router.add_post(f"/api/{group}/{{action}}", self.handle_api)
+            app.router.add_post(f"/api//{group}/{{action}}", self.handle_api)  # LoginApi 的路径带前导斜杠
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        if self._record_file:
+            self._record_file.close()
+
+    async def handle_index(self, request: web.Request) -> web.Response:
+        return web.Response(text="FakeWxapi")
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "pushed": self.pushed,
+            "calls": dict(self.calls),
+            "errors": self.errors,
+            "limited": self.limited,
+        })
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """按设定速率推送合成消息"""
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        interval = 1 / self.rate if self.rate > 0 else None
+
+        async def pump():
+            next_at = time.perf_counter()
+            while not ws.closed and interval:
+                message = self.generator.next_message()
+                await ws.send_str(json.dumps(message, ensure_ascii=False))
+                self.pushed += 1
+                next_at += interval
+                await asyncio.sleep(max(0, next_at - time.perf_counter()))
+
+        task = asyncio.create_task(pump())
+        try:
+            async for frame in ws:
+                if frame.type == WSMsgType.ERROR:
+                    break
+        finally:
+            task.cancel()
+        return ws
+
+    async def handle_api(self, request: web.Request) -> web.Response:
+        """统一处理协议接口调用"""
+        group = request.path.strip("/").split("/")[-2]
+        action = request.match_info["action"]
+        path = f"{group}/{action}"
+        try:
+            body = await request.json()
+        except Exception:
+            body = {}
+        self.calls[path] += 1
+        if self._record_file:
+            self._record_file.write(json.dumps({"time": time.time(), "path": path, "body": body},
+                                               ensure_ascii=False) + "\n")
+
+        if self.bucket and not self.bucket.take():
+            self.limited += 1
+            return web.json_response({"Code": -13, "Success": False, "Message": "请求过于频繁"}, status=429)
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"Code": -1, "Success": False, "Message": "模拟错误"}, status=500)
+
+        return web.json_response({"Code": 0, "Success": True, "Message": "", "Data": self._response_data(path, body)})
+
+    def _response_data(self, path: str, body: Dict[str, Any]) -> Any:
+        """按接口返回与 Wxapi 结构一致的数据"""
+        if path == "Msg/Sync":
+            return {"AddMsgs": [], "ContinueFlag": 0}  # 消息全部通过WS实时推送，补收时没有积压
+        if path == "Friend/GetContractDetail":
+            wxid = body.get("Towxids") or body.get("Towxid") or ""
+            return {"ContactList": [{
+                "UserName": {"string": wxid},
+                "NickName": {"string": f"昵称_{str(wxid)[-5:]}"},
+                "BigHeadImgUrl": "http://127.0.0.1/head.jpg",
+            }]}
+        if path.startswith("Group/"):
+            return {"ChatRoomName": body.get("QID", ""), "NewChatroomData": {"ChatRoomMember": []}}
+        if path.startswith("Tools/Download") or path == "Tools/CdnDownloadImage":
+            return {"Image": "", "data": {"buffer": ""}}
+        if path == "Msg/UploadImg" or path.startswith("Msg/Send"):
+            return {"MsgId": random.randint(1, 2 ** 31), "NewMsgId": random.randint(1, 2 ** 62)}
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 Wxapi 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8059)
+    parser.add_argument("--wxid", default="wxid_bot", help="模拟的机器人wxid，需与 Login.toml 中的 selfWxid 一致")
+    parser.add_argument("--rate", type=float, default=10, help="每秒推送的消息数，0 表示不推送")
+    parser.add_argument("--rooms", type=int, default=20, help="合成消息涉及的群数量")
+    parser.add_argument("--senders", type=int, default=200, help="合成消息涉及的发送者数量")
+    parser.add_argument("--private-ratio", type=float, default=0.1, help="私聊消息比例")
+    parser.add_argument("--latency", type=float, default=0, help="接口固定延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="接口随机延迟上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="接口返回错误的概率")
+    parser.add_argument("--rate-limit", type=float, default=0, help="接口每秒请求上限，0 表示不限流")
+    parser.add_argument("--record", default="", help="出站调用记录文件（JSON Lines）")
+    args = parser.parse_args()
+
+    generator = TrafficGenerator(args.wxid, rooms=args.rooms, senders=args.senders,
+                                 private_ratio=args.private_ratio)
+    fake = FakeWxapi(args.wxid, rate=args.rate, latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, rate_limit=args.rate_limit,
+                     record_path=args.record, generator=generator)
+    print(f"FakeWxapi 监听 http://{args.host}:{args.port}，统计信息: http://{args.host}:{args.port}/__stats")
+    web.run_app(fake.build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
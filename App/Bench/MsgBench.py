@@ -0,0 +1,170 @@
+"""
+WxMsg 构造微基准
+对比重构前的即时计算实现（LegacyWxMsg，每条消息在构造时计算全部派生字段并存入 __dict__）
+与当前 __slots__ + 按需计算的 WxMsg，输出每条消息的耗时和内存占用。
+
+用法（在 App 目录下运行）:
+    python -m Bench.MsgBench                       # 使用合成消息
+    python -m Bench.MsgBench Config/traffic.gz     # 使用 TrafficRecorder 录制的消息
+"""
+import argparse
+import gc
+import json
+import re
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from Core.msg import WxMsg
+
+SELF_WXID = "wxid_bot"
+
+
+class LegacyWxMsg:
+    """重构前的 WxMsg 构造逻辑，仅用于对比"""
+
+    def __init__(self, Msg: Dict[str, Any], self_wxid: str):
+        msg = Msg.get("data", "")
+        self.id = msg.get("MsgId")
+        self.from_user_name = msg.get("FromUserName", {}).get("string", "")
+        self.to_user_name = msg.get("ToUserName", {}).get("string", "")
+        self.type = msg.get("MsgType")
+        self._raw_content = msg.get("Content", {}).get("string", "")
+        self._is_group = "@chatroom" in self.from_user_name or "@chatroom" in self.to_user_name
+        self.content = self._process_content()
+        self.status = msg.get("Status")
+        self.img_status = msg.get("ImgStatus")
+        self.img_buf = msg.get("ImgBuf", {}).get("iLen", 0)
+        self.create_time = msg.get("CreateTime")
+        self.msg_source = msg.get("MsgSource", "")
+        self.push_content = msg.get("PushContent", "")
+        self.new_id = msg.get("NewMsgId")
+        self.msg_seq = msg.get("MsgSeq")
+        self.self_wxid = self_wxid
+        self._parsed_msg_source = None
+        self.roomid = self.from_user_name if "@chatroom" in self.from_user_name else self.to_user_name if "@chatroom" in self.to_user_name else None
+        self.sender = self._determine_sender()
+        self.atusers = self._determine_atusers()
+        self.noAtMsg = re.sub(r'@[^ \n\u2005]+[ \n\u2005]*', '', self.content).strip()
+        self.is_private = not self._is_group and self.from_user_name != self.self_wxid
+
+    def _process_content(self) -> str:
+        content = self._raw_content.strip()
+        if self._is_group:
+            if ':' in content:
+                _, sep, text = content.partition(':')
+            elif '：' in content:
+                _, sep, text = content.partition('：')
+            else:
+                return content
+            return text.strip() if sep else content
+        return content.split("\n", 1)[-1].strip() if "\n" in content else content
+
+    def _determine_atusers(self) -> List[str]:
+        if not self._is_group or not self.msg_source:
+            return []
+        match = re.search(r"<atuserlist><!\[CDATA\[(.*?)\]\]></atuserlist>", self.msg_source)
+        if not match:
+            match = re.search(r"<atuserlist>(.*?)</atuserlist>", self.msg_source)
+        return [user for user in match.group(1).split(",") if user] if match and match.group(1) else []
+
+    def _determine_sender(self):
+        if self.from_user_name == self.self_wxid:
+            return self.self_wxid
+        if not self._is_group:
+            return self.from_user_name
+        if self._raw_content and "\n" in self._raw_content:
+            first_line = self._raw_content.split("\n")[0]
+            if first_line.endswith(":"):
+                return first_line[:-1]
+        return None
+
+
+def synthetic_payloads(count: int) -> List[Dict[str, Any]]:
+    """生成合成消息，群聊为主，夹杂私聊和@消息"""
+    payloads = []
+    for i in range(count):
+        sender = f"wxid_fake{i % 200:05d}"
+        if i % 10 == 0:
+            from_user, content, source = sender, "你好", ""
+        else:
+            from_user = f"{4000000000 + i % 20}@chatroom"
+            at = "@大鹏 " if i % 7 == 0 else ""
+            content = f"{sender}:\n{at}今天天气不错 {i}"
+            atlist = SELF_WXID if at else ""
+            source = f"<msgsource>\n\t<atuserlist>{atlist}</atuserlist>\n\t<membercount>500</membercount>\n</msgsource>\n"
+        payloads.append({"data": {
+            "MsgId": i, "FromUserName": {"string": from_user}, "ToUserName": {"string": SELF_WXID},
+            "MsgType": 1, "Content": {"string": content}, "Status": 3, "ImgStatus": 1,
+            "ImgBuf": {"iLen": 0}, "CreateTime": 1743690816 + i, "MsgSource": source,
+            "PushContent": "", "NewMsgId": 10 ** 18 + i, "MsgSeq": i,
+        }})
+    return payloads
+
+
+def recorded_payloads(path: str) -> List[Dict[str, Any]]:
+    """读取录制的原始消息"""
+    from Core.TrafficRecorder import read_traffic
+    payloads = []
+    for _, message in read_traffic(path):
+        try:
+            payloads.append(json.loads(message))
+        except json.JSONDecodeError:
+            continue
+    return payloads
+
+
+def touch_dispatch_fields(msg) -> None:
+    """模拟 MessageHandler/PluginManager 对每条消息都会访问的字段"""
+    msg.sender, msg.roomid, msg.type, msg.is_private
+
+
+def measure(cls: Callable, payloads: List[Dict[str, Any]], rounds: int) -> Dict[str, float]:
+    """测量构造耗时（取多轮最优）和每条消息的内存占用"""
+    best = float("inf")
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        for payload in payloads:
+            touch_dispatch_fields(cls(payload, SELF_WXID))
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [cls(payload, SELF_WXID) for payload in payloads]
+    for msg in kept:
+        touch_dispatch_fields(msg)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "us_per_msg": best / len(payloads) * 1e6,
+        "bytes_per_msg": (after - before) / len(payloads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WxMsg 构造微基准")
+    parser.add_argument("path", nargs="?", default="", help="TrafficRecorder 录制的文件，默认使用合成消息")
+    parser.add_argument("--count", type=int, default=50000, help="合成消息数量")
+    parser.add_argument("--rounds", type=int, default=5, help="计时轮数，取最优")
+    args = parser.parse_args()
+
+    payloads = recorded_payloads(args.path) if args.path else synthetic_payloads(args.count)
+    if not payloads:
+        print("没有可用的消息")
+        sys.exit(1)
+
+    legacy = measure(LegacyWxMsg, payloads, args.rounds)
+    current = measure(WxMsg, payloads, args.rounds)
+    print(f"消息数: {len(payloads)}")
+    print(f"{'实现':<12}{'耗时(us/条)':>14}{'内存(B/条)':>14}")
+    print(f"{'LegacyWxMsg':<12}{legacy['us_per_msg']:>14.2f}{legacy['bytes_per_msg']:>14.0f}")
+    print(f"{'WxMsg':<12}{current['us_per_msg']:>14.2f}{current['bytes_per_msg']:>14.0f}")
+    print(f"耗时降低 {(1 - current['us_per_msg'] / legacy['us_per_msg']) * 100:.1f}%，"
+          f"内存降低 {(1 - current['bytes_per_msg'] / legacy['bytes_per_msg']) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+原始消息回放压测
+把 TrafficRecorder 录制的原始消息按原始节奏（或加速/不限速）喂给 MessageHandler，
+发送侧（sendPostReq）被替换为本地桩函数，不会向微信发出任何消息。
+
+用法（在 App 目录下运行）:
+    python -m Bench.ReplayBench Config/traffic.gz              # 1倍速回放
+    python -m Bench.ReplayBench Config/traffic.gz --speed 10   # 10倍速
+    python -m Bench.ReplayBench Config/traffic.gz --speed 0    # 不限速
+"""
+import argparse
+import asyncio
+import importlib
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import Config.ConfigServer as Cs
+from Config.logger import logger
+from Core.TrafficRecorder import read_traffic
+
+# 当前正在处理的消息的 [接收时间, 是否已发送过]，由分发时的 handler 设置，插件内的发送调用读取
+_ingest: ContextVar[Optional[list]] = ContextVar("replay_ingest", default=None)
+
+
+def stub_send_side(sends: List[float], latencies: List[float]) -> None:
+    """
+    把所有协议接口模块中的 sendPostReq 替换为本地桩函数，记录每次调用的时间，
+    并在每条消息第一次发送时记录接收→发送延迟
+    """
+    async def fake_send_post_req(reqPath: str, data: Dict[str, Any], timeout: int = 30) -> Dict[str, Any]:
+        now = time.perf_counter()
+        sends.append(now)
+        record = _ingest.get()
+        if record is not None and not record[1]:
+            record[1] = True
+            latencies.append(now - record[0])
+        return {"Code": 0, "Success": True, "Message": "", "Data": {}}
+
+    for name, module in list(sys.modules.items()):
+        if name.startswith("WeChatApi") and hasattr(module, "sendPostReq"):
+            module.sendPostReq = fake_send_post_req
+
+
+def stub_upstream() -> None:
+    """插件的第三方接口请求直接返回失败，避免压测时访问外网"""
+    from Plugins._Tools.Tool import Tool
+
+    async def fake_request(self, *args, **kwargs):
+        return None
+
+    Tool.async_get = fake_request
+    Tool.async_post = fake_request
+
+
+def override_self_wxid(wxid: str) -> None:
+    """回放别的账号录制的消息时，覆盖登录配置中的机器人wxid"""
+    original = Cs.returnLoginData
+
+    def patched():
+        data = original()
+        data.setdefault('DPBotConfig', {})['selfWxid'] = wxid
+        return data
+
+    Cs.returnLoginData = patched
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """返回进程峰值常驻内存（MB）"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为KB，macOS 为字节
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024 / 1024
+        except Exception:
+            return None
+
+
+async def replay(path: str, speed: float, drain_timeout: float, live_upstream: bool) -> Dict[str, Any]:
+    """回放录制文件并统计吞吐、延迟和内存"""
+    importlib.import_module("WeChatApi")  # 先导入协议接口模块，再替换其中的 sendPostReq
+    sends: List[float] = []
+    latencies: List[float] = []
+    stub_send_side(sends, latencies)
+    if not live_upstream:
+        stub_upstream()
+
+    from Core.MessageHandler import MessageHandler
+    from Core.MsgDeduplicator import MsgDeduplicator
+
+    frames = list(read_traffic(path))  # 提前读入内存，避免读文件影响回放节奏
+    if not frames:
+        raise ValueError(f"录制文件中没有消息: {path}")
+
+    handler = MessageHandler()
+    if not await handler.wait_for_initialized():
+        raise RuntimeError("MessageHandler 初始化失败")
+    # 录制的都是历史消息，回放时不能按启动时间过滤，也不能复用线上的去重记录
+    handler.skip_history_messages = False
+    handler.envelope_filter.skip_history = False
+    handler.envelope_filter.deduplicator = MsgDeduplicator(max_size=len(frames) + 1, window=0)
+    handler.recorder = None
+
+    # 记录每条消息的接收时间，处理时放进 _ingest，插件第一次调用发送接口时计算延迟
+    dispatcher = handler.dispatcher
+    ingest_at: Dict[int, float] = {}
+    handled = [0]
+    current_ingest = [0.0]
+    original_submit = dispatcher.submit
+    original_handler = dispatcher.handler
+
+    async def timed_submit(msg):
+        ingest_at[id(msg)] = current_ingest[0]
+        return await original_submit(msg)
+
+    async def timed_handler(msg):
+        started = ingest_at.pop(id(msg), None)
+        token = _ingest.set([started, False] if started is not None else None)
+        try:
+            result = await original_handler(msg)
+        finally:
+            _ingest.reset(token)
+        if result:
+            handled[0] += 1
+        return result
+
+    dispatcher.submit = timed_submit
+    dispatcher.handler = timed_handler
+    dispatcher.start()
+    # 执行插件的 on_load 和预热，与正常启动一致；回放期间不监视插件目录
+    handler.plugin_manager._reload_config = {}
+    await handler.plugin_manager.start()
+
+    first_arrival = frames[0][0]
+    start = time.perf_counter()
+    for arrival, message in frames:
+        if speed > 0:
+            delay = start + (arrival - first_arrival) / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        current_ingest[0] = time.perf_counter()
+        await handler.handle_message(message)
+    feed_elapsed = time.perf_counter() - start
+
+    # 等待队列中的消息处理完
+    deadline = time.perf_counter() + drain_timeout
+    while (dispatcher.queued or dispatcher.running) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "frames": len(frames),
+        "feed_seconds": feed_elapsed,
+        "total_seconds": elapsed,
+        "frames_per_second": len(frames) / elapsed if elapsed else 0,
+        "handled": handled[0],
+        "replied": len(latencies),
+        "sends": len(sends),
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p95_ms": percentile(latencies, 95),
+        "latency_p99_ms": percentile(latencies, 99),
+        "peak_rss_mb": peak_rss_mb(),
+        "envelope": handler.envelope_filter.stats(),
+        "dispatch": dispatcher.stats(),
+    }
+    for key in ("latency_p50_ms", "latency_p95_ms", "latency_p99_ms"):
+        if report[key] is not None:
+            report[key] *= 1000
+
+    await handler.close()
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """打印压测报告"""
+    def fmt(value):
+        return "N/A" if value is None else (f"{value:.2f}" if isinstance(value, float) else str(value))
+
+    print("========== 回放压测报告 ==========")
+    print(f"消息总数:        {report['frames']}")
+    print(f"喂入耗时:        {fmt(report['feed_seconds'])} s")
+    print(f"总耗时:          {fmt(report['total_seconds'])} s")
+    print(f"吞吐:            {fmt(report['frames_per_second'])} 条/s")
+    print(f"插件处理消息数:  {report['handled']}")
+    print(f"发送接口调用数:  {report['sends']}")
+    print(f"有回复的消息数:  {report['replied']}")
+    print(f"接收→首次发送:   p50 {fmt(report['latency_p50_ms'])} ms / "
+          f"p95 {fmt(report['latency_p95_ms'])} ms / p99 {fmt(report['latency_p99_ms'])} ms")
+    print(f"峰值内存:        {fmt(report['peak_rss_mb'])} MB")
+    print(f"信封预过滤:      {report['envelope']}")
+    print(f"分发统计:        {report['dispatch']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放录制的原始消息进行压测")
+    parser.add_argument("path", help="TrafficRecorder 录制的文件路径")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速，0 表示不限速（默认 1）")
+    parser.add_argument("--wxid", default="", help="覆盖登录配置中的机器人wxid")
+    parser.add_argument("--drain-timeout", type=float, default=300, help="喂完后等待处理完成的最长时间（秒）")
+    parser.add_argument("--live-upstream", action="store_true", help="插件访问真实的第三方接口（默认直接返回失败）")
+    parser.add_argument("--quiet", action="store_true", help="只输出 WARNING 及以上级别的日志")
+    args = parser.parse_args()
+
+    if args.quiet:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+    if args.wxid:
+        override_self_wxid(args.wxid)
+
+    report = asyncio.run(replay(args.path, args.speed, args.drain_timeout, args.live_upstream))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
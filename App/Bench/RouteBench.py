@@ -0,0 +1,129 @@
+"""
+插件路由基准
+构造 N 个合成插件（每个插件若干完全匹配、前缀、包含关键词），对比:
+- 线性遍历: 原 PluginManager 的做法，每条消息依次 await 每个插件的 should_handle_message 并做关键词判断
+- 路由索引: Core.TriggerIndex 先筛出候选插件，只对候选插件做同样的判断
+输出不同插件数量下每条消息的路由耗时（不含数据库查询，实际线性遍历还要为每个插件查一次插件配置）。
+
+用法（在 App 目录下运行）:
+    python -m Bench.RouteBench --plugins 10 50 100 200
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from Core.msg import WxMsg
+from Core.PluginBase import PluginBase
+from Core.TriggerIndex import TriggerIndex
+from Plugins._Tools.JudgeTools import JudgeTools
+
+SELF_WXID = "wxid_bot"
+WORDS_PER_PLUGIN = 5
+
+
+class SyntheticPlugin(PluginBase):
+    """合成插件，判断逻辑与仓库内插件一致"""
+    def __init__(self, index: int, judge: JudgeTools):
+        super().__init__()
+        self.name = f"Synthetic{index:03d}"
+        self.judge = judge
+        self.configData = {
+            "exactWords": [f"指令{index}_{i}" for i in range(WORDS_PER_PLUGIN)],
+            "prefixWords": [f"查{index}_{i}" for i in range(WORDS_PER_PLUGIN)],
+            "containsWords": [f"site{index}x{i}.com" for i in range(WORDS_PER_PLUGIN)],
+            "Route": {"exact": ["exactWords"], "prefix": ["prefixWords"], "contains": ["containsWords"]},
+        }
+
+    def matches(self, msg) -> bool:
+        command = msg.command
+        return (self.judge.judgeEqualListWord(command, self.configData["exactWords"])
+                or self.judge.judgeSplitAllEqualWord(command, self.configData["prefixWords"])
+                or self.judge.judgeInListWord(command, self.configData["containsWords"]))
+
+    async def handle_message(self, msg) -> bool:
+        return self.matches(msg)
+
+
+def build_messages(plugin_count: int, count: int) -> List[WxMsg]:
+    """生成测试消息：约 70% 普通聊天，其余命中随机插件的各类触发词"""
+    random.seed(plugin_count)
+    messages = []
+    for i in range(count):
+        roll = random.random()
+        target = random.randrange(plugin_count)
+        if roll < 0.7:
+            text = f"今天天气不错，大家吃了吗 {i}"
+        elif roll < 0.8:
+            text = f"指令{target}_{i % WORDS_PER_PLUGIN}"
+        elif roll < 0.9:
+            text = f"查{target}_{i % WORDS_PER_PLUGIN} 参数"
+        else:
+            text = f"看看这个 https://site{target}x{i % WORDS_PER_PLUGIN}.com/v/123"
+        messages.append(WxMsg({"data": {
+            "MsgType": 1, "FromUserName": {"string": "123@chatroom"}, "ToUserName": {"string": SELF_WXID},
+            "Content": {"string": f"wxid_user:\n{text}"},
+        }}, SELF_WXID))
+    return messages
+
+
+async def linear_scan(plugins: List[SyntheticPlugin], messages: List[WxMsg]) -> int:
+    hits = 0
+    for msg in messages:
+        for plugin in plugins:
+            if not await plugin.should_handle_message(msg):
+                continue
+            if await plugin.handle_message(msg):
+                hits += 1
+                break
+    return hits
+
+
+async def indexed(router: TriggerIndex, plugins: dict, messages: List[WxMsg]) -> int:
+    hits = 0
+    for msg in messages:
+        for name in router.candidates(msg):
+            plugin = plugins[name]
+            if not await plugin.should_handle_message(msg):
+                continue
+            if await plugin.handle_message(msg):
+                hits += 1
+                break
+    return hits
+
+
+async def run(plugin_counts: List[int], count: int) -> None:
+    judge = JudgeTools()
+    print(f"{'插件数':>6}{'线性遍历(us/条)':>18}{'路由索引(us/条)':>18}")
+    for plugin_count in plugin_counts:
+        plugins = [SyntheticPlugin(i, judge) for i in range(plugin_count)]
+        router = TriggerIndex()
+        for plugin in plugins:
+            router.add_plugin(plugin.name, plugin.configData)
+        router.build()
+        by_name = {plugin.name: plugin for plugin in plugins}
+        messages = build_messages(plugin_count, count)
+
+        start = time.perf_counter()
+        linear_hits = await linear_scan(plugins, messages)
+        linear_cost = (time.perf_counter() - start) / count * 1e6
+
+        start = time.perf_counter()
+        indexed_hits = await indexed(router, by_name, messages)
+        indexed_cost = (time.perf_counter() - start) / count * 1e6
+
+        assert linear_hits == indexed_hits, f"命中数不一致: {linear_hits} != {indexed_hits}"
+        print(f"{plugin_count:>6}{linear_cost:>18.2f}{indexed_cost:>18.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="插件路由基准")
+    parser.add_argument("--plugins", type=int, nargs="+", default=[10, 50, 100, 200], help="合成插件数量")
+    parser.add_argument("--count", type=int, default=5000, help="每组测试的消息数")
+    args = parser.parse_args()
+    asyncio.run(run(args.plugins, args.count))
+
+
+if __name__ == "__main__":
+    main()
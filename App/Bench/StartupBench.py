@@ -0,0 +1,109 @@
+"""
+插件启动基准
+每种方式在独立子进程中运行，统计从进程开始到第一条路由命中的消息处理完成的耗时（首条消息耗时）
+以及此时的常驻内存峰值（RSS）:
+- 原方式:   启动时导入所有插件，并导入 cv2/numpy/pydub/pysilk/PIL（原 MessageApi 在模块顶部导入）
+- 全量加载: 启动时导入所有插件（[PluginLoadConfig] lazy = false）
+- 懒加载:   启动时只读取插件清单，第一条消息命中时才导入对应插件
+插件配置查询、管理员查询和消息发送都替换为空操作，不访问数据库和协议接口。
+
+用法（在 App 目录下运行）:
+    python -m Bench.StartupBench --rounds 3
+"""
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+from statistics import median
+
+# 原 MessageApi 在模块顶部导入的重量级依赖
+HEAVY_MODULES = ("cv2", "numpy", "pydub", "pysilk", "PIL.Image")
+MODES = {
+    "legacy": ("原方式", True, False),
+    "eager": ("全量加载", False, False),
+    "lazy": ("懒加载", False, True),
+}
+
+
+class NullApi:
+    async def sendText(self, *args, **kwargs):
+        return {}
+
+
+async def first_message(preimport: bool, lazy: bool, text: str) -> dict:
+    import importlib
+    if preimport:
+        for module in HEAVY_MODULES:
+            importlib.import_module(module)
+    from Core.PluginManager import PluginManager
+    from Core.msg import WxMsg
+
+    manager = PluginManager(NullApi(), load_config={"lazy": lazy})
+    ready = time.perf_counter() - _PROCESS_START
+
+    async def enabled(*args):
+        return True
+
+    async def not_admin(*args):
+        return False
+
+    manager.tools.judgePluginConfig = enabled
+    admin = manager.plugins.get("Admin")
+    if admin is not None:
+        admin.tools.query_admin = not_admin
+
+    msg = WxMsg({"data": {
+        "MsgType": 1, "FromUserName": {"string": "123@chatroom"}, "ToUserName": {"string": "wxid_bot"},
+        "Content": {"string": f"wxid_user:\n{text}"},
+    }}, "wxid_bot")
+    msg.mode = ("1",)
+    handled = await manager.handle_message(msg)
+    first = time.perf_counter() - _PROCESS_START
+    return {
+        "ready_ms": ready * 1000,
+        "first_ms": first * 1000,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # Linux 下单位为 KB
+        "handled": handled,
+        "loaded": len(manager.plugins),
+        "heavy": sum(module in sys.modules for module in HEAVY_MODULES),
+    }
+
+
+def run_child(mode: str, text: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "Bench.StartupBench", "--child", mode, "--text", text],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="插件启动基准")
+    parser.add_argument("--rounds", type=int, default=3, help="每种方式运行的次数（取中位数）")
+    parser.add_argument("--text", default="菜单", help="第一条消息的内容")
+    parser.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _, preimport, lazy = MODES[args.child]
+        print(json.dumps(asyncio.run(first_message(preimport, lazy, args.text))))
+        return
+
+    print(f"{'方式':<8}{'就绪(ms)':>10}{'首条消息(ms)':>14}{'RSS(MB)':>10}{'已加载插件':>12}{'重量级依赖':>12}")
+    for mode, (label, _, _) in MODES.items():
+        results = [run_child(mode, args.text) for _ in range(args.rounds)]
+        assert all(result["handled"] for result in results), f"{label}: 第一条消息未被处理"
+        print(f"{label:<8}{median(r['ready_ms'] for r in results):>10.1f}"
+              f"{median(r['first_ms'] for r in results):>14.1f}"
+              f"{median(r['rss_mb'] for r in results):>10.1f}"
+              f"{results[-1]['loaded']:>12}{results[-1]['heavy']:>12}")
+
+
+if __name__ == "__main__":
+    main()
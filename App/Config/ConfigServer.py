@@ -13,7 +13,7 @@ def returnConfigPath():
         configPath = '/'.join(current_list_path) + '/Config/'
         return configPath
     else:
-        return current_path
+        return current_path + '/'
 
 
 def returnConfigData():
@@ -41,3 +41,11 @@ def returnAdminDbPath():
     :return:
     """
     return returnConfigPath() + 'Admin.db'
+
+
+def returnDedupPath():
+    """
+    返回消息去重记录文件地址
+    :return:
+    """
+    return returnConfigPath() + 'MsgDedup.json'
@@ -1,9 +1,20 @@
 from loguru import logger
 import sys
 import os
+import re
+import random
 from pathlib import Path
+from typing import Any, Dict, Optional
 import tomlkit
 
+# 热路径日志状态，由 setup_logger 根据配置填充
+_debug_enabled = False
+_sample_rates: Dict[str, float] = {}
+_payload_limit = 512
+
+# 连续的 base64 字符，常见于图片/语音/视频数据
+_BASE64_PATTERN = re.compile(r'[A-Za-z0-9+/]{64,}={0,2}')
+
 
 def get_config():
     """
@@ -22,33 +33,42 @@ def setup_logger():
     """
     设置logger配置
     """
+    global _debug_enabled, _sample_rates, _payload_limit
+
     # 获取配置
     config = get_config()
-    
+
     # 清除默认的处理器
     logger.remove()
-    
+
     # 日志文件路径
     log_path = Path("Config/logs")
     log_path.mkdir(exist_ok=True)
-    
+
     # 默认日志格式
     log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
-    
+
     # 从配置中获取参数
     debug_mode = config.get("debug", False)
     retention_days = str(config.get("retention_days", 10)) + " days"
     max_file_size = str(config.get("max_file_size", 500)) + " MB"
     encoding = config.get("encoding", "utf-8")
-    
+    # 日志写入交给后台线程，避免在事件循环中同步写文件/终端
+    enqueue = config.get("enqueue", True)
+
+    _debug_enabled = bool(debug_mode)
+    _sample_rates = {str(k): float(v) for k, v in config.get("sample", {}).items()}
+    _payload_limit = int(config.get("payload_limit", 512))
+
     # 添加控制台输出
     logger.add(
         sys.stderr,
         format=log_format,
         level="DEBUG" if debug_mode else "INFO",
-        colorize=True
+        colorize=True,
+        enqueue=enqueue
     )
-    
+
     # 添加文件输出
     logger.add(
         log_path / "app.log",
@@ -56,9 +76,10 @@ def setup_logger():
         level="DEBUG" if debug_mode else "INFO",
         rotation=max_file_size,
         retention=retention_days,
-        encoding=encoding
+        encoding=encoding,
+        enqueue=enqueue
     )
-    
+
     # 添加错误日志文件
     logger.add(
         log_path / "error.log",
@@ -66,7 +87,8 @@ def setup_logger():
         level="ERROR",
         rotation="100 MB",
         retention="30 days",
-        encoding=encoding
+        encoding=encoding,
+        enqueue=enqueue
     )
 
 def set_debug_mode(enable: bool = True):
@@ -77,5 +99,37 @@ def set_debug_mode(enable: bool = True):
     logger.remove()  # 移除所有处理器
     setup_logger()  # 重新设置logger
 
+def log_sample(category: str) -> bool:
+    """
+    判断热路径上某一类调试日志本次是否需要记录
+    未开启调试模式时直接返回False，调用方据此跳过参数格式化，做到零开销
+    用法:
+        if log_sample("ws"):
+            logger.debug("收到原始消息: {}", brief(message))
+    :param category: 日志类别，对应 [LogConfig.sample] 中的键，未配置的类别全部记录
+    :return: 是否记录
+    """
+    if not _debug_enabled:
+        return False
+    rate = _sample_rates.get(category, 1.0)
+    return rate >= 1.0 or (rate > 0 and random.random() < rate)
+
+def brief(value: Any, limit: Optional[int] = None) -> str:
+    """
+    截断大字段用于日志输出，并将其中的 base64 数据替换为长度说明
+    :param value: 任意对象，非字符串会先转换为字符串
+    :param limit: 最大保留字符数，默认使用 [LogConfig] payload_limit
+    :return: 截断后的字符串
+    """
+    text = value if isinstance(value, str) else str(value)
+    limit = limit or _payload_limit
+    total = len(text)
+    if total > limit:
+        text = text[:limit]
+    text = _BASE64_PATTERN.sub(lambda m: f"<base64 {len(m.group(0))}字符>", text)
+    if total > limit:
+        text += f"...(共{total}字符)"
+    return text
+
 # 初始化时自动设置logger
-setup_logger() 
\ No newline at end of file
+setup_logger()
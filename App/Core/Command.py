@@ -0,0 +1,79 @@
+# 全角字符转半角（！到～），以及全角空格、四分之一空格（@ 之后常见的  ）转普通空格
+_HALF_WIDTH_TABLE = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+_HALF_WIDTH_TABLE.update({0x3000: 0x20, 0x2005: 0x20})
+
+
+def to_half_width(text: str) -> str:
+    """全角转半角，并把特殊空格统一成普通空格"""
+    return text.translate(_HALF_WIDTH_TABLE)
+
+
+def normalize(text: str) -> str:
+    """全角转半角，去掉首尾空白并把连续空白合并为一个空格，关键词和消息按同一规则规整后比较"""
+    return " ".join(to_half_width(text).split())
+
+
+class Command:
+    """
+    消息指令切分结果，每条消息只计算一次（通过 msg.command 获取），所有插件共用
+    raw:        消息原文
+    text:       去掉首尾空白的文本
+    no_at:      去掉 @ 部分的文本（msg.noAtMsg）
+    normalized: no_at 全角转半角、合并连续空白后的文本，完全匹配和前缀匹配使用
+    head/args:  no_at 按第一个空白（含全角空格）切分的指令词和参数，
+                head 为规整后的指令词，args 保留原文（没有参数时为空字符串）
+    no_at 之后的字段在第一次访问时才计算
+    """
+
+    __slots__ = ('raw', 'text', '_msg', '_normalized', '_head', '_args')
+
+    def __init__(self, content: str, msg=None):
+        """
+        Args:
+            content: 消息文本（msg.content）
+            msg: 所属的 WxMsg，用于按需取 noAtMsg
+        """
+        self.raw = content
+        self.text = content.strip()
+        self._msg = msg
+        self._normalized = None
+        self._head = None
+        self._args = None
+
+    @property
+    def no_at(self) -> str:
+        return self._msg.noAtMsg if self._msg is not None else self.text
+
+    @property
+    def normalized(self) -> str:
+        if self._normalized is None:
+            self._normalized = normalize(self.no_at)
+        return self._normalized
+
+    @property
+    def head(self) -> str:
+        if self._head is None:
+            self._split()
+        return self._head
+
+    @property
+    def args(self) -> str:
+        if self._args is None:
+            self._split()
+        return self._args
+
+    @property
+    def has_args(self) -> bool:
+        return bool(self.args)
+
+    def _split(self) -> None:
+        # str.split() 把全角空格和四分之一空格也当作空白，"点歌　晴天" 同样能切开
+        parts = self.no_at.split(None, 1)
+        self._head = to_half_width(parts[0]) if parts else ""
+        self._args = parts[1].strip() if len(parts) > 1 else ""
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Command(head={self.head!r}, args={self.args!r})"
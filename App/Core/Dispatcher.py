@@ -0,0 +1,212 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from Config.logger import logger
+
+
+def default_lane_key(msg: Any) -> str:
+    """默认的通道键：群聊按群ID，私聊按发送者"""
+    return msg.roomid or msg.sender or ""
+
+
+class MessageDispatcher:
+    """
+    消息分发引擎
+    按会话（群ID或私聊发送者）哈希分片到固定数量的通道：
+    - 同一通道内严格按到达顺序串行处理
+    - 不同通道之间由工作协程轮询调度，并行处理
+    - 全局队列上限 + 单通道深度上限，避免消息突发时无限制地堆积
+    """
+    POLICY_BLOCK = "block"                        # 队列满时阻塞接收端（反压到WebSocket读取）
+    POLICY_DROP_OLDEST = "drop_oldest"            # 队列满时丢弃最旧的消息
+    POLICY_DROP_NON_COMMAND = "drop_non_command"  # 队列满时优先丢弃非指令消息
+    POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NON_COMMAND)
+
+    def __init__(self,
+                 handler: Callable[[Any], Awaitable[Any]],
+                 workers: int = 16,
+                 queue_size: int = 1000,
+                 policy: str = POLICY_BLOCK,
+                 is_command: Optional[Callable[[Any], bool]] = None,
+                 lanes: int = 64,
+                 lane_depth: int = 100,
+                 lane_key: Callable[[Any], str] = default_lane_key):
+        """
+        Args:
+            handler: 处理单条消息的协程函数
+            workers: 工作协程数，即同时处理中的消息上限
+            queue_size: 所有通道合计的待处理消息上限
+            policy: 队列满时的处理策略
+            is_command: 判断消息是否为指令消息的函数，drop_non_command 策略使用
+            lanes: 通道（分片）数量
+            lane_depth: 单个通道的待处理消息上限
+            lane_key: 计算消息所属会话键的函数
+        """
+        if policy not in self.POLICIES:
+            logger.warning(f"未知的队列满策略 {policy}，使用 {self.POLICY_BLOCK}")
+            policy = self.POLICY_BLOCK
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.policy = policy
+        self.is_command = is_command or (lambda msg: True)
+        self.lane_count = max(1, int(lanes))
+        self.lane_depth = max(1, int(lane_depth))
+        self.lane_key = lane_key
+
+        self._lanes: List[Deque[Any]] = [deque() for _ in range(self.lane_count)]
+        self._scheduled: List[bool] = [False] * self.lane_count  # 通道已在就绪队列中或正在处理
+        self._ready: Deque[int] = deque()  # 就绪通道轮询队列
+        self._queued = 0
+        self._lock = asyncio.Lock()
+        self._not_empty = asyncio.Condition(self._lock)
+        self._not_full = asyncio.Condition(self._lock)
+        self._worker_tasks: List[asyncio.Task] = []
+
+        # 统计计数
+        self.running = 0     # 正在处理的消息数
+        self.submitted = 0   # 累计提交的消息数
+        self.processed = 0   # 累计处理完成的消息数
+        self.dropped = 0     # 累计丢弃的消息数
+
+    @property
+    def queued(self) -> int:
+        """当前排队中的消息数"""
+        return self._queued
+
+    def stats(self) -> Dict[str, int]:
+        """返回分发统计信息"""
+        return {
+            "queued": self._queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "active_lanes": sum(1 for lane in self._lanes if lane),
+            "max_lane_depth": max(len(lane) for lane in self._lanes),
+        }
+
+    def lane_of(self, msg: Any) -> int:
+        """计算消息所属的通道编号"""
+        return hash(self.lane_key(msg)) % self.lane_count
+
+    def start(self) -> None:
+        """启动工作协程"""
+        if self._worker_tasks:
+            return
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"dispatch-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"消息分发引擎已启动: 工作协程 {self.workers} 个, 通道 {self.lane_count} 个, "
+                    f"队列上限 {self.queue_size}, 单通道上限 {self.lane_depth}, 队列满策略 {self.policy}")
+
+    async def submit(self, msg: Any) -> bool:
+        """
+        提交一条消息到所属会话的通道
+        Args:
+            msg: 消息对象
+        Returns:
+            bool: 是否成功入队，被丢弃时返回False
+        """
+        index = self.lane_of(msg)
+        lane = self._lanes[index]
+        async with self._lock:
+            while len(lane) >= self.lane_depth or self._queued >= self.queue_size:
+                # 单通道满时只牺牲本通道的消息，全局满时牺牲积压最多的通道
+                victim = index if len(lane) >= self.lane_depth else self._longest_lane()
+
+                if self.policy == self.POLICY_DROP_OLDEST:
+                    self._drop_at(victim, 0)
+                    logger.debug("分发队列已满，丢弃最旧的消息")
+                    break
+
+                if self.policy == self.POLICY_DROP_NON_COMMAND:
+                    if not self.is_command(msg):
+                        self.dropped += 1
+                        logger.debug("分发队列已满，丢弃非指令消息")
+                        return False
+                    if self._drop_first_non_command(victim):
+                        break
+                    # 通道中全是指令消息，退化为阻塞等待
+
+                await self._not_full.wait()
+
+            lane.append(msg)
+            self._queued += 1
+            self.submitted += 1
+            if not self._scheduled[index]:
+                self._scheduled[index] = True
+                self._ready.append(index)
+                self._not_empty.notify()
+            return True
+
+    def _longest_lane(self) -> int:
+        """返回积压消息最多的通道编号"""
+        return max(range(self.lane_count), key=lambda i: len(self._lanes[i]))
+
+    def _drop_at(self, index: int, position: int) -> None:
+        """丢弃指定通道中指定位置的消息"""
+        del self._lanes[index][position]
+        self._queued -= 1
+        self.dropped += 1
+
+    def _drop_first_non_command(self, index: int) -> bool:
+        """从指定通道中移除最旧的一条非指令消息"""
+        for position, queued_msg in enumerate(self._lanes[index]):
+            if not self.is_command(queued_msg):
+                self._drop_at(index, position)
+                logger.debug("分发队列已满，为指令消息腾出位置，丢弃一条非指令消息")
+                return True
+        return False
+
+    async def _worker(self) -> None:
+        """工作协程：轮询就绪通道，每次取出一个通道的队首消息处理"""
+        while True:
+            async with self._lock:
+                while True:
+                    while not self._ready:
+                        await self._not_empty.wait()
+                    index = self._ready.popleft()
+                    if self._lanes[index]:
+                        break
+                    # 通道中的消息已被丢弃
+                    self._scheduled[index] = False
+                msg = self._lanes[index].popleft()
+                self._queued -= 1
+                self._not_full.notify_all()
+
+            self.running += 1
+            try:
+                await self.handler(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"分发消息处理出错: {e}", exc_info=True)
+            finally:
+                self.running -= 1
+                self.processed += 1
+
+            async with self._lock:
+                # 通道处理完一条消息后，若仍有积压则排到就绪队列末尾，实现跨通道轮询
+                if self._lanes[index]:
+                    self._ready.append(index)
+                    self._not_empty.notify()
+                else:
+                    self._scheduled[index] = False
+
+    async def close(self) -> None:
+        """停止所有工作协程，丢弃未处理的消息"""
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._queued:
+            logger.info(f"消息分发引擎关闭，丢弃 {self._queued} 条未处理的消息")
+        for lane in self._lanes:
+            lane.clear()
+        self._ready.clear()
+        self._scheduled = [False] * self.lane_count
+        self._queued = 0
+        logger.info(f"消息分发引擎已关闭，统计: {self.stats()}")
@@ -0,0 +1,122 @@
+import re
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+from Config.logger import logger
+from .MsgDeduplicator import MsgDeduplicator
+
+# 只匹配消息信封中的几个顶层字段，Content 内的引号已被转义，不会误匹配
+_CREATE_TIME_PATTERN = re.compile(r'"CreateTime"\s*:\s*(\d+)')
+_FROM_USER_PATTERN = re.compile(r'"FromUserName"\s*:\s*\{\s*"string"\s*:\s*"([^"]*)"')
+_MSG_TYPE_PATTERN = re.compile(r'"MsgType"\s*:\s*(\d+)')
+_NEW_MSG_ID_PATTERN = re.compile(r'"NewMsgId"\s*:\s*(\d+)')
+
+
+class Envelope(NamedTuple):
+    """消息信封，只包含过滤所需的字段"""
+    create_time: Optional[int]
+    from_user_name: Optional[str]
+    msg_type: Optional[int]
+    new_msg_id: Optional[int]
+
+
+def _search_int(pattern: re.Pattern, raw: str) -> Optional[int]:
+    match = pattern.search(raw)
+    return int(match.group(1)) if match else None
+
+
+def peek_envelope(raw: Union[str, bytes]) -> Envelope:
+    """
+    不做完整 JSON 解析，直接从原始消息文本中读取信封字段
+    Args:
+        raw: WebSocket 收到的原始消息
+    Returns:
+        Envelope: 读取不到的字段为 None
+    """
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8", errors="ignore")
+    from_user = _FROM_USER_PATTERN.search(raw)
+    return Envelope(
+        create_time=_search_int(_CREATE_TIME_PATTERN, raw),
+        from_user_name=from_user.group(1) if from_user else None,
+        msg_type=_search_int(_MSG_TYPE_PATTERN, raw),
+        new_msg_id=_search_int(_NEW_MSG_ID_PATTERN, raw),
+    )
+
+
+class EnvelopeFilter:
+    """
+    消息信封预过滤器
+    在 json.loads 和 WxMsg 构造之前丢弃历史消息、自己发送的消息、未订阅类型的消息和重复推送的消息
+    """
+    REASON_HISTORY = "history"
+    REASON_SELF = "self"
+    REASON_TYPE = "type"
+    REASON_DUPLICATE = "duplicate"
+
+    def __init__(self,
+                 self_wxid: str,
+                 startup_time: float,
+                 skip_history: bool = True,
+                 skip_self: bool = True,
+                 accept_msg_types: Optional[Iterable[int]] = None,
+                 deduplicator: Optional[MsgDeduplicator] = None):
+        """
+        Args:
+            self_wxid: 机器人wxid
+            startup_time: 启动时间戳，早于该时间的消息视为历史消息
+            skip_history: 是否跳过历史消息
+            skip_self: 是否跳过自己发送的消息
+            accept_msg_types: 订阅的消息类型，为空表示全部
+            deduplicator: NewMsgId 去重窗口，为 None 时不去重
+        """
+        self.self_wxid = self_wxid
+        self.startup_time = startup_time
+        self.skip_history = skip_history
+        self.skip_self = skip_self
+        self.accept_msg_types = frozenset(int(t) for t in accept_msg_types) if accept_msg_types else None
+        self.deduplicator = deduplicator
+        self.passed = 0
+        self.rejected: Dict[str, int] = {
+            self.REASON_HISTORY: 0,
+            self.REASON_SELF: 0,
+            self.REASON_TYPE: 0,
+            self.REASON_DUPLICATE: 0,
+        }
+
+    def check(self, raw: Union[str, bytes]) -> Optional[str]:
+        """
+        检查原始消息是否需要提前丢弃
+        Args:
+            raw: WebSocket 收到的原始消息
+        Returns:
+            Optional[str]: 丢弃原因，None 表示放行
+        """
+        envelope = peek_envelope(raw)
+        reason = self.judge(envelope)
+        # 只有通过其他检查的消息才记入去重窗口
+        if reason is None and self.deduplicator and self.deduplicator.is_duplicate(envelope.new_msg_id):
+            reason = self.REASON_DUPLICATE
+        if reason:
+            self.rejected[reason] += 1
+            logger.debug("信封预过滤丢弃消息: reason={} NewMsgId={}", reason, envelope.new_msg_id)
+        else:
+            self.passed += 1
+        return reason
+
+    def judge(self, envelope: Envelope) -> Optional[str]:
+        """根据信封字段判断丢弃原因，字段缺失时放行交给后续完整解析处理"""
+        if self.skip_history and envelope.create_time and envelope.create_time < self.startup_time:
+            return self.REASON_HISTORY
+        if self.skip_self and envelope.from_user_name and envelope.from_user_name == self.self_wxid:
+            return self.REASON_SELF
+        if self.accept_msg_types is not None and envelope.msg_type is not None \
+                and envelope.msg_type not in self.accept_msg_types:
+            return self.REASON_TYPE
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """返回预过滤统计信息"""
+        return {
+            "passed": self.passed,
+            "rejected": sum(self.rejected.values()),
+            **{f"rejected_{reason}": count for reason, count in self.rejected.items()},
+        }
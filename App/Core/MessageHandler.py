@@ -1,11 +1,16 @@
 import Config.ConfigServer as Cs
 from WeChatApi.WsClient import WsClient
+from WeChatApi.HttpIngestServer import HttpIngestServer
 from WeChatApi import WeChatApi
-from .msg import WxMsg
-from Config.logger import logger
+from Config.logger import logger, log_sample, brief
 import json
 from Plugins._Tools import Tools
 from .PluginManager import PluginManager
+from .Dispatcher import MessageDispatcher
+from .EnvelopeFilter import EnvelopeFilter
+from .MsgDeduplicator import MsgDeduplicator
+from .TrafficRecorder import TrafficRecorder
+from .MsgDecoder import MsgDecoder
 import asyncio
 from datetime import datetime
 from typing import Optional, Dict
@@ -17,7 +22,7 @@ class MessageHandler(WsClient):
     def __init__(self):
         """同步初始化基本配置"""
         self._init_config()
-        super().__init__(self.bot_api, self.bot_port, self.self_wxid)
+        super().__init__(self.bot_api, self.bot_port, self.self_wxid, self.ingest_config)
         
         # 记录启动时间，用于跳过历史消息
         self.startup_time = datetime.now().timestamp()
@@ -27,10 +32,50 @@ class MessageHandler(WsClient):
         else:
             logger.info("已禁用跳过历史消息功能，将处理所有接收到的消息")
 
+        # 原始消息录制，用于离线回放压测
+        record_path = self.ingest_config.get('record_path', '')
+        self.recorder = TrafficRecorder(record_path) if record_path else None
+
+        # NewMsgId 去重窗口，避免重连或重复推送导致重复回复
+        self.deduplicator = MsgDeduplicator(
+            max_size=self.ingest_config.get('dedup_size', 10000),
+            window=self.ingest_config.get('dedup_window', 3600),
+            persist_path=Cs.returnDedupPath() if self.ingest_config.get('dedup_persist', False) else None,
+            save_interval=self.ingest_config.get('dedup_save_interval', 30)
+        )
+
+        # 信封预过滤，在完整解析前丢弃历史消息、自己的消息、未订阅类型和重复的消息
+        self.envelope_filter = EnvelopeFilter(
+            self.self_wxid,
+            self.startup_time,
+            skip_history=self.skip_history_messages,
+            skip_self=self.ingest_config.get('skip_self_messages', True),
+            accept_msg_types=self.ingest_config.get('accept_msg_types', []),
+            deduplicator=self.deduplicator
+        )
+
+        # 消息解码器，优先按消息结构直接解码（msgspec），未安装时回退到通用 JSON 解析
+        self.decoder = MsgDecoder(self.self_wxid, self.ingest_config.get('decoder', 'auto'))
+        logger.info(f"消息解码方式: {self.decoder.backend}")
+
         # 初始化组件
         self.wechat_api = WeChatApi()
         self.tools = Tools()
-        self.plugin_manager = PluginManager(wechat_api=self.wechat_api)
+        self.plugin_manager = PluginManager(
+            wechat_api=self.wechat_api,
+            limit_config=self.dispatch_config,
+            reload_config=Cs.returnConfigData().get('HotReloadConfig', {}),
+            load_config=Cs.returnConfigData().get('PluginLoadConfig', {})
+        )
+        self.dispatcher = MessageDispatcher(
+            self.process_message,
+            workers=self.dispatch_config.get('workers', 16),
+            queue_size=self.dispatch_config.get('queue_size', 1000),
+            policy=self.dispatch_config.get('queue_full_policy', MessageDispatcher.POLICY_BLOCK),
+            is_command=self.plugin_manager.is_command,
+            lanes=self.dispatch_config.get('lanes', 64),
+            lane_depth=self.dispatch_config.get('lane_depth', 100)
+        )
         
         # 创建初始化标志
         self._initialized = False
@@ -38,6 +83,12 @@ class MessageHandler(WsClient):
         # 创建初始化任务
         self._init_task = asyncio.create_task(self._async_init())
 
+        # 消息接收方式：ws / http / both，可按机器人账号单独配置
+        self.transport = self.ingest_config.get('transport_by_wxid', {}).get(self.self_wxid) \
+            or self.ingest_config.get('transport', 'ws')
+        self.http_server: Optional[HttpIngestServer] = None
+        self._stopped = asyncio.Event()
+
     def _init_config(self):
         """初始化配置"""
         loginconfig = Cs.returnLoginData().get('DPBotConfig', {})
@@ -47,6 +98,8 @@ class MessageHandler(WsClient):
         config = Cs.returnConfigData().get('DPBotConfig', {})
         self.Administrators = config.get('Administrators', [])
         self.skip_history_messages = config.get('skip_history_messages', True)
+        self.dispatch_config = Cs.returnConfigData().get('DispatchConfig', {})
+        self.ingest_config = Cs.returnConfigData().get('IngestConfig', {})
 
         # 验证必要的配置
         missing_configs = []
@@ -103,16 +156,24 @@ class MessageHandler(WsClient):
                     logger.error("MessageHandler 初始化失败，无法处理消息")
                     return
 
-            data = json.loads(message)
-            logger.debug(f"收到原始消息: {data}")
-            msg = WxMsg(data, self.self_wxid)
+            if self.recorder:
+                self.recorder.record(message)
+            if log_sample("ws"):
+                logger.debug("收到原始消息: {}", brief(message))
+            if self.envelope_filter.check(message):
+                return
+            msg = self.decoder.decode(message)
 
             if self.skip_history_messages and msg.create_time and msg.create_time < self.startup_time:
-                logger.debug(f"跳过历史消息: {msg.formatted_time}")
+                logger.debug("跳过历史消息: {}", msg.create_time)
                 return
 
-            logger.info(f"开始处理消息: {msg}")
-            asyncio.create_task(self.process_message(msg))
+            if log_sample("msg"):
+                logger.debug("开始处理消息: roomid={} sender={} type={} content={}",
+                             msg.roomid, msg.sender, msg.type, brief(msg.content, 100))
+                logger.debug("消息详情: {}", msg)
+            # 交给分发引擎排队处理，队列满时按策略阻塞或丢弃
+            await self.dispatcher.submit(msg)
             
         except json.JSONDecodeError as e:
             logger.error(f"消息解析失败: {e}", exc_info=True)
@@ -124,16 +185,16 @@ class MessageHandler(WsClient):
         try:
             # 查询群组模式
             group_mode = await self.tools.query_group_mode(msg.roomid)
-            logger.debug(f"群组 {msg.roomid} 的模式查询结果: {group_mode}")
+            logger.debug("群组 {} 的模式查询结果: {}", msg.roomid, group_mode)
             
             # 设置消息模式
             msg.mode = group_mode if group_mode else "OTHER"
-            logger.debug(f"消息模式设置为: {msg.mode}")
+            logger.debug("消息模式设置为: {}", msg.mode)
             
             # 交给插件管理器处理
             logger.debug("开始调用插件管理器处理消息...")
             result = await self.plugin_manager.handle_message(msg)
-            logger.debug(f"插件管理器处理消息结果: {result}")
+            logger.debug("插件管理器处理消息结果: {}", result)
             return result
             
         except Exception as e:
@@ -151,6 +212,14 @@ class MessageHandler(WsClient):
                 except asyncio.CancelledError:
                     pass
 
+            # 停止消息分发引擎
+            if self.dispatcher:
+                await self.dispatcher.close()
+            logger.info(f"信封预过滤统计: {self.envelope_filter.stats()}")
+            self.deduplicator.save()
+            if self.recorder:
+                self.recorder.close()
+
             # 关闭数据库连接
             if self.tools:
                 await self.tools.close()  # 需要在Tools类中添加此方法
@@ -159,6 +228,12 @@ class MessageHandler(WsClient):
             if self.plugin_manager:
                 await self.plugin_manager.close()  # 需要在PluginManager中添加此方法
 
+            # 关闭 HTTP 推送接收服务
+            if self.http_server:
+                await self.http_server.close()
+                self.http_server = None
+            self._stopped.set()
+
             # 关闭 WebSocket 连接
             await super().close()
             
@@ -168,6 +243,7 @@ class MessageHandler(WsClient):
             
             # 清理资源
             self.plugin_manager = None
+            self.dispatcher = None
             self.tools = None
             self.wechat_api = None
             self._initialized = False
@@ -185,9 +261,28 @@ class MessageHandler(WsClient):
                 error_msg = "MessageHandler 初始化失败"
                 logger.error(error_msg)
                 raise RuntimeError(error_msg)
+
+            # 启动消息分发引擎
+            self.dispatcher.start()
+            # 初始化插件并启动插件热重载
+            await self.plugin_manager.start()
                 
-            logger.info("开始连接 WebSocket...")
-            await self.connect()  # 调用父类的connect方法
+            if self.transport in ("http", "both"):
+                self.http_server = HttpIngestServer(
+                    self.handle_message,
+                    self.self_wxid,
+                    host=self.ingest_config.get('http_host', '127.0.0.1'),
+                    port=self.ingest_config.get('http_port', 8088),
+                    keepalive_timeout=self.ingest_config.get('http_keepalive_timeout', 75)
+                )
+                await self.http_server.start()
+
+            if self.transport in ("ws", "both"):
+                logger.info("开始连接 WebSocket...")
+                await self.connect()  # 调用父类的connect方法
+            else:
+                # 仅使用HTTP推送时，保持运行直到关闭
+                await self._stopped.wait()
             
         except Exception as e:
             logger.error(f"运行消息处理器失败: {e}", exc_info=True)
@@ -0,0 +1,92 @@
+import json
+from typing import Optional, Union
+from Config.logger import logger
+from Core.msg import WxMsg
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if msgspec is not None:
+    class _StringField(msgspec.Struct):
+        string: str = ""
+
+    class _ImgBuf(msgspec.Struct):
+        iLen: int = 0
+
+    class _RawMsg(msgspec.Struct):
+        """Wxapi 消息结构，只声明 WxMsg 用到的字段，其余字段解码时直接跳过"""
+        MsgId: Optional[int] = None
+        FromUserName: _StringField = msgspec.field(default_factory=_StringField)
+        ToUserName: _StringField = msgspec.field(default_factory=_StringField)
+        MsgType: Optional[int] = None
+        Content: _StringField = msgspec.field(default_factory=_StringField)
+        Status: Optional[int] = None
+        ImgStatus: Optional[int] = None
+        ImgBuf: _ImgBuf = msgspec.field(default_factory=_ImgBuf)
+        CreateTime: Optional[int] = None
+        MsgSource: str = ""
+        PushContent: str = ""
+        NewMsgId: Optional[int] = None
+        MsgSeq: Optional[int] = None
+
+    class _Frame(msgspec.Struct):
+        data: _RawMsg
+
+
+BACKENDS = ("auto", "msgspec", "orjson", "json")
+
+
+class MsgDecoder:
+    """
+    WS/HTTP 推送消息解码器
+    安装了 msgspec 时按消息结构直接把原始字节解码成结构体再构造 WxMsg，
+    否则使用 orjson，都没有时回退到标准库 json
+    """
+    def __init__(self, self_wxid: str, backend: str = "auto"):
+        """
+        Args:
+            self_wxid: 机器人wxid
+            backend: 解码方式 auto/msgspec/orjson/json，指定的库未安装时自动降级
+        """
+        self.self_wxid = self_wxid
+        if backend not in BACKENDS:
+            logger.warning(f"未知的消息解码方式: {backend}，使用 auto")
+            backend = "auto"
+        if backend in ("auto", "msgspec") and msgspec is not None:
+            self.backend = "msgspec"
+            self._decoder = msgspec.json.Decoder(_Frame)
+        elif backend in ("auto", "msgspec", "orjson") and orjson is not None:
+            self.backend = "orjson"
+        else:
+            self.backend = "json"
+        if backend not in ("auto", self.backend):
+            logger.warning(f"消息解码方式 {backend} 不可用（未安装），已改用 {self.backend}")
+        self.fallbacks = 0  # 结构校验失败、改用通用解析的消息数
+
+    def loads(self, raw: Union[str, bytes]):
+        """通用 JSON 解析，返回 dict"""
+        if orjson is not None and self.backend != "json":
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+    def decode(self, raw: Union[str, bytes]) -> WxMsg:
+        """
+        把原始消息解码为 WxMsg
+        Raises:
+            json.JSONDecodeError: 消息不是合法的 JSON
+        """
+        if self.backend == "msgspec":
+            try:
+                return WxMsg.from_struct(self._decoder.decode(raw).data, self.self_wxid)
+            except msgspec.MsgspecError:
+                # 字段类型与结构声明不符（或根本不是 JSON），交给通用解析，保证行为与原来一致
+                self.fallbacks += 1
+        return WxMsg(self.loads(raw), self.self_wxid)
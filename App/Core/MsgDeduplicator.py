@@ -0,0 +1,131 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from Config.logger import logger
+
+
+class MsgDeduplicator:
+    """
+    NewMsgId 去重窗口
+    按插入顺序保存最近处理过的 NewMsgId，超过容量或超出时间窗口的记录自动淘汰
+    可选持久化到文件，重启后补收消息时不会重复处理：
+    有新记录时最多 save_interval 秒后写入一次，关闭时再写入一次，进程意外退出最多丢失最近 save_interval 秒的记录
+    """
+    def __init__(self, max_size: int = 10000, window: float = 3600, persist_path: Optional[str] = None,
+                 save_interval: float = 30):
+        """
+        Args:
+            max_size: 最多保存的 NewMsgId 数量
+            window: 去重时间窗口（秒），0 表示只按容量淘汰
+            persist_path: 持久化文件路径，为 None 时不持久化
+            save_interval: 有新记录后间隔多少秒写入持久化文件，0 表示只在关闭时写入
+        """
+        self.max_size = max(1, int(max_size))
+        self.window = float(window)
+        self.persist_path = persist_path
+        self.save_interval = float(save_interval)
+        self._seen: "OrderedDict[int, float]" = OrderedDict()
+        self._save_handle: Optional[asyncio.TimerHandle] = None  # 已安排的定时写入
+        self.duplicates = 0  # 累计拦截的重复消息数
+        if self.persist_path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _evict(self, now: float) -> None:
+        """淘汰过期和超出容量的记录"""
+        if self.window > 0:
+            deadline = now - self.window
+            while self._seen:
+                oldest = next(iter(self._seen.values()))
+                if oldest >= deadline:
+                    break
+                self._seen.popitem(last=False)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def is_duplicate(self, new_msg_id: Optional[int]) -> bool:
+        """
+        判断消息是否重复，未见过的消息会被记录
+        Args:
+            new_msg_id: 消息的 NewMsgId，为空时不做去重
+        Returns:
+            bool: 是否为重复消息
+        """
+        if not new_msg_id:
+            return False
+        now = time.time()
+        self._evict(now)
+        if new_msg_id in self._seen:
+            self.duplicates += 1
+            return True
+        self._seen[new_msg_id] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        self._schedule_save()
+        return False
+
+    def _schedule_save(self) -> None:
+        """有新记录时安排一次定时写入，间隔内的新记录合并到同一次写入"""
+        if not self.persist_path or self.save_interval <= 0 or self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # 不在事件循环中（如同步调用），只在关闭时写入
+        self._save_handle = loop.call_later(self.save_interval, self._save_later)
+
+    def _save_later(self) -> None:
+        self._save_handle = None
+        count = self._write()
+        if count is not None:
+            logger.debug(f"已定时保存 {count} 条消息去重记录")
+
+    def load(self) -> None:
+        """从持久化文件加载去重记录"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, mode='r', encoding='UTF-8') as f:
+                records = json.load(f)
+            for new_msg_id, seen_at in records:
+                self._seen[int(new_msg_id)] = float(seen_at)
+            self._evict(time.time())
+            logger.info(f"已加载 {len(self._seen)} 条消息去重记录")
+        except Exception as e:
+            logger.warning(f"加载消息去重记录失败: {e}")
+
+    def save(self) -> None:
+        """将去重记录写入持久化文件，并取消已安排的定时写入（关闭时调用）"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        count = self._write()
+        if count is not None:
+            logger.info(f"已保存 {count} 条消息去重记录")
+
+    def _write(self) -> Optional[int]:
+        """写入持久化文件（先写临时文件再替换，避免写一半），返回写入的记录数，失败或未开启持久化时返回 None"""
+        if not self.persist_path:
+            return None
+        try:
+            self._evict(time.time())
+            temp_path = self.persist_path + '.tmp'
+            with open(temp_path, mode='w', encoding='UTF-8') as f:
+                json.dump([[new_msg_id, seen_at] for new_msg_id, seen_at in self._seen.items()], f)
+            os.replace(temp_path, self.persist_path)
+            return len(self._seen)
+        except Exception as e:
+            logger.warning(f"保存消息去重记录失败: {e}")
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        """返回去重统计信息"""
+        return {
+            "size": len(self._seen),
+            "duplicates": self.duplicates,
+        }
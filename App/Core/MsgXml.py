@@ -0,0 +1,208 @@
+from typing import Dict, NamedTuple, Optional
+from xml.etree import ElementTree as ET
+
+# 需要保留属性的节点（图片、语音、视频、表情的 CDN 信息以及卡片的 appid 都在属性里）
+_ATTR_TAGS = {"img", "voicemsg", "videomsg", "emoji", "appmsg"}
+# 需要保留文本的节点路径前缀（链接、文件、引用等卡片消息的信息都在子节点文本里）
+_TEXT_PREFIXES = ("appmsg/",)
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+class MsgXml(NamedTuple):
+    """一次解析得到的 XML 字段，attrs 以节点名为键，texts 以相对 <msg> 的路径为键（如 appmsg/title）"""
+    attrs: Dict[str, Dict[str, str]]
+    texts: Dict[str, str]
+
+
+def parse_msg_xml(content: str) -> Optional[MsgXml]:
+    """
+    流式解析消息内容中的 XML，只保留各类消息需要的节点，不构建完整的元素树
+    Args:
+        content: 消息原始内容，群聊消息可带 "wxid:\\n" 前缀
+    Returns:
+        MsgXml: 解析结果，内容不是 XML 或解析失败时返回 None
+    """
+    start = content.find("<")
+    if start < 0:
+        return None
+    attrs: Dict[str, Dict[str, str]] = {}
+    texts: Dict[str, str] = {}
+    path = []
+    parser = ET.XMLPullParser(events=("start", "end"))
+    try:
+        parser.feed(content[start:])
+        parser.close()
+    except ET.ParseError:
+        # 已读取到的事件仍然有效，截断或带尾部垃圾的内容也能拿到前面的字段
+        pass
+    try:
+        for event, elem in parser.read_events():
+            if event == "start":
+                path.append(elem.tag)
+                if elem.tag in _ATTR_TAGS and elem.tag not in attrs:
+                    attrs[elem.tag] = dict(elem.attrib)
+                continue
+            key = "/".join(path[1:])  # 去掉根节点 <msg>
+            if key.startswith(_TEXT_PREFIXES) and key not in texts and len(elem) == 0:
+                texts[key] = (elem.text or "").strip()
+            path.pop()
+            elem.clear()
+    except ET.ParseError:
+        pass
+    if not attrs and not texts:
+        return None
+    return MsgXml(attrs, texts)
+
+
+class ImageInfo(NamedTuple):
+    """图片消息（MsgType 3），aeskey/file_no 对应 ToolsApi.downloadImage 的 FileAesKey/FileNo"""
+    aeskey: str
+    file_no: str       # cdnmidimgurl，缺失时取 cdnbigimgurl
+    thumb_url: str     # cdnthumburl
+    length: int        # 中图大小
+    hd_length: int     # 原图大小
+    md5: str
+
+
+class VoiceInfo(NamedTuple):
+    """语音消息（MsgType 34），bufid/length 对应 ToolsApi.downloadVoice 的 Bufid/Length，另需 msg.from_user_name 和 msg.id"""
+    bufid: str
+    length: int        # 语音数据大小
+    voice_length: int  # 语音时长（毫秒）
+    aeskey: str
+    voice_url: str
+
+
+class VideoInfo(NamedTuple):
+    """视频消息（MsgType 43），length 对应 ToolsApi.downloadVideo 的 DataLen，另需 msg.id"""
+    aeskey: str
+    video_url: str     # cdnvideourl
+    thumb_url: str     # cdnthumburl
+    length: int
+    play_length: int   # 时长（秒）
+    md5: str
+
+
+class EmojiInfo(NamedTuple):
+    """表情消息（MsgType 47）"""
+    md5: str
+    length: int
+    cdn_url: str
+    width: int
+    height: int
+
+
+class AppMsg(NamedTuple):
+    """卡片消息（MsgType 49）：链接、文件、小程序、引用等，attach_id/total_len 对应 ToolsApi.downloadFile 的 AttachId/DataLen"""
+    type: int
+    title: str
+    des: str
+    url: str
+    app_id: str
+    source_name: str
+    attach_id: str
+    total_len: int
+    file_ext: str
+
+
+class QuoteInfo(NamedTuple):
+    """引用回复消息（appmsg type 57）"""
+    text: str             # 回复的文本
+    ref_type: int         # 被引用消息的 MsgType
+    ref_new_msg_id: str   # 被引用消息的 NewMsgId（svrid）
+    ref_from_user: str    # 被引用消息的发送者
+    ref_chat_user: str    # 被引用消息所在会话
+    ref_display_name: str
+    ref_content: str
+
+
+def build_image_info(xml: MsgXml) -> Optional[ImageInfo]:
+    img = xml.attrs.get("img")
+    if img is None:
+        return None
+    return ImageInfo(
+        aeskey=img.get("aeskey", ""),
+        file_no=img.get("cdnmidimgurl") or img.get("cdnbigimgurl", ""),
+        thumb_url=img.get("cdnthumburl", ""),
+        length=_to_int(img.get("length")),
+        hd_length=_to_int(img.get("hdlength")),
+        md5=img.get("md5", ""),
+    )
+
+
+def build_voice_info(xml: MsgXml) -> Optional[VoiceInfo]:
+    voice = xml.attrs.get("voicemsg")
+    if voice is None:
+        return None
+    return VoiceInfo(
+        bufid=voice.get("bufid", ""),
+        length=_to_int(voice.get("length")),
+        voice_length=_to_int(voice.get("voicelength")),
+        aeskey=voice.get("aeskey", ""),
+        voice_url=voice.get("voiceurl", ""),
+    )
+
+
+def build_video_info(xml: MsgXml) -> Optional[VideoInfo]:
+    video = xml.attrs.get("videomsg")
+    if video is None:
+        return None
+    return VideoInfo(
+        aeskey=video.get("aeskey", ""),
+        video_url=video.get("cdnvideourl", ""),
+        thumb_url=video.get("cdnthumburl", ""),
+        length=_to_int(video.get("length")),
+        play_length=_to_int(video.get("playlength")),
+        md5=video.get("md5", ""),
+    )
+
+
+def build_emoji_info(xml: MsgXml) -> Optional[EmojiInfo]:
+    emoji = xml.attrs.get("emoji")
+    if emoji is None:
+        return None
+    return EmojiInfo(
+        md5=emoji.get("md5", ""),
+        length=_to_int(emoji.get("len")),
+        cdn_url=emoji.get("cdnurl", ""),
+        width=_to_int(emoji.get("width")),
+        height=_to_int(emoji.get("height")),
+    )
+
+
+def build_appmsg(xml: MsgXml) -> Optional[AppMsg]:
+    texts = xml.texts
+    if not texts:
+        return None
+    return AppMsg(
+        type=_to_int(texts.get("appmsg/type")),
+        title=texts.get("appmsg/title", ""),
+        des=texts.get("appmsg/des", ""),
+        url=texts.get("appmsg/url", ""),
+        app_id=xml.attrs.get("appmsg", {}).get("appid", ""),
+        source_name=texts.get("appmsg/sourcedisplayname", ""),
+        attach_id=texts.get("appmsg/appattach/attachid", ""),
+        total_len=_to_int(texts.get("appmsg/appattach/totallen")),
+        file_ext=texts.get("appmsg/appattach/fileext", ""),
+    )
+
+
+def build_quote(xml: MsgXml) -> Optional[QuoteInfo]:
+    texts = xml.texts
+    if "appmsg/refermsg/svrid" not in texts and "appmsg/refermsg/content" not in texts:
+        return None
+    return QuoteInfo(
+        text=texts.get("appmsg/title", ""),
+        ref_type=_to_int(texts.get("appmsg/refermsg/type")),
+        ref_new_msg_id=texts.get("appmsg/refermsg/svrid", ""),
+        ref_from_user=texts.get("appmsg/refermsg/fromusr", ""),
+        ref_chat_user=texts.get("appmsg/refermsg/chatusr", ""),
+        ref_display_name=texts.get("appmsg/refermsg/displayname", ""),
+        ref_content=texts.get("appmsg/refermsg/content", ""),
+    )
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from Config.logger import logger
 import asyncio
 
@@ -7,7 +7,42 @@ class PluginBase(ABC):
     """
     插件基类，所有插件都必须继承此类
     提供插件的基本属性和方法
+
+    触发声明（类属性，也可以在 __init__ 中按配置赋值），PluginManager 据此建立路由索引，
+    不匹配的消息不会交给插件：
+        on_keyword:   完全匹配的关键词
+        on_prefix:    以关键词开头（如 "点歌 晴天"）
+        on_contains:  包含关键词（如链接域名）
+        on_regex:     正则表达式（re.search）
+        on_msg_types: 接收的消息类型（MsgType），None 表示全部
+        private_ok:   是否接收私聊消息
+    没有声明任何关键词（包括 config.toml 的 [Route] 和 register_command）的插件会收到所有
+    符合 on_msg_types / private_ok 的消息。
+    on_msg_types / private_ok 在路由阶段过滤，例如 on_msg_types = (1,) 的插件只会收到文本消息，
+    handle_message 中不需要再判断 msg.type。
+
+    运行限制（None 表示使用 Config.toml [DispatchConfig] 中的默认值，config.toml 的 [Limit] 可覆盖）:
+        max_concurrency: 同时处理的消息上限，超过时新消息不再交给本插件，0 表示不限制
+        timeout:         单条消息处理超时时间（秒），超时后取消处理，0 表示不限制
+        timeout_reply:   超时后回复给用户的内容，空字符串表示不回复
+
+    子进程运行（需要 Config.toml [DispatchConfig] 的 plugin_process_workers 大于 0）:
+        run_in_process:  为 True 时 handle_message / handle_private_message 在插件进程池中执行，
+                         适合图片处理、OCR、统计等 CPU 密集的插件。子进程收到的是消息的副本，
+                         插件通过 self.dp 调用的 send* 接口会被记录下来交回主进程发送，其他接口不可用；
+                         should_handle_message 仍在主进程执行
     """
+    on_keyword: Sequence[str] = ()
+    on_prefix: Sequence[str] = ()
+    on_contains: Sequence[str] = ()
+    on_regex: Sequence[str] = ()
+    on_msg_types: Optional[Sequence[int]] = None
+    private_ok: bool = True
+    max_concurrency: Optional[int] = None
+    timeout: Optional[float] = None
+    timeout_reply: Optional[str] = None
+    run_in_process: bool = False
+
     def __init__(self):
         self.name = self.__class__.__name__
         self.description = "插件描述"
@@ -16,6 +51,13 @@ class PluginBase(ABC):
         self.commands = {}  # 命令列表
         self.dp = None  # 初始化为None，等待PluginManager设置
         
+    async def on_load(self) -> None:
+        """
+        插件加载完成（已设置 dp）后调用，可在此做需要事件循环的初始化
+        热重载时新实例在这里初始化成功后才会替换旧实例，抛出异常则继续使用旧实例
+        """
+        pass
+
     async def should_handle_message(self, msg) -> bool:
         """
         判断是否应该处理该消息
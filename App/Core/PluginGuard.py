@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class PluginGuard:
+    """
+    单个插件的并发上限和超时控制
+    同时运行的调用数达到上限时直接拒绝新的调用（不排队），超时的调用会被取消
+    """
+    STATUS_OK = "ok"
+    STATUS_REJECTED = "rejected"
+    STATUS_TIMEOUT = "timeout"
+
+    def __init__(self, name: str, max_concurrency: int = 0, timeout: float = 0, timeout_reply: str = ""):
+        """
+        Args:
+            name: 插件名
+            max_concurrency: 同时运行的调用上限，0 表示不限制
+            timeout: 单次调用超时时间（秒），0 表示不限制
+            timeout_reply: 超时后回复给用户的内容，为空则不回复
+        """
+        self.name = name
+        self.max_concurrency = max(0, int(max_concurrency or 0))
+        self.timeout = float(timeout or 0)
+        self.timeout_reply = timeout_reply or ""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        self.running = 0
+        self.calls = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def call(self, handler: Callable[[Any], Awaitable[Any]], msg) -> Tuple[str, Any]:
+        """
+        在并发上限和超时控制下调用插件
+        Returns:
+            Tuple[str, Any]: (状态, 插件返回值)，状态为 ok/rejected/timeout
+        Raises:
+            插件抛出的异常原样抛出（计入 errors）
+        """
+        if self._semaphore is not None and self._semaphore.locked():
+            self.rejected += 1
+            return self.STATUS_REJECTED, None
+        if self._semaphore is not None:
+            await self._semaphore.acquire()  # 未满时不会等待
+        self.calls += 1
+        self.running += 1
+        try:
+            if not self.timeout:
+                return self.STATUS_OK, await handler(msg)
+            try:
+                async with asyncio.timeout(self.timeout) as deadline:
+                    return self.STATUS_OK, await handler(msg)
+            except TimeoutError:
+                # 插件自己的请求超时（aiohttp、socket 等）也是 TimeoutError，只有超过调用时限才算超时
+                if not deadline.expired():
+                    raise
+                self.timeouts += 1
+                return self.STATUS_TIMEOUT, None
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.running -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            "running": self.running,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
@@ -1,65 +1,304 @@
 import os
+import sys
+import asyncio
 import importlib
 import inspect
-from typing import Dict, Optional
+import time
+from typing import Dict, Optional, Set, Tuple
 from Config.logger import logger
+from .Command import normalize
 from .PluginBase import PluginBase
+from .TriggerIndex import TriggerIndex
+from .PluginGuard import PluginGuard
+from .PluginWatcher import PluginWatcher
+from .PluginManifest import PluginManifest, read_manifest
+from .PluginWorker import PluginProcessPool
+from .RateLimiter import RateLimit
+from .SingleFlight import current_plugin, upstream_flights
 from Plugins._Tools import Tools
+from DbServer.DbAdminCache import admin_cache
 from WeChatApi import WeChatApi
 
+PLUGINS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Plugins")
+# 频率限制配置项，插件 config.toml 的 [RateLimit] 中同名，Config.toml [DispatchConfig] 中带 rate_limit_ 前缀
+RATE_LIMIT_KEYS = ('sender_rate', 'sender_burst', 'room_rate', 'room_burst', 'reply', 'max_keys')
+
 class PluginManager:
-    def __init__(self, wechat_api: WeChatApi = None):
+    def __init__(self, wechat_api: WeChatApi = None, limit_config: Optional[Dict] = None,
+                 reload_config: Optional[Dict] = None, load_config: Optional[Dict] = None):
+        """
+        Args:
+            wechat_api: 共享的WeChatApi实例
+            limit_config: 插件并发/超时/频率限制的默认值（Config.toml 的 [DispatchConfig]）
+            reload_config: 插件热重载配置（Config.toml 的 [HotReloadConfig]）
+            load_config: 插件加载配置（Config.toml 的 [PluginLoadConfig]）
+        """
         self.plugins: Dict[str, PluginBase] = {}  # 插件字典
         self.tools = Tools()  # 工具类实例
         self.wechat_api = wechat_api  # 共享的WeChatApi实例
+        self._command_words: Set[str] = set()  # 所有插件配置中的触发关键词
+        self.router = TriggerIndex()  # 触发路由索引
+        limit_config = limit_config or {}
+        self._default_max_concurrency = limit_config.get('plugin_max_concurrency', 8)
+        self._default_timeout = limit_config.get('plugin_timeout', 60)
+        self._default_timeout_reply = limit_config.get('plugin_timeout_reply', '')
+        self.guards: Dict[str, PluginGuard] = {}  # 插件名 -> 并发/超时控制
+        self._default_rate_limit = {
+            key: limit_config[f'rate_limit_{key}']
+            for key in RATE_LIMIT_KEYS if f'rate_limit_{key}' in limit_config
+        }
+        self.rate_limits: Dict[str, RateLimit] = {}  # 插件名 -> 按发送者/群的频率限制
+        process_workers = limit_config.get('plugin_process_workers', 2)
+        self.process_pool = PluginProcessPool(process_workers) if process_workers > 0 else None  # 声明 run_in_process 的插件使用
+        self._generations: Dict[str, int] = {}  # 插件名 -> 热重载次数，子进程据此判断是否需要重新导入插件
+        self._plugin_dirs: Dict[str, str] = {}  # 插件目录名 -> 插件名
+        self._order: Dict[str, int] = {}  # 插件名 -> 加载顺序（懒加载的插件按目录顺序占位）
+        load_config = load_config or {}
+        self._lazy = load_config.get('lazy', True)
+        self._warm_names = list(load_config.get('warm', []))
+        self.manifests: Dict[str, PluginManifest] = {}  # 已登记但尚未导入的懒加载插件
+        self._reload_config = reload_config or {}
+        self._reload_lock = asyncio.Lock()  # 同一时间只重载一个插件
+        self._draining: Set[asyncio.Task] = set()  # 等待处理完已开始调用的旧实例
+        self.watcher: Optional[PluginWatcher] = None
         self._load_plugins()  # 加载插件
+        self._build_router()
         
     def _load_plugins(self) -> None:
         """加载插件目录下的所有插件"""
         try:
-            plugins_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Plugins")
-            for item in os.listdir(plugins_dir):
+            for item in sorted(os.listdir(PLUGINS_DIR)):
                 if item.startswith("_"):  # 跳过以_开头的目录
                     continue
-                    
-                plugin_dir = os.path.join(plugins_dir, item)
-                if not os.path.isdir(plugin_dir):
-                    continue
-                    
-                # 查找插件主文件
-                plugin_file = os.path.join(plugin_dir, f"{item}Plugin.py")
-                if not os.path.exists(plugin_file):
+                manifest = self._read_manifest(item)
+                if manifest is not None:
+                    # 有清单的插件只登记路由，第一次收到路由命中的消息时才导入
+                    self.manifests[manifest.name] = manifest
+                    self._plugin_dirs[item] = manifest.name
+                    self._order.setdefault(manifest.name, len(self._order))
+                    logger.info(f"已登记插件：{manifest.name}（收到消息时加载）")
                     continue
-                    
-                try:
-                    # 动态导入插件模块
-                    module_path = f"Plugins.{item}.{item}Plugin"
-                    module = importlib.import_module(module_path)
-                    
-                    # 查找插件类
-                    for name, obj in inspect.getmembers(module):
-                        if (inspect.isclass(obj) and
-                            issubclass(obj, PluginBase) and
-                            obj != PluginBase):
-                            # 实例化插件并存储
-                            plugin = obj()
-
-                            # 设置共享的WeChatApi实例
-                            plugin.dp = self.wechat_api
-                            #logger.debug(f"为插件 {plugin.name} 设置共享的WeChatApi实例")
-
-                            self.plugins[plugin.name] = plugin
-                            logger.info(f"成功加载插件：{plugin.name} v{plugin.version}")
-                            break
-                            
-                except Exception as e:
-                    logger.error(f"加载插件 {item} 失败: {e}")
-                    
+                plugin = self._create_plugin(item)
+                if plugin is not None:
+                    self.plugins[plugin.name] = plugin
+                    self._plugin_dirs[item] = plugin.name
+                    self._order.setdefault(plugin.name, len(self._order))
+                    logger.info(f"成功加载插件：{plugin.name} v{plugin.version}")
         except Exception as e:
             logger.error(f"加载插件目录失败: {e}")
-            
+
+    def _read_manifest(self, item: str) -> Optional[PluginManifest]:
+        """读取插件目录的懒加载清单，未启用懒加载、没有清单或清单声明不懒加载时返回 None"""
+        if not self._lazy:
+            return None
+        manifest = read_manifest(os.path.join(PLUGINS_DIR, item))
+        if manifest is None or not manifest.lazy or manifest.name == "Admin":  # 管理员插件需要查看所有消息
+            return None
+        return manifest
+
+    def _create_plugin(self, item: str, reload: bool = False) -> Optional[PluginBase]:
+        """
+        导入插件目录并实例化插件，设置共享的WeChatApi实例
+        Args:
+            item: 插件目录名
+            reload: 是否重新导入该插件目录下已导入的模块（热重载）
+        Returns:
+            Optional[PluginBase]: 插件实例，目录不是插件或加载失败时返回 None
+        """
+        plugin_dir = os.path.join(PLUGINS_DIR, item)
+        if not os.path.isdir(plugin_dir):
+            return None
+
+        # 查找插件主文件
+        plugin_file = os.path.join(plugin_dir, f"{item}Plugin.py")
+        if not os.path.exists(plugin_file):
+            return None
+
+        try:
+            # 动态导入插件模块
+            module_path = f"Plugins.{item}.{item}Plugin"
+            if reload:
+                importlib.invalidate_caches()
+                # 先重载插件目录下的辅助模块，再重载插件主模块
+                package = f"Plugins.{item}."
+                for name in sorted(n for n in list(sys.modules) if n.startswith(package) and n != module_path):
+                    importlib.reload(sys.modules[name])
+                module = sys.modules.get(module_path)
+                module = importlib.reload(module) if module is not None else importlib.import_module(module_path)
+            else:
+                module = importlib.import_module(module_path)
+
+            # 查找插件类
+            for name, obj in inspect.getmembers(module):
+                if (inspect.isclass(obj) and
+                    issubclass(obj, PluginBase) and
+                    obj != PluginBase and
+                    obj.__module__ == module.__name__):
+                    # 实例化插件
+                    plugin = obj()
+
+                    # 设置共享的WeChatApi实例
+                    plugin.dp = self.wechat_api
+                    #logger.debug(f"为插件 {plugin.name} 设置共享的WeChatApi实例")
+                    return plugin
+
+        except Exception as e:
+            logger.error(f"加载插件 {item} 失败: {e}", exc_info=reload)
+        return None
+
+    def _build_routing(self, plugins: Dict[str, PluginBase],
+                       manifests: Dict[str, PluginManifest]) -> Tuple[TriggerIndex, Set[str]]:
+        """
+        根据插件的 [Route] 配置和触发声明构建触发路由索引和指令关键词集合，不修改当前状态
+        尚未导入的插件按清单登记（清单字段与插件的触发声明属性同名）
+        """
+        router = TriggerIndex()
+        command_words: Set[str] = set()
+        entries = {**manifests, **plugins}
+        order = self._order
+        for plugin_name in sorted(entries, key=lambda name: order.get(name, len(order))):
+            plugin = entries[plugin_name]
+            config = plugin.config if isinstance(plugin, PluginManifest) else getattr(plugin, 'configData', None)
+            self._collect_command_words(config, command_words)
+            if plugin_name == "Admin":  # 管理员插件单独优先处理，不参与路由
+                continue
+            if not router.add_plugin(plugin_name, config, plugin):
+                logger.debug("插件 {} 未声明触发关键词，将查看所有消息", plugin_name)
+        router.build()
+        return router, command_words
+
+    def _build_router(self) -> None:
+        """根据已加载插件重建触发路由索引"""
+        self.router, self._command_words = self._build_routing(self.plugins, self.manifests)
+        logger.info(f"插件触发路由索引已建立: {self.router.stats()}")
+
+    def _route(self, msg):
+        """按触发路由索引返回可能处理该消息的插件（按加载顺序），尚未导入的插件实例为 None"""
+        for plugin_name in self.router.candidates(msg):
+            plugin = self.plugins.get(plugin_name)
+            if plugin is not None or plugin_name in self.manifests:
+                yield plugin_name, plugin
+
+    def _guard(self, plugin_name: str, plugin: PluginBase) -> PluginGuard:
+        """
+        获取插件的并发/超时控制，优先级: 插件 config.toml 的 [Limit] > 插件类属性 > 全局默认值
+        """
+        guard = self.guards.get(plugin_name)
+        if guard is None:
+            config = getattr(plugin, 'configData', None)
+            limit = config.get('Limit', {}) if isinstance(config, dict) else {}
+
+            def pick(key, default):
+                if key in limit:
+                    return limit[key]
+                value = getattr(plugin, key, None)
+                return default if value is None else value
+
+            guard = PluginGuard(
+                plugin_name,
+                max_concurrency=pick('max_concurrency', self._default_max_concurrency),
+                timeout=pick('timeout', self._default_timeout),
+                timeout_reply=pick('timeout_reply', self._default_timeout_reply)
+            )
+            self.guards[plugin_name] = guard
+        return guard
+
+    def _rate_limit(self, plugin_name: str, plugin: PluginBase) -> Optional[RateLimit]:
+        """
+        获取插件的频率限制，优先级: 插件 config.toml 的 [RateLimit] > 全局默认值，未启用时返回 None
+        管理员插件不做限制
+        """
+        if plugin_name == "Admin":
+            return None
+        rate_limit = self.rate_limits.get(plugin_name)
+        if rate_limit is None:
+            config = getattr(plugin, 'configData', None)
+            options = dict(self._default_rate_limit)
+            if isinstance(config, dict) and isinstance(config.get('RateLimit'), dict):
+                options.update((key, value) for key, value in config['RateLimit'].items() if key in RATE_LIMIT_KEYS)
+            rate_limit = RateLimit(plugin_name, **options)
+            self.rate_limits[plugin_name] = rate_limit
+        return rate_limit if rate_limit.enabled else None
+
+    async def _invoke(self, plugin_name: str, plugin: PluginBase, handler, msg) -> bool:
+        """在频率限制、并发上限和超时控制下调用插件的处理方法"""
+        current = self.plugins.get(plugin_name)
+        if current is not plugin:
+            # 判断期间插件被热重载或卸载：交给新实例处理，旧实例只需处理完已开始的调用
+            if current is None:
+                return False
+            plugin, handler = current, getattr(current, handler.__name__)
+        rate_limit = self._rate_limit(plugin_name, plugin)
+        if rate_limit is not None:
+            status = rate_limit.check(msg.sender, msg.roomid)
+            if status != RateLimit.STATUS_OK:
+                logger.debug("用户 {} 触发插件 {} 过于频繁，本条消息不处理", msg.sender, plugin_name)
+                if status == RateLimit.STATUS_LIMITED_NOTIFY and self.wechat_api:
+                    try:
+                        await self.wechat_api.sendText(rate_limit.reply, msg.roomid or msg.sender, msg.self_wxid)
+                    except Exception as e:
+                        logger.error(f"发送插件 {plugin_name} 频率限制提示失败: {e}")
+                return True  # 消息已命中该插件，不再交给其他插件
+        if plugin.run_in_process and self.process_pool is not None:
+            handler = self._process_handler(plugin_name, plugin, handler.__name__)
+        guard = self._guard(plugin_name, plugin)
+        token = current_plugin.set(plugin_name)  # 插件内发起的上游请求按插件合并
+        try:
+            status, result = await guard.call(handler, msg)
+        finally:
+            current_plugin.reset(token)
+        if status == PluginGuard.STATUS_REJECTED:
+            logger.warning(f"插件 {plugin_name} 并发数已达上限 {guard.max_concurrency}，本条消息不再交给该插件")
+            return False
+        if status == PluginGuard.STATUS_TIMEOUT:
+            logger.warning(f"插件 {plugin_name} 处理超时（{guard.timeout}秒），已取消")
+            if guard.timeout_reply and self.wechat_api:
+                try:
+                    await self.wechat_api.sendText(guard.timeout_reply, msg.roomid or msg.sender, msg.self_wxid)
+                except Exception as e:
+                    logger.error(f"发送插件 {plugin_name} 超时提示失败: {e}")
+            return True  # 插件已命中并开始处理，不再交给其他插件
+        return result
+
+    def _process_handler(self, plugin_name: str, plugin: PluginBase, handler_name: str):
+        """把插件的处理方法包装为在进程池中执行，插件返回的发送动作在主进程用共享的WeChatApi执行"""
+        async def run(msg):
+            result, actions = await self.process_pool.run(plugin, handler_name, msg, self._generations.get(plugin_name, 0))
+            for action in actions:
+                await getattr(self.wechat_api, action.method)(*action.args, **action.kwargs)
+            return result
+        return run
+
+    def plugin_stats(self) -> Dict[str, Dict]:
+        """各插件的调用、拒绝、超时、异常次数和频率限制统计"""
+        stats = {name: guard.stats() for name, guard in self.guards.items()}
+        for name, rate_limit in self.rate_limits.items():
+            if rate_limit.enabled:
+                stats.setdefault(name, {})['rate_limit'] = rate_limit.stats()
+        return stats
+
+    def _collect_command_words(self, config, words: Set[str]) -> None:
+        """递归收集插件配置中的关键词列表，用于判断指令消息"""
+        if isinstance(config, dict):
+            for key, value in config.items():
+                if key != 'Route':  # 路由配置里是关键词路径，不是关键词
+                    self._collect_command_words(value, words)
+        elif isinstance(config, list):
+            for word in config:
+                if isinstance(word, str) and word.strip():
+                    words.add(word.strip())
+                    words.add(normalize(word))
+
+    def is_command(self, msg) -> bool:
+        """判断消息是否可能触发插件指令（完全匹配或首个空格前的词匹配关键词，原文和规整后的文本都参与判断）"""
+        if msg.type != 1 or not msg.content:
+            return False
+        command = msg.command
+        words = self._command_words
+        return command.text in words or command.normalized in words or command.head in words
+
     def get_plugin(self, plugin_name: str) -> Optional[PluginBase]:
-        """获取指定名称的插件实例"""
+        """获取指定名称的插件实例（尚未导入的懒加载插件返回 None，可先调用 warm）"""
         return self.plugins.get(plugin_name)
         
     def get_all_plugins(self) -> Dict[str, PluginBase]:
@@ -80,33 +319,41 @@ class PluginManager:
                 # 检查是否应该由管理员插件处理
                 if await admin_plugin.should_handle_message(msg):
                     logger.debug("尝试使用 Admin 插件处理消息")
-                    if await admin_plugin.handle_admin_message(msg):
+                    if await self._invoke("Admin", admin_plugin, admin_plugin.handle_admin_message, msg):
                         logger.debug("Admin 插件成功处理了消息")
                         return True
 
             # 3. 处理私聊消息
             if msg.is_private:
                 logger.debug("开始处理私聊消息")
-                for plugin_name, plugin in self.plugins.items():
-                    if plugin_name == "Admin":  # 跳过管理员插件，因为已经处理过了
-                        continue
-                        
+                for plugin_name, plugin in self._route(msg):  # 只遍历路由索引筛选出的候选插件
                     try:
-                        logger.debug(f"检查插件 {plugin_name} 是否处理私聊消息")
+                        logger.debug("检查插件 {} 是否处理私聊消息", plugin_name)
+                        enabled = None
+                        if plugin is None:
+                            # 尚未导入的插件先检查插件配置，未启用的插件不会被导入
+                            enabled = await self.tools.judgePluginConfig("private", plugin_name)
+                            if not enabled:
+                                logger.debug("插件 {} 未启用私聊功能", plugin_name)
+                                continue
+                            plugin = await self.warm(plugin_name)
+                            if plugin is None:
+                                continue
+
                         # 检查插件是否应该处理该消息
                         if not await plugin.should_handle_message(msg):
-                            logger.debug(f"插件 {plugin_name} 不处理该消息")
+                            logger.debug("插件 {} 不处理该消息", plugin_name)
                             continue
                             
                         # 检查插件配置
-                        if not await self.tools.judgePluginConfig("private", plugin_name):
-                            logger.debug(f"插件 {plugin_name} 未启用私聊功能")
+                        if enabled is None and not await self.tools.judgePluginConfig("private", plugin_name):
+                            logger.debug("插件 {} 未启用私聊功能", plugin_name)
                             continue
                             
                         # 处理私聊消息
-                        logger.debug(f"尝试使用插件 {plugin_name} 处理私聊消息")
-                        if await plugin.handle_private_message(msg):
-                            logger.debug(f"插件 {plugin_name} 成功处理了私聊消息")
+                        logger.debug("尝试使用插件 {} 处理私聊消息", plugin_name)
+                        if await self._invoke(plugin_name, plugin, plugin.handle_private_message, msg):
+                            logger.debug("插件 {} 成功处理了私聊消息", plugin_name)
                             return True
                     except Exception as e:
                         logger.error(f"插件 {plugin_name} 处理私聊消息时出错: {e}", exc_info=True)
@@ -115,26 +362,34 @@ class PluginManager:
             # 4. 处理群聊消息
             else:
                 logger.debug("开始处理群聊消息")
-                for plugin_name, plugin in self.plugins.items():
-                    if plugin_name == "Admin":  # 跳过管理员插件，因为已经处理过了
-                        continue
-                        
+                for plugin_name, plugin in self._route(msg):  # 只遍历路由索引筛选出的候选插件
                     try:
-                        logger.debug(f"检查插件 {plugin_name} 是否处理群聊消息")
+                        logger.debug("检查插件 {} 是否处理群聊消息", plugin_name)
+                        enabled = None
+                        if plugin is None:
+                            # 尚未导入的插件先检查插件配置，未启用的插件不会被导入
+                            enabled = await self.tools.judgePluginConfig(msg.mode[0], plugin_name)
+                            if not enabled:
+                                logger.debug("插件 {} 在模式 {} 下未启用", plugin_name, msg.mode[0])
+                                continue
+                            plugin = await self.warm(plugin_name)
+                            if plugin is None:
+                                continue
+
                         # 检查插件是否应该处理该消息
                         if not await plugin.should_handle_message(msg):
-                            logger.debug(f"插件 {plugin_name} 不处理该消息")
+                            logger.debug("插件 {} 不处理该消息", plugin_name)
                             continue
                             
                         # 检查插件配置
-                        if not await self.tools.judgePluginConfig(msg.mode[0], plugin_name):
-                            logger.debug(f"插件 {plugin_name} 在模式 {msg.mode[0]} 下未启用")
+                        if enabled is None and not await self.tools.judgePluginConfig(msg.mode[0], plugin_name):
+                            logger.debug("插件 {} 在模式 {} 下未启用", plugin_name, msg.mode[0])
                             continue
                         
                         # 处理消息
-                        logger.debug(f"尝试使用插件 {plugin_name} 处理群聊消息")
-                        if await plugin.handle_message(msg):
-                            logger.debug(f"插件 {plugin_name} 成功处理了群聊消息")
+                        logger.debug("尝试使用插件 {} 处理群聊消息", plugin_name)
+                        if await self._invoke(plugin_name, plugin, plugin.handle_message, msg):
+                            logger.debug("插件 {} 成功处理了群聊消息", plugin_name)
                             return True
                     except Exception as e:
                         logger.error(f"插件 {plugin_name} 处理消息时出错: {e}", exc_info=True)
@@ -147,35 +402,192 @@ class PluginManager:
             logger.error(f"消息处理失败: {e}", exc_info=True)
             return False
         
+    async def start(self) -> None:
+        """事件循环启动后调用：执行插件的 on_load，并按配置启动插件目录监视"""
+        for plugin_name, plugin in list(self.plugins.items()):
+            try:
+                await plugin.on_load()
+            except Exception as e:
+                logger.error(f"插件 {plugin_name} 初始化失败: {e}", exc_info=True)
+        for plugin_name in self._warm_names:
+            if await self.warm(plugin_name) is None:
+                logger.warning(f"预热插件 {plugin_name} 失败")
+        if self._reload_config.get('enable', False) and self.watcher is None:
+            self.watcher = PluginWatcher(
+                PLUGINS_DIR,
+                on_change=self.load_plugin_dir,
+                on_remove=self.unload_plugin_dir,
+                interval=self._reload_config.get('interval', 2)
+            )
+            self.watcher.start()
+
     async def reload_plugin(self, plugin_name: str) -> bool:
         """重新加载指定插件"""
-        try:
-            plugin = self.plugins.get(plugin_name)
-            if not plugin:
-                logger.error(f"插件 {plugin_name} 不存在")
+        plugin = self.plugins.get(plugin_name)
+        if plugin is not None:
+            # 插件模块路径为 Plugins.<目录名>.<目录名>Plugin
+            return await self.load_plugin_dir(plugin.__class__.__module__.split('.')[1])
+        if plugin_name in self.manifests:
+            return await self.load_plugin_dir(self.manifests[plugin_name].dir)
+        logger.error(f"插件 {plugin_name} 不存在")
+        return False
+
+    async def warm(self, plugin_name: str) -> Optional[PluginBase]:
+        """
+        导入并初始化尚未加载的插件，第一次收到路由命中的消息时自动调用，也可以提前调用预热
+        Returns:
+            Optional[PluginBase]: 插件实例，插件不存在或加载失败时返回 None
+        """
+        plugin = self.plugins.get(plugin_name)
+        if plugin is not None:
+            return plugin
+        manifest = self.manifests.get(plugin_name)
+        if manifest is None:
+            return None
+        async with self._reload_lock:
+            if plugin_name in self.manifests:  # 等待锁期间可能已被其他消息加载
+                start = time.perf_counter()
+                if await self._load_dir(manifest.dir, defer=False):
+                    logger.info(f"插件 {plugin_name} 按需加载耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+                elif plugin_name in self.manifests:
+                    # 加载失败的插件不再参与路由，避免每条消息都重复导入；修改插件文件后由热重载重新登记
+                    manifests = dict(self.manifests)
+                    manifests.pop(plugin_name)
+                    router, command_words = self._build_routing(self.plugins, manifests)
+                    self._swap(self.plugins, manifests, router, command_words)
+        return self.plugins.get(plugin_name)
+
+    async def load_plugin_dir(self, item: str) -> bool:
+        """
+        加载或重新加载插件目录（热重载调用）
+        已导入的插件在旁边构建并初始化新实例，路由索引也先在旁边重建，全部成功后才一次性替换；
+        失败时继续使用旧实例。旧实例不再接收新消息，已开始的调用处理完后再关闭。
+        尚未导入的懒加载插件只重新读取清单。
+        Args:
+            item: 插件目录名
+        Returns:
+            bool: 是否加载成功
+        """
+        async with self._reload_lock:
+            return await self._load_dir(item, defer=True)
+
+    async def _load_dir(self, item: str, defer: bool) -> bool:
+        """
+        加载插件目录，调用方需持有 _reload_lock
+        Args:
+            item: 插件目录名
+            defer: 插件尚未导入且有清单时是否只登记清单
+        """
+        old_name = self._plugin_dirs.get(item)
+        old_plugin = self.plugins.get(old_name) if old_name else None
+
+        manifest = self._read_manifest(item) if defer and old_plugin is None else None
+        if manifest is not None:
+            if manifest.name != old_name and (manifest.name in self.plugins or manifest.name in self.manifests):
+                logger.error(f"插件目录 {item} 中的插件名 {manifest.name} 与已加载的插件重复，放弃加载")
                 return False
-                
-            # 获取插件模块路径
-            module_path = plugin.__class__.__module__
-            # 重新加载模块
-            module = importlib.reload(importlib.import_module(module_path))
-            
-            # 查找插件类
-            for name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and 
-                    issubclass(obj, PluginBase) and 
-                    obj != PluginBase):
-                    # 实例化插件并更新
-                    self.plugins[plugin_name] = obj()
-                    logger.info(f"成功重新加载插件：{plugin_name}")
-                    return True
-                    
+            manifests = dict(self.manifests)
+            manifests.pop(old_name, None)
+            manifests[manifest.name] = manifest
+            self._order.setdefault(manifest.name, len(self._order))
+            try:
+                router, command_words = self._build_routing(self.plugins, manifests)
+            except Exception as e:
+                logger.error(f"插件 {manifest.name} 路由配置有误: {e}", exc_info=True)
+                return False
+            self._swap(self.plugins, manifests, router, command_words)
+            self._plugin_dirs[item] = manifest.name
+            logger.info(f"已登记插件：{manifest.name}（收到消息时加载）")
+            return True
+
+        plugin = self._create_plugin(item, reload=True)
+        if plugin is None:
+            if old_plugin is not None:
+                logger.error(f"重新加载插件 {old_name} 失败，继续使用旧版本")
             return False
-            
+        if plugin.name != old_name and (plugin.name in self.plugins or plugin.name in self.manifests):
+            logger.error(f"插件目录 {item} 中的插件名 {plugin.name} 与已加载的插件重复，放弃加载")
+            return False
+        if old_name and plugin.name != old_name and old_plugin is None:
+            logger.warning(f"插件目录 {item} 清单中的插件名 {old_name} 与插件名 {plugin.name} 不一致")
+        try:
+            await plugin.on_load()
+        except Exception as e:
+            logger.error(f"插件 {plugin.name} 初始化失败，继续使用旧版本: {e}", exc_info=True)
+            return False
+
+        plugins = dict(self.plugins)
+        manifests = dict(self.manifests)
+        if old_name and old_name != plugin.name:
+            plugins.pop(old_name, None)
+            manifests.pop(old_name, None)
+        plugins[plugin.name] = plugin
+        manifests.pop(plugin.name, None)
+        self._order.setdefault(plugin.name, self._order.get(old_name, len(self._order)))
+        try:
+            router, command_words = self._build_routing(plugins, manifests)
         except Exception as e:
-            logger.error(f"重新加载插件 {plugin_name} 失败: {e}")
+            logger.error(f"插件 {plugin.name} 路由配置有误，继续使用旧版本: {e}", exc_info=True)
             return False
 
+        self._swap(plugins, manifests, router, command_words)
+        self._plugin_dirs[item] = plugin.name
+        self._generations[plugin.name] = self._generations.get(plugin.name, 0) + 1
+        if old_plugin is not None:
+            self._retire(old_name, old_plugin)
+            logger.info(f"成功重新加载插件：{plugin.name} v{plugin.version}")
+        else:
+            logger.info(f"成功加载插件：{plugin.name} v{plugin.version}")
+        return True
+
+    async def unload_plugin_dir(self, item: str) -> bool:
+        """卸载插件目录对应的插件（插件目录被删除时调用）"""
+        async with self._reload_lock:
+            plugin_name = self._plugin_dirs.pop(item, None)
+            if plugin_name is None or (plugin_name not in self.plugins and plugin_name not in self.manifests):
+                return False
+            plugins = dict(self.plugins)
+            old_plugin = plugins.pop(plugin_name, None)
+            manifests = dict(self.manifests)
+            manifests.pop(plugin_name, None)
+            router, command_words = self._build_routing(plugins, manifests)
+            self._swap(plugins, manifests, router, command_words)
+            if old_plugin is not None:
+                self._retire(plugin_name, old_plugin)
+            logger.info(f"已卸载插件：{plugin_name}")
+            return True
+
+    def _swap(self, plugins: Dict[str, PluginBase], manifests: Dict[str, PluginManifest],
+              router: TriggerIndex, command_words: Set[str]) -> None:
+        """一次性替换插件字典、待加载清单、路由索引和指令关键词（中间没有 await，处理中的消息不会看到不一致的状态）"""
+        self.plugins = plugins
+        self.manifests = manifests
+        self.router = router
+        self._command_words = command_words
+
+    def _retire(self, plugin_name: str, old_plugin: PluginBase) -> None:
+        """让被替换的旧实例在后台处理完已开始的调用后关闭"""
+        old_guard = self.guards.pop(plugin_name, None)  # 新实例按新配置重新创建并发/超时控制和频率限制
+        self.rate_limits.pop(plugin_name, None)
+        task = asyncio.create_task(self._drain(plugin_name, old_plugin, old_guard))
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
+
+    async def _drain(self, plugin_name: str, plugin: PluginBase, guard: Optional[PluginGuard]) -> None:
+        """等待旧实例的调用结束（最多 drain_timeout 秒）后关闭旧实例"""
+        drain_timeout = self._reload_config.get('drain_timeout', 60)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + drain_timeout
+        while guard is not None and guard.running and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+        if guard is not None and guard.running:
+            logger.warning(f"插件 {plugin_name} 旧实例仍有 {guard.running} 个调用未结束，已等待 {drain_timeout} 秒，直接关闭")
+        try:
+            if hasattr(plugin, 'close') and callable(plugin.close):
+                await plugin.close()
+        except Exception as e:
+            logger.error(f"关闭插件 {plugin_name} 旧实例时出错: {e}")
+
     async def handle_admin_message(self, msg) -> bool:
         """专门处理管理员插件的消息，不受群组模式影响"""
         try:
@@ -193,27 +605,27 @@ class PluginManager:
         try:
             # 遍历所有插件处理消息
             for plugin_name, plugin in self.plugins.items():
-                logger.debug(f"正在检查私聊插件: {plugin_name}")
+                logger.debug("正在检查私聊插件: {}", plugin_name)
                 try:
                     # 检查插件是否支持私聊
                     if not hasattr(plugin, 'handle_private_message'):
-                        logger.debug(f"插件 {plugin_name} 不支持私聊，跳过")
+                        logger.debug("插件 {} 不支持私聊，跳过", plugin_name)
                         continue
 
                     # 检查插件是否启用（私聊模式下）
                     plugin_enabled = self.tools.judgePluginConfig("private", plugin_name)
-                    logger.debug(f"插件 {plugin_name} 在私聊模式下的启用状态: {plugin_enabled}")
+                    logger.debug("插件 {} 在私聊模式下的启用状态: {}", plugin_name, plugin_enabled)
                     
                     if not plugin_enabled:
-                        logger.debug(f"插件 {plugin_name} 在私聊模式下未启用，跳过")
+                        logger.debug("插件 {} 在私聊模式下未启用，跳过", plugin_name)
                         continue
                         
                     # 让插件处理消息
                     if await plugin.handle_private_message(msg):
-                        logger.debug(f"插件 {plugin_name} 成功处理了私聊消息")
+                        logger.debug("插件 {} 成功处理了私聊消息", plugin_name)
                         return True
                     else:
-                        logger.debug(f"插件 {plugin_name} 未处理私聊消息")
+                        logger.debug("插件 {} 未处理私聊消息", plugin_name)
                         
                 except Exception as e:
                     logger.error(f"插件 {plugin_name} 处理私聊消息时出错: {e}")
@@ -228,6 +640,19 @@ class PluginManager:
     async def close(self):
         """关闭插件管理器，清理资源"""
         try:
+            if self.watcher:
+                await self.watcher.close()
+                self.watcher = None
+            if self._draining:
+                await asyncio.gather(*self._draining, return_exceptions=True)
+            if self.guards or self.rate_limits:
+                logger.info(f"插件调用统计: {self.plugin_stats()}")
+            flight_stats = upstream_flights.stats()
+            if flight_stats:
+                logger.info(f"插件上游请求合并统计（calls: 请求次数, saved: 合并掉的请求数）: {flight_stats}")
+            if admin_cache.admin_lookups:
+                logger.info(f"管理员缓存统计（lookups: 省下的数据库查询, not_admin_fast: 直接判定为非管理员）: "
+                            f"{admin_cache.admin_stats()}")
             # 关闭所有插件
             for plugin_name, plugin in self.plugins.items():
                 try:
@@ -236,6 +661,10 @@ class PluginManager:
                 except Exception as e:
                     logger.error(f"关闭插件 {plugin_name} 时出错: {e}")
 
+            # 关闭插件进程池
+            if self.process_pool:
+                self.process_pool.close()
+
             # 清理插件列表
             self.plugins.clear()
             
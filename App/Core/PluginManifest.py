@@ -0,0 +1,68 @@
+import os
+import tomllib
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from Config.logger import logger
+
+
+class PluginManifest(NamedTuple):
+    """
+    插件清单，来自插件 config.toml 的 [Manifest] 表：
+        [Manifest]
+        name = "Menu"        # 插件名，需与插件类中的 self.name 一致
+        lazy = true          # 是否在第一次收到路由命中的消息时才导入插件
+        msg_types = [1]      # 接收的消息类型，省略表示全部
+        private_ok = true    # 是否接收私聊消息，省略表示接收
+        keyword = []         # 以下为可选的触发关键词，与 [Route] 中引用的关键词合并
+        prefix = []
+        contains = []
+        regex = []
+    字段名与 PluginBase 的触发声明属性一致，插件未导入前 TriggerIndex 直接按清单建立路由
+    """
+    dir: str
+    name: str
+    lazy: bool
+    on_keyword: Tuple[str, ...]
+    on_prefix: Tuple[str, ...]
+    on_contains: Tuple[str, ...]
+    on_regex: Tuple[str, ...]
+    on_msg_types: Optional[Tuple[int, ...]]
+    private_ok: bool
+    config: Dict[str, Any]  # config.toml 的全部内容，用于读取 [Route] 和指令关键词
+
+
+def read_manifest(plugin_dir: str) -> Optional[PluginManifest]:
+    """
+    读取插件目录下 config.toml 中的 [Manifest]（只解析 TOML，不导入插件代码）
+    Returns:
+        Optional[PluginManifest]: 插件清单，没有 config.toml、没有 [Manifest] 或格式有误时返回 None
+    """
+    config_path = os.path.join(plugin_dir, "config.toml")
+    try:
+        with open(config_path, "rb") as f:
+            config = tomllib.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        logger.error(f"读取插件配置 {config_path} 失败: {e}")
+        return None
+
+    manifest = config.get("Manifest")
+    if not isinstance(manifest, dict):
+        return None
+    name = manifest.get("name")
+    if not name:
+        logger.warning(f"插件配置 {config_path} 的 [Manifest] 缺少 name")
+        return None
+    msg_types = manifest.get("msg_types")
+    return PluginManifest(
+        dir=os.path.basename(os.path.normpath(plugin_dir)),
+        name=name,
+        lazy=bool(manifest.get("lazy", True)),
+        on_keyword=tuple(manifest.get("keyword", ())),
+        on_prefix=tuple(manifest.get("prefix", ())),
+        on_contains=tuple(manifest.get("contains", ())),
+        on_regex=tuple(manifest.get("regex", ())),
+        on_msg_types=tuple(msg_types) if msg_types is not None else None,
+        private_ok=bool(manifest.get("private_ok", True)),
+        config=config,
+    )
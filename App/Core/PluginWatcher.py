@@ -0,0 +1,108 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+from Config.logger import logger
+
+# 参与变更检测的文件类型（插件代码和插件配置）
+WATCH_SUFFIXES = (".py", ".toml")
+
+Signature = Dict[str, Tuple[int, int]]
+
+
+def snapshot_dir(path: str) -> Signature:
+    """
+    记录插件目录下代码和配置文件的 (修改时间, 大小)，跳过 __pycache__ 等以 _ 或 . 开头的子目录
+    """
+    signature: Signature = {}
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith(("_", "."))]
+        for file in files:
+            if file.endswith(WATCH_SUFFIXES):
+                file_path = os.path.join(root, file)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:  # 扫描过程中被删除
+                    continue
+                signature[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return signature
+
+
+class PluginWatcher:
+    """
+    轮询 Plugins 目录，发现某个插件目录下的文件变化后只重载该插件
+    不依赖 inotify 等平台相关机制；编辑器保存文件往往分几次写入，
+    检测到变化后要等目录在下一次轮询时保持不变才触发，避免加载到写了一半的文件
+    """
+    def __init__(self, plugins_dir: str, on_change: Callable[[str], Awaitable], on_remove: Callable[[str], Awaitable],
+                 interval: float = 2.0):
+        """
+        Args:
+            plugins_dir: 插件根目录
+            on_change: 插件目录新增或发生变化时调用，参数为目录名
+            on_remove: 插件目录被删除时调用，参数为目录名
+            interval: 轮询间隔（秒）
+        """
+        self.plugins_dir = plugins_dir
+        self.on_change = on_change
+        self.on_remove = on_remove
+        self.interval = max(0.1, float(interval))
+        self._signatures: Dict[str, Signature] = {}
+        self._pending: Set[str] = set()  # 已检测到变化、等待文件稳定的目录
+        self._task: Optional[asyncio.Task] = None
+
+    def _plugin_dirs(self) -> Set[str]:
+        try:
+            return {item for item in os.listdir(self.plugins_dir)
+                    if not item.startswith(("_", ".")) and os.path.isdir(os.path.join(self.plugins_dir, item))}
+        except OSError as e:
+            logger.error(f"读取插件目录失败: {e}")
+            return set(self._signatures)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        # 以启动时的状态为基准，已加载的插件不会被重复加载
+        for item in self._plugin_dirs():
+            self._signatures[item] = snapshot_dir(os.path.join(self.plugins_dir, item))
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"插件热重载已启用，轮询间隔 {self.interval} 秒")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"检查插件文件变化失败: {e}", exc_info=True)
+
+    async def poll(self) -> None:
+        """检查一次插件目录变化，并对已稳定的变化触发回调"""
+        current = self._plugin_dirs()
+        for item in sorted(set(self._signatures) - current):
+            del self._signatures[item]
+            self._pending.discard(item)
+            await self.on_remove(item)
+
+        ready = []
+        for item in sorted(current):
+            signature = snapshot_dir(os.path.join(self.plugins_dir, item))
+            if signature != self._signatures.get(item):
+                self._signatures[item] = signature
+                self._pending.add(item)  # 刚发生变化，下一轮确认稳定后再处理
+            elif item in self._pending:
+                self._pending.discard(item)
+                ready.append(item)
+
+        for item in ready:
+            logger.info(f"检测到插件目录 {item} 发生变化")
+            await self.on_change(item)
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from Config.logger import logger
+
+
+class SendAction(NamedTuple):
+    """插件在子进程中调用的发送接口，交回主进程用共享的 WeChatApi 执行"""
+    method: str
+    args: tuple
+    kwargs: dict
+
+
+class ActionRecorder:
+    """
+    子进程中替代 plugin.dp 的对象：记录 send* 接口的调用而不真正发送
+    子进程没有登录态和发送队列，其他需要返回值的接口（查询群成员等）不可用
+    """
+    def __init__(self):
+        self.actions: List[SendAction] = []
+
+    def __getattr__(self, name: str):
+        if not name.startswith("send"):
+            raise AttributeError(f"插件子进程中只能调用发送接口，不支持 {name}")
+
+        async def record(*args, **kwargs):
+            self.actions.append(SendAction(name, args, kwargs))
+            return {}
+        return record
+
+
+# 以下状态只存在于子进程中
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_plugins: Dict[Tuple[str, str], Tuple[int, Any]] = {}  # (模块, 类名) -> (版本, 插件实例)
+
+
+def _worker_plugin(module_path: str, class_name: str, generation: int):
+    """子进程中按模块和类名创建插件实例并缓存，主进程热重载后（版本变化）重新导入"""
+    key = (module_path, class_name)
+    cached = _plugins.get(key)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    module = importlib.import_module(module_path)
+    if cached is not None:
+        module = importlib.reload(module)
+    plugin = getattr(module, class_name)()
+    _plugins[key] = (generation, plugin)
+    return plugin
+
+
+def run_in_worker(module_path: str, class_name: str, generation: int, handler_name: str,
+                  snapshot: tuple) -> Tuple[Any, List[SendAction]]:
+    """
+    子进程入口：还原消息并调用插件的处理方法
+    Returns:
+        Tuple[Any, List[SendAction]]: (处理方法的返回值, 需要主进程执行的发送动作)
+    """
+    global _loop
+    from Core.msg import WxMsg
+    if _loop is None:
+        # 子进程内复用同一个事件循环，插件持有的异步客户端可以跨消息使用
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    plugin = _worker_plugin(module_path, class_name, generation)
+    recorder = ActionRecorder()
+    plugin.dp = recorder
+    result = _loop.run_until_complete(getattr(plugin, handler_name)(WxMsg.from_snapshot(snapshot)))
+    return result, recorder.actions
+
+
+class PluginProcessPool:
+    """
+    插件进程池，供声明了 run_in_process 的插件使用，CPU 密集的处理不会阻塞主进程的事件循环
+    子进程用 spawn 方式启动（不继承主进程的事件循环和线程），第一次使用时才创建
+    """
+    def __init__(self, workers: int):
+        """
+        Args:
+            workers: 子进程数量
+        """
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"插件进程池已启动，子进程数 {self.workers}")
+        return self._executor
+
+    async def run(self, plugin, handler_name: str, msg, generation: int = 0) -> Tuple[Any, List[SendAction]]:
+        """
+        在子进程中调用插件的处理方法
+        Args:
+            plugin: 主进程中的插件实例（只用于确定插件类）
+            handler_name: 处理方法名（handle_message / handle_private_message）
+            msg: WxMsg
+            generation: 插件版本，热重载后递增，子进程据此重新导入插件
+        Returns:
+            Tuple[Any, List[SendAction]]: (处理方法的返回值, 需要主进程执行的发送动作)
+        """
+        cls = type(plugin)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), run_in_worker, cls.__module__, cls.__name__,
+                                              generation, handler_name, msg.snapshot())
+        except BrokenProcessPool:
+            # 子进程异常退出（如崩溃或被杀死）后进程池不可再用，下次调用时重新创建
+            logger.error("插件进程池中的子进程异常退出，将重新创建进程池")
+            self._executor = None
+            raise
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,143 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class TokenBuckets:
+    """
+    按键（发送者 / 群）区分的令牌桶集合
+    每个键每秒补充 rate 个令牌，最多积累 burst 个，每次请求消耗一个令牌。
+    按最近访问顺序保存：空闲到令牌补满的桶与新桶等价，直接淘汰；
+    键数量超过 max_keys 时淘汰最久未访问的桶，内存占用有上限。
+    """
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 令牌上限（允许连续请求的次数）
+            max_keys: 最多保存的桶数量
+        """
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.max_keys = max(1, int(max_keys))
+        self.idle_ttl = self.burst / self.rate  # 空闲这么久后令牌必然已补满
+        self._buckets: "OrderedDict[Hashable, List]" = OrderedDict()  # 键 -> [令牌数, 上次更新时间, 是否已提示]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict(self, now: float) -> None:
+        """淘汰已补满和超出容量的桶"""
+        buckets = self._buckets
+        deadline = now - self.idle_ttl
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if oldest[1] >= deadline:
+                break
+            buckets.popitem(last=False)
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+
+    def acquire(self, key: Hashable, now: float) -> List:
+        """
+        为 key 消耗一个令牌
+        Returns:
+            List: 桶状态 [令牌数, 上次更新时间, 是否已提示]，令牌数小于 0 表示本次请求超限（未消耗）
+        """
+        self._evict(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now, False]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[2] = False
+        else:
+            bucket[0] -= 1  # 先扣除，调用方确认超限后再退回
+        return bucket
+
+    @staticmethod
+    def refund(bucket: List) -> None:
+        bucket[0] += 1
+
+
+class RateLimit:
+    """
+    单个插件的频率限制：每个发送者一个令牌桶，每个群一个令牌桶，两者都有令牌时才放行
+    默认值来自 Config.toml [DispatchConfig] 的 rate_limit_*，插件可在自己的 config.toml 中单独配置
+    （省略的键沿用默认值）:
+        [RateLimit]
+        sender_rate = 0.05   # 每个用户每秒恢复的次数，0 表示不限制
+        sender_burst = 3     # 每个用户最多连续触发的次数
+        room_rate = 0.2      # 每个群每秒恢复的次数，0 表示不限制
+        room_burst = 10      # 每个群最多连续触发的次数
+        reply = "..."        # 超限时的回复（每轮超限只回复一次）
+    """
+    STATUS_OK = "ok"
+    STATUS_LIMITED = "limited"          # 超限，静默丢弃
+    STATUS_LIMITED_NOTIFY = "notify"    # 超限，且本轮超限还没有提示过，需要回复一次
+
+    def __init__(self, name: str, sender_rate: float = 0, sender_burst: int = 1, room_rate: float = 0,
+                 room_burst: int = 1, reply: str = "", max_keys: int = 10000):
+        """
+        Args:
+            name: 插件名
+            sender_rate / sender_burst: 每个发送者每秒补充的次数和最多连续触发次数，rate 为 0 表示不限制
+            room_rate / room_burst: 每个群每秒补充的次数和最多连续触发次数，rate 为 0 表示不限制
+            reply: 超限时回复的内容（每轮超限只回复一次），为空则直接丢弃
+            max_keys: 每类令牌桶最多保存的数量
+        """
+        self.name = name
+        self.reply = reply or ""
+        self.senders: Optional[TokenBuckets] = TokenBuckets(sender_rate, sender_burst, max_keys) if sender_rate > 0 else None
+        self.rooms: Optional[TokenBuckets] = TokenBuckets(room_rate, room_burst, max_keys) if room_rate > 0 else None
+        self.allowed = 0
+        self.limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.senders is not None or self.rooms is not None
+
+    def check(self, sender: Optional[str], roomid: Optional[str], now: Optional[float] = None) -> str:
+        """
+        检查并记录一次请求
+        Args:
+            sender: 发送者 wxid
+            roomid: 群聊 ID，私聊为 None
+        Returns:
+            str: STATUS_OK / STATUS_LIMITED / STATUS_LIMITED_NOTIFY
+        """
+        now = time.monotonic() if now is None else now
+        acquired = []
+        if self.senders is not None and sender:
+            acquired.append(self.senders.acquire(sender, now))
+        if self.rooms is not None and roomid:
+            acquired.append(self.rooms.acquire(roomid, now))
+
+        limited = [bucket for bucket in acquired if bucket[0] < 0]
+        if not limited:
+            self.allowed += 1
+            return self.STATUS_OK
+
+        # 超限的请求不消耗任何令牌
+        for bucket in acquired:
+            TokenBuckets.refund(bucket)
+        self.limited += 1
+        if not self.reply or all(bucket[2] for bucket in limited):
+            return self.STATUS_LIMITED
+        for bucket in limited:
+            bucket[2] = True
+        return self.STATUS_LIMITED_NOTIFY
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "senders": len(self.senders) if self.senders is not None else 0,
+            "rooms": len(self.rooms) if self.rooms is not None else 0,
+        }
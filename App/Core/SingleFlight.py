@@ -0,0 +1,73 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# 当前正在处理消息的插件名，由 PluginManager 在调用插件前设置，用于按插件区分合并的请求
+current_plugin: ContextVar[str] = ContextVar("current_plugin", default="")
+
+
+def request_key(method: str, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                *extra: Hashable) -> Tuple:
+    """
+    把请求规整为可比较的键：URL 中的查询参数与 params 合并后排序，参数顺序不同的相同请求得到同一个键
+    """
+    parts = urlsplit(url.strip())
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    return (
+        method.upper(),
+        parts.scheme.lower(), parts.netloc.lower(), parts.path,
+        tuple(sorted(query)),
+        tuple(sorted(headers.items())) if headers else (),
+    ) + extra
+
+
+class SingleFlight:
+    """
+    相同请求合并：同一插件的相同请求正在进行时，后来的调用不再发起请求，而是等待并共享同一个结果
+    合并只发生在请求进行期间，请求结束后的调用会重新发起请求，不会拿到过期数据。
+    共享的结果是同一个对象，调用方不应修改它。
+    """
+    def __init__(self):
+        self._flights: Dict[Tuple, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}  # 插件名 -> {"calls": 调用次数, "saved": 合并掉的请求数}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行或加入一次请求
+        Args:
+            key: 规整后的请求（见 request_key），会和当前插件名组合
+            func: 实际发起请求的协程函数
+        Returns:
+            Any: 请求结果
+        """
+        plugin = current_plugin.get()
+        flight_key = (plugin, key)
+        stats = self._stats.get(plugin)
+        if stats is None:
+            stats = self._stats[plugin] = {"calls": 0, "saved": 0}
+        stats["calls"] += 1
+
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            # 请求放在独立的任务中执行，发起请求的调用被取消（如插件超时）时其他等待者不受影响
+            flight = asyncio.ensure_future(func())
+            self._flights[flight_key] = flight
+            flight.add_done_callback(lambda done: self._finish(flight_key, done))
+        else:
+            stats["saved"] += 1
+        return await asyncio.shield(flight)
+
+    def _finish(self, flight_key: Tuple, flight: asyncio.Future) -> None:
+        if self._flights.get(flight_key) is flight:
+            del self._flights[flight_key]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各插件的请求次数和合并掉的请求数"""
+        return {plugin or "-": dict(stats) for plugin, stats in self._stats.items()}
+
+
+# 插件上游 HTTP 请求共用的合并器（Tool.async_get 使用）
+upstream_flights = SingleFlight()
@@ -0,0 +1,70 @@
+import gzip
+import os
+import struct
+import time
+from typing import Iterator, Optional, Tuple
+from Config.logger import logger
+
+# 每条记录: 到达时间戳(double) + 消息长度(uint32) + UTF-8 消息内容，整体 gzip 压缩
+_RECORD_HEADER = struct.Struct('<dI')
+
+
+class TrafficRecorder:
+    """
+    原始消息录制器
+    按到达顺序把原始消息及到达时间追加写入压缩日志，供 Bench/ReplayBench.py 回放压测
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 录制文件路径（.gz），已存在时追加写入
+        """
+        self.path = path
+        self.recorded = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = gzip.open(path, mode='ab')
+        logger.info(f"原始消息录制已开启: {path}")
+
+    def record(self, message, arrival: Optional[float] = None) -> None:
+        """
+        追加一条原始消息
+        Args:
+            message: 原始消息（str 或 bytes）
+            arrival: 到达时间戳，默认当前时间
+        """
+        if self._file is None:
+            return
+        data = message.encode('utf-8') if isinstance(message, str) else bytes(message)
+        self._file.write(_RECORD_HEADER.pack(arrival or time.time(), len(data)))
+        self._file.write(data)
+        self.recorded += 1
+
+    def close(self) -> None:
+        """刷新并关闭录制文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"原始消息录制已关闭，共录制 {self.recorded} 条: {self.path}")
+
+
+def read_traffic(path: str) -> Iterator[Tuple[float, str]]:
+    """
+    读取录制文件
+    Args:
+        path: 录制文件路径
+    Yields:
+        Tuple[float, str]: (到达时间戳, 原始消息)
+    """
+    with gzip.open(path, mode='rb') as f:
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            arrival, length = _RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                logger.warning(f"录制文件末尾记录不完整，已忽略: {path}")
+                return
+            yield arrival, data.decode('utf-8', errors='replace')
@@ -0,0 +1,276 @@
+import re
+from collections import deque
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from Config.logger import logger
+from Core.Command import normalize
+
+# 路由匹配方式，对应插件 config.toml 中 [Route] 的键
+ROUTE_EXACT = "exact"        # 规整后完全相等（judgeEqualListWord）
+ROUTE_PREFIX = "prefix"      # 以关键词开头（judgeSplitAllEqualWord / judgeOneEqualListWord）
+ROUTE_CONTAINS = "contains"  # 包含关键词（judgeInListWord）
+ROUTE_KINDS = (ROUTE_EXACT, ROUTE_PREFIX, ROUTE_CONTAINS)
+# PluginBase 上的触发声明属性 -> 路由匹配方式
+PLUGIN_TRIGGER_ATTRS = (("on_keyword", ROUTE_EXACT), ("on_prefix", ROUTE_PREFIX), ("on_contains", ROUTE_CONTAINS))
+
+
+class PrefixTrie:
+    """前缀树：找出文本开头命中的所有关键词"""
+
+    __slots__ = ('_root',)
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def add(self, word: str, value: str) -> None:
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        node.setdefault(None, set()).add(value)
+
+    def match(self, text: str, out: Set[str]) -> None:
+        """把以 text 开头命中的关键词对应的值加入 out，耗时只和最长关键词长度有关"""
+        node = self._root
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                return
+            values = node.get(None)
+            if values:
+                out.update(values)
+
+
+class AhoCorasick:
+    """Aho-Corasick 自动机：一次扫描找出文本中出现的所有关键词"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+        self._built = True
+
+    def add(self, word: str, value: str) -> None:
+        state = 0
+        for char in word:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = nxt
+        self._output[state].add(value)
+        self._built = False
+
+    def build(self) -> None:
+        """按广度优先计算失败指针，并把失败链上的输出合并到当前状态"""
+        goto, fail_of, output = self._goto, self._fail, self._output
+        queue = deque(goto[0].values())
+        for state in queue:
+            fail_of[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                fail = fail_of[state]
+                while fail and char not in goto[fail]:
+                    fail = fail_of[fail]
+                fail_of[nxt] = goto[fail].get(char, 0)
+                output[nxt] |= output[fail_of[nxt]]
+        self._built = True
+
+    def match(self, text: str, out: Set[str]) -> None:
+        """把 text 中出现的关键词对应的值加入 out"""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                out.update(output[state])
+
+
+def resolve_words(config: Any, path: str) -> Optional[List[str]]:
+    """
+    按点分路径（如 "wenan.tg"）取出插件配置中的关键词，路径指向表时递归收集其中所有关键词列表
+    Returns:
+        Optional[List[str]]: 关键词列表，路径不存在时返回 None
+    """
+    node = config
+    for part in path.split('.'):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    words: List[str] = []
+
+    def collect(value):
+        if isinstance(value, str):
+            if value.strip():
+                words.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    collect(node)
+    return words
+
+
+class TriggerIndex:
+    """
+    插件触发路由索引
+    加载插件时读取各插件 config.toml 中的 [Route]：
+        [Route]
+        exact = ['menu']          # 完全匹配，值为本配置中关键词（列表）的路径
+        prefix = ['musicword']    # 以关键词开头
+        contains = ['dyWord']     # 包含关键词
+    声明了 [Route] 但引用的关键词全部为空的插件不会收到任何消息，
+    不需要路由的插件不写 [Route]，作为需要查看所有消息的插件处理。
+    以及插件类上的触发声明（PluginBase.on_keyword / on_prefix / on_contains / on_regex /
+    on_msg_types / private_ok）和 register_command 注册的命令。
+    每条消息只需一次哈希查找、一次前缀树遍历和一次自动机扫描即可得到候选插件，
+    耗时与插件数量无关（正则触发除外）。没有声明任何关键词的插件视为需要查看所有消息，
+    始终作为候选；声明了消息类型或不接收私聊的插件在此阶段按类型和会话过滤。
+    索引只负责筛选候选插件，插件内部的判断逻辑保持不变。
+    完全匹配和前缀匹配的关键词同时按原文（去掉首尾空白）和规整后（Command.normalized 的规则）登记，
+    消息的 text 和 normalized 都参与匹配，"@机器人 菜单"、"点歌　晴天" 与 "菜单"、"点歌 晴天" 得到相同的候选插件。
+    """
+    def __init__(self):
+        self._exact: Dict[str, Set[str]] = {}
+        self._prefix = PrefixTrie()
+        self._contains = AhoCorasick()
+        self._regex: List[Tuple[re.Pattern, str]] = []
+        self._catch_all: Set[str] = set()
+        self._msg_types: Dict[str, FrozenSet[int]] = {}  # 只接收指定消息类型的插件
+        self._no_private: Set[str] = set()  # 不接收私聊消息的插件
+        self._order: Dict[str, int] = {}  # 插件加载顺序，候选插件按此顺序处理
+
+    def __contains__(self, plugin_name: str) -> bool:
+        return plugin_name in self._order
+
+    def add_plugin(self, plugin_name: str, config: Any, plugin: Any = None) -> bool:
+        """
+        登记插件的触发条件
+        Args:
+            plugin_name: 插件名
+            config: 插件配置（configData），读取其中的 [Route]
+            plugin: 插件实例，读取触发声明属性和 register_command 注册的命令
+        Returns:
+            bool: 插件是否声明了关键词（False 表示作为全量候选）
+        """
+        self._order.setdefault(plugin_name, len(self._order))
+        declared = False
+        registered = 0  # 实际登记的触发条件数
+
+        route = config.get('Route') if isinstance(config, dict) else None
+        if isinstance(route, dict):
+            declared = True
+            for kind in ROUTE_KINDS:
+                for path in route.get(kind, []) or []:
+                    words = resolve_words(config, path)
+                    if words is None:
+                        logger.warning(f"插件 {plugin_name} 的路由 {kind} 引用的配置 {path} 不存在")
+                        continue
+                    for word in words:
+                        registered += self.add_word(plugin_name, kind, word)
+            if route.get('msg_types'):
+                self._msg_types[plugin_name] = frozenset(route['msg_types'])
+
+        if plugin is not None:
+            for attr, kind in PLUGIN_TRIGGER_ATTRS:
+                words = getattr(plugin, attr, None) or ()
+                if isinstance(words, str):
+                    words = (words,)
+                for word in words:
+                    declared = True
+                    registered += self.add_word(plugin_name, kind, word)
+            patterns = getattr(plugin, 'on_regex', None) or ()
+            for pattern in ((patterns,) if isinstance(patterns, (str, re.Pattern)) else patterns):
+                declared = True
+                registered += 1
+                self._regex.append((re.compile(pattern) if isinstance(pattern, str) else pattern, plugin_name))
+            for command in (getattr(plugin, 'commands', None) or {}):
+                declared = True
+                registered += self.add_word(plugin_name, ROUTE_PREFIX, command)
+            msg_types = getattr(plugin, 'on_msg_types', None)
+            if msg_types is not None:
+                self._msg_types[plugin_name] = frozenset(msg_types)
+            if not getattr(plugin, 'private_ok', True):
+                self._no_private.add(plugin_name)
+
+        if not declared:
+            self._catch_all.add(plugin_name)
+        elif not registered:
+            logger.warning(f"插件 {plugin_name} 声明了触发路由但没有任何有效关键词，不会收到消息")
+        return declared
+
+    def add_word(self, plugin_name: str, kind: str, word: str) -> bool:
+        """登记单个触发关键词，空关键词不登记，返回是否已登记"""
+        self._order.setdefault(plugin_name, len(self._order))
+        word = word.strip() if kind != ROUTE_CONTAINS else word
+        if not word:
+            return False
+        if kind == ROUTE_EXACT:
+            for form in {word, normalize(word)}:
+                self._exact.setdefault(form, set()).add(plugin_name)
+        elif kind == ROUTE_PREFIX:
+            for form in {word, normalize(word)}:
+                self._prefix.add(form, plugin_name)
+        elif kind == ROUTE_CONTAINS:
+            self._contains.add(word, plugin_name)
+        else:
+            raise ValueError(f"未知的路由方式: {kind}")
+        return True
+
+    def add_catch_all(self, plugin_name: str) -> None:
+        """登记需要查看所有消息的插件"""
+        self._order.setdefault(plugin_name, len(self._order))
+        self._catch_all.add(plugin_name)
+
+    def build(self) -> None:
+        """所有插件登记完成后构建自动机"""
+        self._contains.build()
+
+    def candidates(self, msg) -> List[str]:
+        """
+        返回可能处理该消息的插件名（按加载顺序）
+        Args:
+            msg: WxMsg
+        """
+        found: Set[str] = set(self._catch_all)
+        command = msg.command
+        text = command.text
+        if text:
+            normalized = command.normalized
+            for form in ((text,) if normalized == text else (text, normalized)):
+                exact = self._exact.get(form)
+                if exact:
+                    found |= exact
+                self._prefix.match(form, found)
+            self._contains.match(command.raw, found)
+            for pattern, plugin_name in self._regex:
+                if plugin_name not in found and pattern.search(text):
+                    found.add(plugin_name)
+        if found and (self._msg_types or self._no_private):
+            msg_types = self._msg_types
+            msg_type = msg.type
+            is_private = msg.is_private
+            found = {name for name in found
+                     if (name not in msg_types or msg_type in msg_types[name])
+                     and not (is_private and name in self._no_private)}
+        order = self._order
+        return sorted(found, key=order.__getitem__)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "plugins": len(self._order),
+            "catch_all": len(self._catch_all),
+            "exact_words": len(self._exact),
+            "regex": len(self._regex),
+            "typed": len(self._msg_types),
+        }
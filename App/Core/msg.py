@@ -4,9 +4,38 @@ from datetime import datetime
 from xml.etree import ElementTree as ET
 from typing import Optional, Dict, List, Any, Union
 from loguru import logger
+from Core.MsgXml import (MsgXml, parse_msg_xml, AppMsg, ImageInfo, VoiceInfo, VideoInfo, EmojiInfo, QuoteInfo,
+                         build_appmsg, build_image_info, build_voice_info, build_video_info, build_emoji_info,
+                         build_quote)
+from Core.Command import Command
+
+# 预编译的正则，所有消息共用
+_AT_PATTERN = re.compile(r'@[^ \n\u2005]+[ \n\u2005]*')  # @ 开头，后接非空格/换行/特殊空格的字符，直到遇到这些分隔符
+_ATUSERLIST_CDATA_PATTERN = re.compile(r"<atuserlist><!\[CDATA\[(.*?)\]\]></atuserlist>")
+_ATUSERLIST_PATTERN = re.compile(r"<atuserlist>(.*?)</atuserlist>")
+_AT_ALL_PATTERN = re.compile(r"@(?:所有人|all|All)")
+
+_UNSET = object()  # 派生字段尚未计算的标记
+# 跨进程传递消息时保留的基础字段，派生字段在另一端按需重新计算
+_SNAPSHOT_FIELDS = (
+    'id', 'from_user_name', 'to_user_name', 'type', '_raw_content', 'status', 'img_status', 'img_buf',
+    'create_time', 'msg_source', 'push_content', 'new_id', 'msg_seq', 'self_wxid', 'mode',
+)
+
 
 class WxMsg:
-    """封装 WebSocket 接收到的 JSON 格式微信消息"""
+    """封装 WebSocket 接收到的 JSON 格式微信消息
+
+    content、sender、atusers、noAtMsg、command 等派生字段在第一次访问时才计算并缓存，
+    大部分消息不会被任何插件处理，不必为它们做正则匹配和字符串处理
+    """
+
+    __slots__ = (
+        'id', 'from_user_name', 'to_user_name', 'type', 'status', 'img_status', 'img_buf',
+        'create_time', 'msg_source', 'push_content', 'new_id', 'msg_seq', 'self_wxid', 'roomid',
+        'mode', '_raw_content', '_is_group', '_parsed_msg_source',
+        '_content', '_sender', '_atusers', '_no_at_msg', '_xml', '_command',
+    )
 
     def __init__(self, Msg: Dict[str, Any], self_wxid: str):
         """初始化 Msg 对象
@@ -18,12 +47,9 @@ class WxMsg:
         msg = Msg.get("data","")
         self.id = msg.get("MsgId")
         self.from_user_name = msg.get("FromUserName", {}).get("string", "")
-        self.to_user_name = msg.get("ToUserName", {}).get("string", "")       
+        self.to_user_name = msg.get("ToUserName", {}).get("string", "")
         self.type = msg.get("MsgType")
         self._raw_content = msg.get("Content", {}).get("string", "")
-        self._is_group = "@chatroom" in self.from_user_name or "@chatroom" in self.to_user_name
-        self._processed_content = self._process_content()
-        self.content = self._processed_content
         self.status = msg.get("Status")
         self.img_status = msg.get("ImgStatus")
         self.img_buf = msg.get("ImgBuf", {}).get("iLen", 0)
@@ -33,27 +59,169 @@ class WxMsg:
         self.new_id = msg.get("NewMsgId")
         self.msg_seq = msg.get("MsgSeq")
         self.self_wxid = self_wxid  # 当前用户 ID
+        self._init_derived()
+
+    @classmethod
+    def from_struct(cls, raw: Any, self_wxid: str) -> "WxMsg":
+        """从 Core.MsgDecoder 解码出的消息结构体直接构造，省去逐层 dict 查找
+
+        Args:
+            raw: 字段名与 Wxapi 消息一致的对象（MsgId、FromUserName.string ...）
+            self_wxid (str): 当前用户的微信 ID
+        """
+        obj = cls.__new__(cls)
+        obj.id = raw.MsgId
+        obj.from_user_name = raw.FromUserName.string
+        obj.to_user_name = raw.ToUserName.string
+        obj.type = raw.MsgType
+        obj._raw_content = raw.Content.string
+        obj.status = raw.Status
+        obj.img_status = raw.ImgStatus
+        obj.img_buf = raw.ImgBuf.iLen
+        obj.create_time = raw.CreateTime
+        obj.msg_source = raw.MsgSource
+        obj.push_content = raw.PushContent
+        obj.new_id = raw.NewMsgId
+        obj.msg_seq = raw.MsgSeq
+        obj.self_wxid = self_wxid
+        obj._init_derived()
+        return obj
+
+    def snapshot(self) -> tuple:
+        """导出只含基础字段的元组（可 pickle），用于把消息交给插件子进程"""
+        return tuple(getattr(self, field, None) for field in _SNAPSHOT_FIELDS)
+
+    @classmethod
+    def from_snapshot(cls, data: tuple) -> "WxMsg":
+        """从 snapshot() 的结果还原消息"""
+        obj = cls.__new__(cls)
+        for field, value in zip(_SNAPSHOT_FIELDS, data):
+            setattr(obj, field, value)
+        obj._init_derived()
+        return obj
+
+    def _init_derived(self) -> None:
+        """根据基础字段初始化群聊标记，并重置派生字段缓存"""
+        from_user_name = self.from_user_name
+        to_user_name = self.to_user_name
+        if "@chatroom" in from_user_name:
+            self.roomid = from_user_name
+        elif "@chatroom" in to_user_name:
+            self.roomid = to_user_name
+        else:
+            self.roomid = None
+        self._is_group = self.roomid is not None
         self._parsed_msg_source = None  # 缓存解析后的msg_source
-        self.roomid = self.from_user_name if "@chatroom" in self.from_user_name else self.to_user_name if "@chatroom" in self.to_user_name else None
-        self.sender= self._determine_sender()
-        self.atusers = self._determine_atusers()  
-        self.noAtMsg = self._process_no_at_msg()  # 新增 noAtMsg 属性
-        self.is_private = self._determine_is_private()
-    def _determine_is_private(self) -> bool:
-        """判断是否是私聊消息"""
-        return not self.from_group() and not self.from_self()
+        self._content = _UNSET
+        self._sender = _UNSET
+        self._atusers = _UNSET
+        self._no_at_msg = _UNSET
+        self._xml = _UNSET
+        self._command = None
+
+    @property
+    def content(self) -> str:
+        """去掉群聊发送者前缀后的文本内容"""
+        if self._content is _UNSET:
+            self._content = self._process_content()
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+
+    @property
+    def sender(self) -> Optional[str]:
+        """发送者 wxid"""
+        if self._sender is _UNSET:
+            self._sender = self._determine_sender()
+        return self._sender
+
+    @sender.setter
+    def sender(self, value: Optional[str]) -> None:
+        self._sender = value
+
+    @property
+    def atusers(self) -> List[str]:
+        """被@用户的 wxid 列表"""
+        if self._atusers is _UNSET:
+            self._atusers = self._determine_atusers()
+        return self._atusers
+
+    @atusers.setter
+    def atusers(self, value: List[str]) -> None:
+        self._atusers = value
+
+    @property
+    def noAtMsg(self) -> str:
+        """去掉@部分的文本内容"""
+        if self._no_at_msg is _UNSET:
+            self._no_at_msg = self._process_no_at_msg()
+        return self._no_at_msg
+
+    @noAtMsg.setter
+    def noAtMsg(self, value: str) -> None:
+        self._no_at_msg = value
+
+    @property
+    def command(self) -> Command:
+        """指令切分结果（指令词、参数、去@文本、全角转半角文本），所有插件共用同一份"""
+        if self._command is None or self._command.raw is not self.content:
+            self._command = Command(self.content, self)
+        return self._command
+
+    @property
+    def is_private(self) -> bool:
+        """是否是私聊消息"""
+        return not self._is_group and self.from_user_name != self.self_wxid
+
+    @property
+    def xml(self) -> Optional[MsgXml]:
+        """消息内容中的 XML 字段，第一次访问时流式解析一次并缓存，内容不是 XML 时为 None"""
+        if self._xml is _UNSET:
+            self._xml = parse_msg_xml(self._raw_content) if "<" in self._raw_content else None
+        return self._xml
+
+    @property
+    def appmsg(self) -> Optional[AppMsg]:
+        """卡片消息（链接、文件、小程序、引用等，MsgType 49）"""
+        return build_appmsg(self.xml) if self.type == 49 and self.xml else None
+
+    @property
+    def quote(self) -> Optional[QuoteInfo]:
+        """引用回复消息中被引用的内容"""
+        return build_quote(self.xml) if self.type == 49 and self.xml else None
+
+    @property
+    def image_info(self) -> Optional[ImageInfo]:
+        """图片消息（MsgType 3）的 CDN 信息"""
+        return build_image_info(self.xml) if self.type == 3 and self.xml else None
+
+    @property
+    def voice_info(self) -> Optional[VoiceInfo]:
+        """语音消息（MsgType 34）的下载信息"""
+        return build_voice_info(self.xml) if self.type == 34 and self.xml else None
+
+    @property
+    def video_info(self) -> Optional[VideoInfo]:
+        """视频消息（MsgType 43）的 CDN 信息"""
+        return build_video_info(self.xml) if self.type == 43 and self.xml else None
+
+    @property
+    def emoji_info(self) -> Optional[EmojiInfo]:
+        """表情消息（MsgType 47）的 CDN 信息"""
+        return build_emoji_info(self.xml) if self.type == 47 and self.xml else None
 
     def _process_no_at_msg(self) -> str:
         """处理无@的文本内容"""
-        # 匹配 @ 开头，后接非空格/换行/特殊空格的字符，直到遇到这些分隔符
-        pattern = r'@[^ \n\u2005]+[ \n\u2005]*'
-        return re.sub(pattern, '', self.content).strip()   
+        return _AT_PATTERN.sub('', self.content).strip()
+
     def _process_content(self) -> str:
         """优化后的内容处理方法"""
         content = self._raw_content.strip()
         
         # 群消息处理
-        if self.from_group():
+        if self._is_group:
             if ':' in content:
                 _, sep, text = content.partition(':')
             elif '：' in content:
@@ -68,28 +236,25 @@ class WxMsg:
 
     def _determine_atusers(self) -> List[str]:
         """从消息源中提取@用户的 wxid 列表，兼容 CDATA 和非 CDATA 格式"""
-        if not self.from_group() or not self.msg_source:
+        if not self._is_group or not self.msg_source or "<atuserlist>" not in self.msg_source:
             return []
-    
-    # 优先尝试匹配 CDATA 格式
-        match = re.search(r"<atuserlist><!\[CDATA\[(.*?)\]\]></atuserlist>", self.msg_source)
-        if not match:
-        # 回退匹配非 CDATA 格式
-            match = re.search(r"<atuserlist>(.*?)</atuserlist>", self.msg_source)
-    
+
+        # 优先尝试匹配 CDATA 格式，回退匹配非 CDATA 格式
+        match = _ATUSERLIST_CDATA_PATTERN.search(self.msg_source) or _ATUSERLIST_PATTERN.search(self.msg_source)
         return [user for user in match.group(1).split(",") if user] if match and match.group(1) else []
+
     def _determine_sender(self) -> Optional[str]:
         if self.from_self():
             return self.self_wxid
-        if not self.from_group():
+        if not self._is_group:
             return self.from_user_name
-        if self._raw_content and "\n" in self._raw_content:
-            first_line = self._raw_content.split("\n")[0]
+        raw_content = self._raw_content
+        if raw_content and "\n" in raw_content:
+            first_line = raw_content.split("\n", 1)[0]
             if first_line.endswith(":"):  # 兼容昵称和wxid
                 return first_line[:-1]  # 去掉末尾冒号
         return None
-      
-                
+
     def __str__(self) -> str:
         """将 Msg 对象转换为易读字符串"""
         return f"""
@@ -157,12 +322,12 @@ class WxMsg:
             return False
 
         # 检查是否在@列表中
-        at_users = re.search(r"<atuserlist>(.*?)</atuserlist>", self.msg_source)
+        at_users = _ATUSERLIST_PATTERN.search(self.msg_source)
         if not at_users:
             return False
 
         # 检查是否是@所有人
-        if not include_all and re.search(r"@(?:所有人|all|All)", self.content):
+        if not include_all and _AT_ALL_PATTERN.search(self.content):
             return False
 
         return wxid in at_users.group(1).split(",")
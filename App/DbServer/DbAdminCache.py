@@ -0,0 +1,146 @@
+from typing import Dict, Optional, Set, Tuple
+from loguru import logger
+
+
+def _integer_affinity(mode):
+    """group_mode.mode 为 INTEGER 列，写入数字字符串时 SQLite 会存为整数，缓存中按同样规则保存"""
+    if isinstance(mode, str):
+        try:
+            return int(mode)
+        except ValueError:
+            return mode
+    return mode
+
+
+def _mode_key(mode) -> str:
+    """plugin_config.mode 为 TEXT 列，按文本比较，1 和 "1" 是同一个模式"""
+    return str(mode)
+
+
+class AdminCache:
+    """
+    admin、group_mode 和 plugin_config 三张表的内存副本
+    启动时（DbInitServer.init_admin_db）整表读入，之后由 DbAdminServer 的写接口在数据库提交成功后同步更新（写穿），
+    消息分发时查询管理员、群组模式和插件配置不再访问数据库。
+    每个模式下启用的插件列表预先计算好，按写入数据库的先后排序，与原先不带 ORDER BY 的查询结果顺序一致。
+    管理员按群分组保存，另有全部管理员 wxid 的集合：每条消息都要判断发送者是否为管理员，
+    绝大多数发送者不在这个集合中，一次集合查找即可确定不是管理员。
+    未加载时（如插件子进程中）所有查询返回 None，由调用方回退到数据库查询。
+    """
+    def __init__(self):
+        self.db_path: Optional[str] = None
+        self._group_modes: Dict[str, tuple] = {}               # 群ID -> (模式,)，与数据库查询返回的行一致
+        self._plugin_configs: Dict[str, Dict[str, bool]] = {}   # 模式 -> {插件名: 是否启用}
+        self._enabled: Dict[str, Tuple[str, ...]] = {}         # 模式 -> 启用的插件名
+        self._plugin_names: Tuple[str, ...] = ()
+        self._admins: Dict[str, Set[str]] = {}                  # 群ID -> 管理员 wxid
+        self._admin_ids: Set[str] = set()                       # 所有群的管理员 wxid
+        self.admin_lookups = 0      # 由缓存回答的管理员查询次数（即省下的数据库查询）
+        self.admin_misses = 0       # 其中发送者不在任何群管理员中、直接判定为非管理员的次数
+
+    def loaded(self, db_path: str) -> bool:
+        return self.db_path == db_path
+
+    async def load(self, conn, db_path: str) -> None:
+        """从数据库读入三张表，conn 为已建表的连接"""
+        admins: Dict[str, Set[str]] = {}
+        async with conn.execute("SELECT group_id, wxid FROM admin") as cursor:
+            for group_id, wxid in await cursor.fetchall():
+                admins.setdefault(group_id, set()).add(wxid)
+        async with conn.execute("SELECT group_id, mode FROM group_mode") as cursor:
+            group_modes = {group_id: (mode,) for group_id, mode in await cursor.fetchall()}
+        plugin_configs: Dict[str, Dict[str, bool]] = {}
+        async with conn.execute("SELECT mode, plugin_name, enabled FROM plugin_config ORDER BY rowid") as cursor:
+            for mode, plugin_name, enabled in await cursor.fetchall():
+                plugin_configs.setdefault(_mode_key(mode), {})[plugin_name] = bool(enabled)
+
+        self._admins = admins
+        self._admin_ids = set().union(*admins.values())
+        self._group_modes = group_modes
+        self._plugin_configs = plugin_configs
+        self._enabled = {}
+        for mode in plugin_configs:
+            self._refresh(mode)
+        self.db_path = db_path
+        logger.info(f"已缓存 {len(self._admin_ids)} 个管理员、{len(group_modes)} 个群组模式和 "
+                    f"{len(self._plugin_names)} 个插件的配置")
+
+    def _refresh(self, mode: str) -> None:
+        """重新计算某个模式的启用列表和全部插件名"""
+        configs = self._plugin_configs.get(mode)
+        if configs:
+            self._enabled[mode] = tuple(name for name, enabled in configs.items() if enabled)
+        else:
+            self._plugin_configs.pop(mode, None)
+            self._enabled.pop(mode, None)
+        names = {}
+        for configs in self._plugin_configs.values():
+            names.update(dict.fromkeys(configs))
+        self._plugin_names = tuple(names)
+
+    # 查询，调用方需先确认 loaded()
+
+    def is_admin(self, group_id: str, wxid: str) -> bool:
+        self.admin_lookups += 1
+        if wxid not in self._admin_ids:
+            self.admin_misses += 1
+            return False
+        admins = self._admins.get(group_id)
+        return admins is not None and wxid in admins
+
+    def admin_stats(self) -> Dict[str, int]:
+        return {
+            "admins": len(self._admin_ids),
+            "lookups": self.admin_lookups,
+            "not_admin_fast": self.admin_misses,
+        }
+
+    def group_mode(self, group_id: str) -> Optional[tuple]:
+        return self._group_modes.get(group_id)
+
+    def plugin_config(self, mode, plugin_name: str) -> Optional[bool]:
+        configs = self._plugin_configs.get(_mode_key(mode))
+        return configs.get(plugin_name) if configs else None
+
+    def enabled_plugins(self, mode) -> Tuple[str, ...]:
+        return self._enabled.get(_mode_key(mode), ())
+
+    def plugin_names(self) -> Tuple[str, ...]:
+        return self._plugin_names
+
+    # 写穿，数据库提交成功后调用
+
+    def add_admin(self, group_id: str, wxid: str) -> None:
+        self._admins.setdefault(group_id, set()).add(wxid)
+        self._admin_ids.add(wxid)
+
+    def delete_admin(self, group_id: str, wxid: str) -> None:
+        admins = self._admins.get(group_id)
+        if admins is None:
+            return
+        admins.discard(wxid)
+        if not admins:
+            del self._admins[group_id]
+        if not any(wxid in admins for admins in self._admins.values()):
+            self._admin_ids.discard(wxid)
+
+    def set_group_mode(self, group_id: str, mode) -> None:
+        self._group_modes[group_id] = (_integer_affinity(mode),)
+
+    def delete_group_mode(self, group_id: str) -> None:
+        self._group_modes.pop(group_id, None)
+
+    def set_plugin_config(self, mode, plugin_name: str, enabled: bool) -> None:
+        mode = _mode_key(mode)
+        self._plugin_configs.setdefault(mode, {})[plugin_name] = bool(enabled)
+        self._refresh(mode)
+
+    def delete_plugin_config(self, mode, plugin_name: str) -> None:
+        mode = _mode_key(mode)
+        configs = self._plugin_configs.get(mode)
+        if configs is not None and configs.pop(plugin_name, None) is not None:
+            self._refresh(mode)
+
+
+# 全局缓存实例，各插件各自创建的 DbAdminServer 共用
+admin_cache = AdminCache()
@@ -1,12 +1,18 @@
 from loguru import logger
 from typing import Optional, List, Dict
 from .DbDomServer import db_manager
+from .DbAdminCache import admin_cache
 import Config.ConfigServer as Cs
 
 class DbAdminServer:
     def __init__(self):
         self.db_path = Cs.returnAdminDbPath()
 
+    @property
+    def _cache(self):
+        """管理员、群组模式和插件配置的内存缓存，尚未加载（init_admin_db 之前或插件子进程中）时为 None"""
+        return admin_cache if admin_cache.loaded(self.db_path) else None
+
     async def add_admin(self, group_id: str, wxid: str) -> bool:
         """添加管理员"""
         try:
@@ -17,7 +23,9 @@ class DbAdminServer:
                     (group_id, wxid)
                 )
                 await conn.commit()
-                return True
+            if self._cache:
+                self._cache.add_admin(group_id, wxid)
+            return True
         except Exception as e:
             logger.error(f'添加管理员出错: {e}')
             return False
@@ -32,15 +40,19 @@ class DbAdminServer:
                     (group_id, wxid)
                 )
                 await conn.commit()
-                return True
+            if self._cache:
+                self._cache.delete_admin(group_id, wxid)
+            return True
         except Exception as e:
             logger.error(f'删除管理员出错: {e}')
             return False
 
     async def query_admin(self, group_id: str, wxid: str) -> bool:
         """查询是否为管理员"""
+        if self._cache:
+            return self._cache.is_admin(group_id, wxid)
         try:
-            async with db_manager.get_connection(self.db_path) as conn:
+            async with db_manager.get_reader(self.db_path) as conn:
                 async with conn.execute(
                     """SELECT 1 FROM admin 
                     WHERE group_id=? AND wxid=?""",
@@ -64,7 +76,9 @@ class DbAdminServer:
                     (group_id, mode, mode)
                 )
                 await conn.commit()
-                return True
+            if self._cache:
+                self._cache.set_group_mode(group_id, mode)
+            return True
         except Exception as e:
             logger.error(f'设置群组模式出错: {e}')
             return False
@@ -78,15 +92,19 @@ class DbAdminServer:
                     (group_id,)
                 )
                 await conn.commit()
-                return True
+            if self._cache:
+                self._cache.delete_group_mode(group_id)
+            return True
         except Exception as e:
             logger.error(f'删除群组模式出错: {e}')
             return False
 
     async def query_group_mode(self, group_id: str) -> Optional[int]:
         """查询群组模式"""
+        if self._cache:
+            return self._cache.group_mode(group_id)
         try:
-            async with db_manager.get_connection(self.db_path) as conn:
+            async with db_manager.get_reader(self.db_path) as conn:
                 async with conn.execute(
                     "SELECT mode FROM group_mode WHERE group_id=?",
                     (group_id,)
@@ -116,7 +134,9 @@ class DbAdminServer:
                     (mode, plugin_name, enabled, enabled)
                 )
                 await conn.commit()
-                return True
+            if self._cache:
+                self._cache.set_plugin_config(mode, plugin_name, enabled)
+            return True
         except Exception as e:
             logger.error(f'设置插件配置出错: {e}')
             return False
@@ -137,7 +157,9 @@ class DbAdminServer:
                     (mode, plugin_name)
                 )
                 await conn.commit()
-                return True
+            if self._cache:
+                self._cache.delete_plugin_config(mode, plugin_name)
+            return True
         except Exception as e:
             logger.error(f'删除插件配置出错: {e}')
             return False
@@ -150,8 +172,10 @@ class DbAdminServer:
         Returns:
             Optional[bool]: 插件是否启用，None 表示未配置
         """
+        if self._cache:
+            return self._cache.plugin_config(mode, plugin_name)
         try:
-            async with db_manager.get_connection(self.db_path) as conn:
+            async with db_manager.get_reader(self.db_path) as conn:
                 async with conn.execute(
                     """SELECT enabled FROM plugin_config 
                     WHERE mode=? AND plugin_name=?""",
@@ -168,8 +192,10 @@ class DbAdminServer:
         Returns:
             List[str]: 插件名称列表
         """
+        if self._cache:
+            return list(self._cache.plugin_names())
         try:
-            async with db_manager.get_connection(self.db_path) as conn:
+            async with db_manager.get_reader(self.db_path) as conn:
                 async with conn.execute(
                     "SELECT DISTINCT plugin_name FROM plugin_config"
                 ) as cursor:
@@ -186,11 +212,14 @@ class DbAdminServer:
         Returns:
             List[str]: 启用的插件名称列表
         """
+        if self._cache:
+            return list(self._cache.enabled_plugins(mode))
         try:
-            async with db_manager.get_connection(self.db_path) as conn:
+            async with db_manager.get_reader(self.db_path) as conn:
                 async with conn.execute(
                     """SELECT plugin_name FROM plugin_config 
-                    WHERE mode=? AND enabled=1""",
+                    WHERE mode=? AND enabled=1
+                    ORDER BY rowid""",
                     (mode,)
                 ) as cursor:
                     results = await cursor.fetchall()
@@ -1,35 +1,214 @@
+import asyncio
+from collections import deque
 import aiosqlite
 from loguru import logger
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from contextlib import asynccontextmanager
+import Config.ConfigServer as Cs
+
+# [DbConfig] 缺省值
+DEFAULT_DB_CONFIG = {
+    'journal_mode': 'WAL',          # WAL 下读写互不阻塞，提交只追加日志
+    'synchronous': 'NORMAL',        # WAL 模式下 NORMAL 只在检查点时 fsync，断电最多丢失最近的提交，不会损坏数据库
+    'mmap_size': 64 * 1024 * 1024,  # 内存映射读取的大小（字节），0 表示关闭
+    'cache_size': -8000,            # 每个连接的页缓存，负数表示 KB
+    'busy_timeout': 5000,           # 数据库被其他进程锁定时等待的毫秒数
+    'read_connections': 2,          # 只读连接池大小，0 表示读写共用写连接
+    'cached_statements': 256,       # 每个连接缓存的预编译语句数量（按 SQL 文本复用）
+    'write_behind_max_batch': 500,  # WriteBehind 攒够多少条写入提交一次
+    'write_behind_max_delay': 1.0,  # WriteBehind 中的写入最多延迟多少秒提交
+    'write_behind_max_retries': 5,  # WriteBehind 遇到数据库被锁或忙时一批写入最多重试的次数
+    'write_behind_max_queue': 10000,  # WriteBehind 队列中最多保留的写入条数
+}
+
+
+class ReaderPool:
+    """
+    只读连接池，按等待顺序分配连接
+    （asyncio.Queue 中刚归还连接的协程可以立即再次取走连接，排队的协程会被反复插队）
+    """
+    def __init__(self, conns: List[aiosqlite.Connection]):
+        self._idle = deque(conns)
+        self._available = asyncio.Semaphore(len(conns))
+
+    async def acquire(self) -> aiosqlite.Connection:
+        await self._available.acquire()
+        return self._idle.popleft()
+
+    def release(self, conn: aiosqlite.Connection) -> None:
+        self._idle.append(conn)
+        self._available.release()
+
 
 class AsyncDbManager:
-    def __init__(self):
-        self._connections = {}  # 存储数据库连接
+    """
+    每个数据库一个写连接、若干只读连接
+    写连接同一时间只交给一个协程使用，写入和提交之间不会混入其他协程的语句；
+    只读连接在 WAL 模式下可以与写连接并发读取，读到的是已提交的数据。
+    连接在第一次使用时创建，并发的第一次调用共用同一次创建过程，不会重复打开连接。
+    """
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 连接参数，见 DEFAULT_DB_CONFIG，缺省时读取 Config.toml 的 [DbConfig]
+        """
+        self._config = config
+        self._connections = {}  # 存储数据库写连接
+        self._readers: Dict[str, ReaderPool] = {}  # 数据库路径 -> 只读连接池
+        self._reader_conns: Dict[str, List[aiosqlite.Connection]] = {}
+        self._write_locks: Dict[str, asyncio.Lock] = {}
+        self._opening: Dict[tuple, asyncio.Future] = {}  # 正在进行的连接创建
+        self._write_behinds: List = []  # 关闭连接前需要提交的 WriteBehind 队列
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = dict(DEFAULT_DB_CONFIG, **Cs.returnConfigData().get('DbConfig', {}))
+        return self._config
+
+    async def _once(self, key: tuple, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """同一个 key 同时只执行一次 factory，并发的调用等待并共享结果，失败后下次调用重新执行"""
+        opening = self._opening.get(key)
+        if opening is None:
+            opening = self._opening[key] = asyncio.ensure_future(factory())
+            opening.add_done_callback(lambda done: self._opened(key, done))
+        return await asyncio.shield(opening)
+
+    def _opened(self, key: tuple, opening: asyncio.Future) -> None:
+        if self._opening.get(key) is opening:
+            del self._opening[key]
+
+    async def _connect(self, db_path: str, readonly: bool = False) -> aiosqlite.Connection:
+        """打开连接并设置 PRAGMA"""
+        config = self.config
+        conn = await aiosqlite.connect(db_path, cached_statements=int(config['cached_statements']))
+        try:
+            await conn.execute(f"PRAGMA busy_timeout = {int(config['busy_timeout'])}")
+            await conn.execute(f"PRAGMA cache_size = {int(config['cache_size'])}")
+            await conn.execute(f"PRAGMA mmap_size = {int(config['mmap_size'])}")
+            if readonly:
+                await conn.execute("PRAGMA query_only = ON")
+            else:
+                # journal_mode 会写入数据库文件，只由写连接设置；只读连接打开时写连接已经设置过
+                journal_mode = str(config['journal_mode']).upper()
+                async with conn.execute(f"PRAGMA journal_mode = {journal_mode}") as cursor:
+                    actual = (await cursor.fetchone())[0]
+                if actual.upper() != journal_mode and db_path != ':memory:':
+                    logger.warning(f"数据库 {db_path} 无法使用 {journal_mode} 日志模式，当前为 {actual}")
+                await conn.execute(f"PRAGMA synchronous = {config['synchronous']}")
+        except Exception:
+            await conn.close()
+            raise
+        return conn
+
+    async def _writer(self, db_path: str) -> aiosqlite.Connection:
+        conn = self._connections.get(db_path)
+        if conn is None:
+            async def open_writer():
+                conn = await self._connect(db_path)
+                self._connections[db_path] = conn
+                return conn
+            conn = await self._once(('writer', db_path), open_writer)
+        return conn
+
+    async def _reader_pool(self, db_path: str) -> Optional["ReaderPool"]:
+        """只读连接池，不启用或内存数据库（各连接互不相通）时返回 None"""
+        size = int(self.config['read_connections'])
+        if size <= 0 or db_path == ':memory:':
+            return None
+        pool = self._readers.get(db_path)
+        if pool is None:
+            async def open_readers():
+                await self._writer(db_path)  # 先由写连接建立数据库文件和 WAL 模式
+                conns = []
+                try:
+                    for _ in range(size):
+                        conns.append(await self._connect(db_path, readonly=True))
+                except Exception:
+                    for conn in conns:
+                        await conn.close()
+                    raise
+                pool = ReaderPool(conns)
+                self._reader_conns[db_path] = conns
+                self._readers[db_path] = pool
+                return pool
+            pool = await self._once(('reader', db_path), open_readers)
+        return pool
 
     @asynccontextmanager
     async def get_connection(self, db_path: str):
         """
-        异步获取数据库连接
+        异步获取数据库写连接（独占，不要嵌套获取同一个数据库的写连接）
         使用方法:
         async with db_manager.get_connection(db_path) as conn:
             async with conn.execute(...) as cursor:
                 ...
+        出错时回滚未提交的修改，不会被下一个使用者一并提交
         """
         try:
-            if db_path not in self._connections:
-                self._connections[db_path] = await aiosqlite.connect(db_path)
-            conn = self._connections[db_path]
-            yield conn
+            conn = await self._writer(db_path)
+            lock = self._write_locks.get(db_path)
+            if lock is None:
+                lock = self._write_locks[db_path] = asyncio.Lock()
+            async with lock:
+                try:
+                    yield conn
+                except BaseException:
+                    if conn.in_transaction:
+                        await conn.rollback()
+                    raise
         except Exception as e:
             logger.error(f"数据库连接错误: {e}")
             raise
-            
+
+    @asynccontextmanager
+    async def get_reader(self, db_path: str):
+        """
+        异步获取只读连接，只用于查询；未启用只读连接池时退回写连接
+        使用方法:
+        async with db_manager.get_reader(db_path) as conn:
+            async with conn.execute(...) as cursor:
+                ...
+        """
+        try:
+            pool = await self._reader_pool(db_path)
+        except Exception as e:
+            logger.error(f"数据库连接错误: {e}")
+            raise
+        if pool is None:
+            async with self.get_connection(db_path) as conn:
+                yield conn
+            return
+        conn = await pool.acquire()
+        try:
+            yield conn
+        except Exception as e:
+            logger.error(f"数据库查询错误: {e}")
+            raise
+        finally:
+            pool.release(conn)
+
+    def register_write_behind(self, write_behind) -> None:
+        """登记有写入的 WriteBehind 队列，close_all 关闭连接前先提交其中的写入"""
+        self._write_behinds.append(write_behind)
+
     async def close_all(self):
-        """关闭所有数据库连接"""
+        """提交所有 WriteBehind 队列中的写入，然后关闭所有数据库连接"""
+        write_behinds, self._write_behinds = self._write_behinds, []
+        for write_behind in write_behinds:
+            try:
+                await write_behind.close()
+            except Exception as e:
+                logger.error(f"提交批量写入失败: {e}")
+        for conns in self._reader_conns.values():
+            for conn in conns:
+                await conn.close()
         for conn in self._connections.values():
             await conn.close()
         self._connections.clear()
+        self._readers.clear()
+        self._reader_conns.clear()
+        self._write_locks.clear()
 
 # 全局数据库管理器实例
 db_manager = AsyncDbManager()
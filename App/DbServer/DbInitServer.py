@@ -4,6 +4,7 @@ from Config.logger import logger
 from loguru import logger
 from typing import Optional, List, Dict, Any
 from .DbDomServer import db_manager
+from .DbAdminCache import admin_cache
 
 class DbInitServer:
     def __init__(self):
@@ -39,6 +40,9 @@ class DbInitServer:
                 )
                 
                 await conn.commit()
+
+                # 读入群组模式和插件配置，之后消息分发不再查询这两张表
+                await admin_cache.load(conn, self.admin_db)
                 return True
         except Exception as e:
             logger.error(f'初始化管理员数据库出错: {e}')
@@ -62,7 +66,7 @@ class DbInitServer:
     async def check_database(self, db_path: str) -> Dict[str, bool]:
         """检查指定数据库中的表是否存在"""
         try:
-            async with db_manager.get_connection(db_path) as conn:
+            async with db_manager.get_reader(db_path) as conn:
                 async with conn.execute(
                     """SELECT name FROM sqlite_master 
                     WHERE type='table'"""
@@ -0,0 +1,264 @@
+import asyncio
+import sqlite3
+import time
+from itertools import groupby
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from loguru import logger
+from .DbDomServer import AsyncDbManager, db_manager
+
+# 覆盖层中的操作：SET 表示这一行的最新值已知（None 表示已删除），ADD 表示在数据库中的值上累加
+_SET = "set"
+_ADD = "add"
+
+
+def _is_transient(error: BaseException) -> bool:
+    """数据库被锁或忙属于暂时性错误，稍后重试可以成功；其他错误（约束冲突、SQL 有误等）重试也不会成功"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _combine(old: Optional[Tuple[str, Any]], new: Tuple[str, Any]) -> Tuple[str, Any]:
+    """把同一行上先后两次写入合并为一次的效果"""
+    if old is None or new[0] == _SET:
+        return new
+    if old[0] == _ADD:
+        return _ADD, old[1] + new[1]
+    return _SET, (old[1] or 0) + new[1]
+
+
+class WriteBehind:
+    """
+    批量延迟写入：写入先记在内存中，攒够 max_batch 条或距上次提交超过 max_delay 秒时在一个事务中提交，
+    高频写入（签到、积分、消息统计等）不再每条各自 commit（每次 commit 都要落盘）。
+    读取经过覆盖层（尚未提交的写入），写入后立即可以读到自己写的值。
+    AsyncDbManager.close_all 关闭连接前会提交所有队列中的写入并做 WAL 检查点，写入落盘后才退出。
+
+    用法:
+        points = WriteBehind(db_path)
+        await points.add(("points", wxid), "INSERT INTO points (wxid, point) VALUES (?, ?) "
+                         "ON CONFLICT(wxid) DO UPDATE SET point = point + excluded.point", (wxid, 5), 5)
+        point = await points.get(("points", wxid), load_point)   # load_point: 从数据库读取当前值的协程函数
+
+    key 标识写入影响的那一行，同一行的 put / add / delete 在覆盖层中按顺序合并。
+    add 的 SQL 应为累加式 upsert（行不存在时以增量为初值），与覆盖层的合并规则一致。
+
+    提交失败时:
+    - 数据库被锁或忙: 整批放回队列，间隔 max_delay 后重试，连续失败超过 max_retries 次则丢弃这一批
+    - 其他错误: 在一个事务中逐条重新执行，出错的写入记录日志后丢弃，其余写入照常提交
+    队列中的写入达到 max_queue 条（数据库长时间不可写）时，新的写入被丢弃并返回 False。
+    """
+    def __init__(self, db_path: str, max_batch: Optional[int] = None, max_delay: Optional[float] = None,
+                 max_retries: Optional[int] = None, max_queue: Optional[int] = None,
+                 manager: AsyncDbManager = db_manager):
+        """
+        Args:
+            db_path: 数据库路径
+            max_batch: 攒够多少条写入立即提交，缺省读取 [DbConfig] write_behind_max_batch
+            max_delay: 写入最多在内存中停留的秒数（也是重试间隔），缺省读取 [DbConfig] write_behind_max_delay
+            max_retries: 数据库被锁或忙时一批写入最多重试的次数，缺省读取 [DbConfig] write_behind_max_retries
+            max_queue: 队列中最多保留的写入条数，缺省读取 [DbConfig] write_behind_max_queue
+            manager: 数据库连接管理器
+        """
+        def option(value, key):
+            return value if value is not None else manager.config[key]
+
+        self.db_path = db_path
+        self.manager = manager
+        self.max_batch = max(1, int(option(max_batch, 'write_behind_max_batch')))
+        self.max_delay = float(option(max_delay, 'write_behind_max_delay'))
+        self.max_retries = max(0, int(option(max_retries, 'write_behind_max_retries')))
+        self.max_queue = max(self.max_batch, int(option(max_queue, 'write_behind_max_queue')))
+        self._queue: List[Tuple[str, tuple]] = []                      # 待提交的 (SQL, 参数)，按写入顺序
+        self._pending: Dict[Hashable, Tuple[str, Any]] = {}           # 未提交写入的覆盖层
+        self._flushing: Dict[Hashable, Tuple[str, Any]] = {}          # 正在提交的那一批写入的覆盖层
+        self._generation = 0  # 每次开始和结束提交时递增，读取期间发生变化则重新读取
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._retries = 0       # 当前这批写入因数据库被锁或忙已重试的次数
+        self._retry_at = 0.0    # 暂时性失败后，下次重试的时间（time.monotonic）
+        self._overflowing = False
+        self._registered = False  # 是否已登记到 manager（close_all 之后需要重新登记）
+        self._unsynced = 0      # 上次检查点之后提交的写入条数
+        self.flushes = 0
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def put(self, key: Hashable, sql: str, params: tuple, value: Any) -> bool:
+        """写入一行，value 为写入后读取这一行应得到的值，返回是否已加入队列"""
+        return await self._write(key, sql, params, (_SET, value))
+
+    async def add(self, key: Hashable, sql: str, params: tuple, delta) -> bool:
+        """在一行的值上累加 delta，返回是否已加入队列"""
+        return await self._write(key, sql, params, (_ADD, delta))
+
+    async def delete(self, key: Hashable, sql: str, params: tuple) -> bool:
+        """删除一行，之后读取这一行得到 None，返回是否已加入队列"""
+        return await self._write(key, sql, params, (_SET, None))
+
+    async def _write(self, key: Hashable, sql: str, params: tuple, op: Tuple[str, Any]) -> bool:
+        if not self._registered:
+            self.manager.register_write_behind(self)
+            self._registered = True
+        if len(self._queue) >= self.max_queue:
+            await self.flush()
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if not self._overflowing:
+                    self._overflowing = True
+                    logger.error(f"批量写入 {self.db_path} 的队列已满（{self.max_queue} 条），数据库恢复前新的写入将被丢弃")
+                return False
+        self._queue.append((sql, tuple(params)))
+        self._pending[key] = _combine(self._pending.get(key), op)
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+        if len(self._queue) >= self.max_batch:
+            # 攒满一批时由写入方等待提交完成，数据库跟不上时写入方随之放慢
+            await self.flush()
+        return True
+
+    async def _flush_later(self) -> None:
+        """定时提交，队列清空后结束（提交失败放回队列的写入也由这里重试）"""
+        while True:
+            await asyncio.sleep(self.max_delay)
+            await self.flush()
+            if not self._queue:
+                return
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        读取一行的当前值（包括尚未提交的写入）
+        Args:
+            key: 与写入时相同的行标识
+            loader: 从数据库读取这一行的协程函数，行不存在时返回 None
+        Returns:
+            Any: 当前值，行不存在或已删除时为 None
+        """
+        while True:
+            pending = self._pending.get(key)
+            if pending is not None and pending[0] == _SET:
+                return pending[1]
+            if key in self._flushing:
+                # 这一行正在提交，数据库中的值处于提交前后之间，等提交结束后再读
+                async with self._flush_lock:
+                    pass
+                continue
+            generation = self._generation
+            value = await loader()
+            if generation != self._generation:
+                continue  # 读取期间有一批写入开始或完成提交，数据库中的值与覆盖层可能重复或遗漏
+            pending = self._pending.get(key)
+            if pending is None:
+                return value
+            if pending[0] == _SET:
+                return pending[1]
+            return (value or 0) + pending[1]
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        在一个事务中提交当前队列中的所有写入
+        Args:
+            force: 忽略暂时性失败后的重试间隔，立即提交（关闭时使用）
+        Returns:
+            int: 提交的写入条数，失败时为 0
+        """
+        async with self._flush_lock:
+            if not self._queue or (not force and time.monotonic() < self._retry_at):
+                return 0
+            batch, self._queue = self._queue, []
+            self._flushing, self._pending = self._pending, {}
+            self._generation += 1
+            try:
+                try:
+                    written = await self._commit(batch)
+                except Exception as e:
+                    if _is_transient(e):
+                        raise
+                    logger.error(f"批量写入 {self.db_path} 失败，逐条提交以跳过出错的写入: {e}")
+                    written = await self._commit_each(batch)
+            except asyncio.CancelledError:
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                if self._retries < self.max_retries:
+                    self._retries += 1
+                    self._retry_at = time.monotonic() + self.max_delay
+                    logger.warning(f"批量写入 {self.db_path} 失败（{len(batch)} 条，第 {self._retries} 次，稍后重试）: {e}")
+                    self._requeue(batch)
+                else:
+                    logger.error(f"批量写入 {self.db_path} 重试 {self.max_retries} 次后仍失败，丢弃 {len(batch)} 条写入: {e}")
+                    self.dropped += len(batch)
+                    self._retries = 0
+                    self._retry_at = 0.0
+                return 0
+            finally:
+                self._flushing = {}
+                self._generation += 1
+            self._retries = 0
+            self._retry_at = 0.0
+            self._overflowing = False
+            self.flushes += 1
+            self.written += written
+            self._unsynced += written
+            return written
+
+    def _requeue(self, batch: List[Tuple[str, tuple]]) -> None:
+        """提交失败，把这一批写入和它们的覆盖层放回去，排在之后的写入前面"""
+        self._queue = batch + self._queue
+        pending = self._flushing
+        for key, op in self._pending.items():
+            pending[key] = _combine(pending.get(key), op)
+        self._pending = pending
+
+    async def _commit(self, batch: List[Tuple[str, tuple]]) -> int:
+        async with self.manager.get_connection(self.db_path) as conn:
+            # 连续的相同语句合并为一次 executemany
+            for sql, group in groupby(batch, key=lambda item: item[0]):
+                await conn.executemany(sql, [params for _, params in group])
+            await conn.commit()
+        return len(batch)
+
+    async def _commit_each(self, batch: List[Tuple[str, tuple]]) -> int:
+        """在一个事务中逐条执行，每条写入一个保存点，出错的写入回滚到保存点后丢弃"""
+        written = 0
+        async with self.manager.get_connection(self.db_path) as conn:
+            if not conn.in_transaction:
+                await conn.execute("BEGIN")  # 保存点在事务之外会自成事务，每条写入各提交一次
+            for sql, params in batch:
+                await conn.execute("SAVEPOINT write_behind")
+                try:
+                    await conn.execute(sql, params)
+                    written += 1
+                except Exception as e:
+                    if _is_transient(e):
+                        raise
+                    await conn.execute("ROLLBACK TO write_behind")
+                    self.dropped += 1
+                    logger.error(f"丢弃出错的写入 {sql} {params}: {e}")
+                await conn.execute("RELEASE write_behind")
+            await conn.commit()
+        return written
+
+    async def close(self) -> None:
+        """提交剩余的写入，有新提交的写入时做 WAL 检查点，确保已落盘"""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        self._registered = False  # close_all 关闭后清空登记，之后再写入时重新登记
+        await self.flush(force=True)
+        if self._queue:
+            logger.error(f"关闭时仍有 {len(self._queue)} 条写入未能提交到 {self.db_path}")
+            return
+        if self._unsynced:
+            try:
+                async with self.manager.get_connection(self.db_path) as conn:
+                    await conn.execute("PRAGMA wal_checkpoint(FULL)")
+                self._unsynced = 0
+            except Exception as e:
+                logger.error(f"数据库 {self.db_path} 检查点失败: {e}")
+        if self.written or self.dropped:
+            logger.info(f"批量写入 {self.db_path}: {self.written} 条写入共 {self.flushes} 次提交，丢弃 {self.dropped} 条")
@@ -1,6 +1,7 @@
 
 from .DbInitServer import DbInitServer
 from .DbAdminServer import DbAdminServer
+from .DbWriteBehind import WriteBehind
 
 
 class DbServer(DbInitServer,DbAdminServer):
@@ -98,7 +98,7 @@ class AdminPlugin(PluginBase):
             return False
         
         # 解析插件名称（去掉命令前缀）
-        plugin_name = msg.content.split(' ', 1)[1] if ' ' in msg.content else None
+        plugin_name = msg.command.args if msg.command.has_args else None
         if not plugin_name and operation != 'query':
             await self.dp.sendText("请指定插件名称", msg.sender, msg.self_wxid)
             return True
@@ -218,19 +218,19 @@ class AdminPlugin(PluginBase):
             # 处理插件管理命令
             if msg.content == "测试":
                 return await self.dp.sendImage("https://p26-sign.douyinpic.com/tos-cn-i-0813c001/oMAxt78xDQBsSfybAiFADo9PFCfUoAAIEUglAP~tplv-dy-lqen-new:1920:1440:q80.webp?lk3s=138a59ce&x-expires=1754038800&x-signature=ebvrnCI%2Fy6Bp32BpZDLzP2%2Bw2Xo%3D&from=327834062&s=PackSourceEnum_DOUYIN_REFLOW&se=false&sc=image&biz_tag=aweme_images&l=20250702173333E9A34C2182C106384D8A",msg.roomid,msg.self_wxid)
-            if self.tools.judgeSplitAllEqualWord(msg.content, self.addPlugin):
+            if self.tools.judgeSplitAllEqualWord(msg.command, self.addPlugin):
                 return await self._handle_plugin_change(msg, 'add')
             
-            elif self.tools.judgeSplitAllEqualWord(msg.content, self.delPlugin):
+            elif self.tools.judgeSplitAllEqualWord(msg.command, self.delPlugin):
                 return await self._handle_plugin_change(msg, 'delete')
             
-            elif self.tools.judgeSplitAllEqualWord(msg.content, self.enablePlugin):
+            elif self.tools.judgeSplitAllEqualWord(msg.command, self.enablePlugin):
                 return await self._handle_plugin_change(msg, 'enable')
             
-            elif self.tools.judgeSplitAllEqualWord(msg.content, self.unablePlugin):
+            elif self.tools.judgeSplitAllEqualWord(msg.command, self.unablePlugin):
                 return await self._handle_plugin_change(msg, 'disable')
             
-            elif self.tools.judgeEqualListWord(msg.content, self.menuPlugin):
+            elif self.tools.judgeEqualListWord(msg.command, self.menuPlugin):
                 return await self._handle_plugin_change(msg, 'query')
 
             # 添加管理员
@@ -242,22 +242,22 @@ class AdminPlugin(PluginBase):
                 return await self._handle_admin_change(msg, is_add=False)
             
             # 设置群组模式
-            elif self.tools.judgeEqualListWord(msg.content, self.adminConfig.get('setGroupAdminModeSymbol')):
+            elif self.tools.judgeEqualListWord(msg.command, self.adminConfig.get('setGroupAdminModeSymbol')):
                 return await self._handle_mode_change(msg, "admin")
             
-            elif self.tools.judgeEqualListWord(msg.content, self.adminConfig.get('setGroupCustomModeSymbol')):
+            elif self.tools.judgeEqualListWord(msg.command, self.adminConfig.get('setGroupCustomModeSymbol')):
                 return await self._handle_mode_change(msg, "custom")
             
             # 移除群组模式
-            elif self.tools.judgeEqualListWord(msg.content, self.adminConfig.get('delGroupmModeSymbol')):
+            elif self.tools.judgeEqualListWord(msg.command, self.adminConfig.get('delGroupmModeSymbol')):
                 return await self._handle_mode_change(msg)
             
             # 重启插件
-            elif self.tools.judgeEqualListWord(msg.content, self.restartPlugin):
+            elif self.tools.judgeEqualListWord(msg.command, self.restartPlugin):
                 return await self._handle_plugin_restart(msg)
 
             # 插件初始化
-            elif self.tools.judgeEqualListWord(msg.content, self.initPlugin):
+            elif self.tools.judgeEqualListWord(msg.command, self.initPlugin):
                 return await self.plugin_init()
 
             return False
@@ -5,6 +5,8 @@ from Core.PluginBase import PluginBase
 import os
 import asyncio    
 class DailyPointPlugin(PluginBase):
+    on_msg_types = (1,)
+
     def __init__(self):
         super().__init__()
         self.name = "DailyPoint"
@@ -14,6 +16,7 @@ class DailyPointPlugin(PluginBase):
         self.tools = Tools()
         self.configData = self.tools.returnConfigData(os.path.dirname(__file__))
         self.checkinword = self.configData.get('checkinword')
+        self.joinword = self.configData.get('joinword')
         self.dpApi = self.configData.get('dpApi')
         self.dpKey = self.configData.get('dpKey')
 
@@ -23,15 +26,13 @@ class DailyPointPlugin(PluginBase):
         示例1：签到
         """
 
-        if msg.type != 1:  # 只处理文本消息
-            return False
-        if self.tools.judgeEqualWord(msg.content, '签到'):
+        if self.tools.judgeEqualListWord(msg.command, self.checkinword):
             # 获取用户信息
             user_info = await self.dp.getIdName(msg.sender)
             reply = f"@{user_info} \n签到失败❌️\n回复：DP族人，前来部落"
             await self.dp.sendText(reply, msg.roomid, msg.self_wxid)
             return True
-        elif self.tools.judgeEqualWord(msg.content, 'DP族人，前来部落'):
+        elif self.tools.judgeEqualListWord(msg.command, self.joinword):
             # 获取用户信息
             user_info = await self.dp.getIdName(msg.sender)
             wenan = await self.getDPWenan('毒鸡汤')
@@ -49,7 +50,7 @@ class DailyPointPlugin(PluginBase):
                 'AppSecret': self.dpKey,
                 'type': content
             }
-            jsonData = await self.tools.async_get(self.dpApi, params=params, return_json=True)
+            jsonData = await self.tools.async_get(self.dpApi, params=params, return_json=True, coalesce=True)
             if not jsonData:
                 logger.warning('获取文案失败: 请求失败')
                 return None
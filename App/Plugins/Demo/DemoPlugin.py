@@ -4,6 +4,14 @@ import Config.ConfigServer as Cs
 from Core.PluginBase import PluginBase
 import os
 class DemoPlugin(PluginBase):
+       # 触发声明（可选），PluginManager 只会把匹配的消息交给插件，也可以在 config.toml 的 [Route] 中引用关键词配置
+       # on_keyword = ('完全匹配的关键词',)
+       # on_prefix = ('指令',)            # 如 "指令 参数"
+       # on_contains = ('example.com',)
+       # on_regex = (r'^\d{6}$',)
+       # on_msg_types = (1,)              # 只接收文本消息
+       # private_ok = False               # 不接收私聊消息
+       # run_in_process = True            # CPU 密集的插件在子进程中处理，self.dp 只能调用 send* 接口
        def __init__(self):
            super().__init__()
            self.name = "DemoPlugin"
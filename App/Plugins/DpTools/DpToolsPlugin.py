@@ -5,6 +5,8 @@ from Core.PluginBase import PluginBase
 import os
 
 class DpToolsPlugin(PluginBase):
+    on_msg_types = (1,)
+
     def __init__(self):
         super().__init__()
         self.name = "DpTools"
@@ -19,10 +21,7 @@ class DpToolsPlugin(PluginBase):
     async def handle_message(self, msg) -> bool:
         """处理消息"""
         try:
-            if msg.type != 1:  # 只处理文本消息
-                return False
-                
-            if not self.tools.judgeEqualListWord(msg.content, self.hot_news):
+            if not self.tools.judgeEqualListWord(msg.command, self.hot_news):
                 return False
                 
             logger.debug(f'{self.name} 收到热搜查询请求')
@@ -5,6 +5,8 @@ from Core.PluginBase import PluginBase
 import os
 
 class DpWenanPlugin(PluginBase):
+    on_msg_types = (1,)
+
     def __init__(self):
         super().__init__()
         self.name = "DpWenan"
@@ -26,7 +28,7 @@ class DpWenanPlugin(PluginBase):
                 'AppSecret': self.dpKey,
                 'type': content
             }
-            jsonData = await self.tools.async_get(self.dpApi, params=params, return_json=True)
+            jsonData = await self.tools.async_get(self.dpApi, params=params, return_json=True, coalesce=True)
             if not jsonData:
                 logger.warning('获取文案失败: 请求失败')
                 return None
@@ -47,10 +49,7 @@ class DpWenanPlugin(PluginBase):
     async def handle_message(self, msg) -> bool:
         """处理消息"""
         try:
-            if msg.type != 1:  # 只处理文本消息
-                return False
-                
-            content = msg.content.strip()
+            content = msg.command
             
             # 处理各类文案请求
             wenan_type = None
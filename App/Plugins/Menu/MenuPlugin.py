@@ -5,6 +5,8 @@ from Core.PluginBase import PluginBase
 import os
 
 class MenuPlugin(PluginBase):
+    on_msg_types = (1,)
+
     def __init__(self):
         super().__init__()
         self.tools = Tools()
@@ -17,7 +19,7 @@ class MenuPlugin(PluginBase):
         self.menu = self.configData.get('menu')
 
     async def handle_message(self, msg):
-        if self.tools.judgeEqualListWord(msg.content, self.menu):
+        if self.tools.judgeEqualListWord(msg.command, self.menu):
             await self.dp.sendText(await self.menu_list(), msg.roomid, msg.self_wxid)
             return True
         return False
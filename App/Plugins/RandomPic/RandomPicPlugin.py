@@ -6,6 +6,8 @@ import os
 from typing import Optional
 
 class RandomPicPlugin(PluginBase):
+    on_msg_types = (1,)
+
     def __init__(self):
         super().__init__()
         self.dp = WeChatApi()         
@@ -66,12 +68,8 @@ class RandomPicPlugin(PluginBase):
         Returns:
             bool: 是否处理了消息
         """
-        if msg.type != 1:  # 只处理文本消息
-            logger.debug("不是文本消息，跳过处理")
-            return False
-            
         logger.debug(f"收到消息内容: {msg.content}")
-        if self.tools.judgeEqualListWord(msg.content, self.PicWords):
+        if self.tools.judgeEqualListWord(msg.command, self.PicWords):
             logger.debug("匹配到随机图片关键词")
             url = await self.handleRandomPic()
             if not url:
@@ -83,7 +81,7 @@ class RandomPicPlugin(PluginBase):
             logger.debug(f"发送随机图片结果: {result}")
             return result
             
-        elif self.tools.judgeEqualListWord(msg.content, self.LegWords):
+        elif self.tools.judgeEqualListWord(msg.command, self.LegWords):
             logger.debug("匹配到腿图关键词")
             url = await self.handleLegPic()
             if not url:
@@ -95,7 +93,7 @@ class RandomPicPlugin(PluginBase):
             logger.debug(f"发送腿图结果: {result}")
             return result
             
-        elif self.tools.judgeEqualListWord(msg.content, self.GirlBigWords):
+        elif self.tools.judgeEqualListWord(msg.command, self.GirlBigWords):
             logger.debug("匹配到女大图关键词")
             image_base64 = await self.handleBigPic()
             if not image_base64:
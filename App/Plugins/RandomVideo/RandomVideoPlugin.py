@@ -6,6 +6,10 @@ import os
 import random
 
 class RandomVideoPlugin(PluginBase):
+    on_msg_types = (1,)
+    max_concurrency = 2  # 视频下载占用带宽和内存，限制同时下载的数量
+    timeout = 120
+
     def __init__(self):
         super().__init__()
         self.dp = WeChatApi()         
@@ -36,7 +40,7 @@ class RandomVideoPlugin(PluginBase):
 
     async def handle_message(self, msg) -> bool:
         """处理消息"""
-        if msg.type != 1 or not self.tools.judgeEqualListWord(msg.content, self.VideoWords):
+        if not self.tools.judgeEqualListWord(msg.command, self.VideoWords):
             return False
             
         url = await self.handleRandomVideo()
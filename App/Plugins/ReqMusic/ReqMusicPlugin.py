@@ -6,6 +6,8 @@ from WeChatApi import WeChatApi
 import os
 
 class ReqMusicPlugin(PluginBase):
+    on_msg_types = (1,)
+
     def __init__(self):
         super().__init__()
         self.dp = WeChatApi()
@@ -30,7 +32,7 @@ class ReqMusicPlugin(PluginBase):
             url = f"{self.dpApi}&AppSecret={self.dpKey}&songname={songname}"
             logger.debug(f"请求的URL: {url}")
             
-            data = await self.tools.async_get(url, return_json=True)
+            data = await self.tools.async_get(url, return_json=True, coalesce=True)
             if not data:
                 logger.warning("获取音乐数据失败: 请求失败")
                 return None
@@ -48,16 +50,11 @@ class ReqMusicPlugin(PluginBase):
     async def handle_message(self, msg) -> bool:
         """处理消息"""
         try:
-            if not self.tools.judgeSplitAllEqualWord(msg.content, self.musicword):
+            if not self.tools.judgeSplitAllEqualWord(msg.command, self.musicword):
                 return False
                 
             logger.debug(f"接收到的消息: {msg.content}")
-            parts = msg.content.split(' ', 1)
-            if len(parts) < 2:
-                await self.dp.sendText("请输入要点播的歌曲名称", msg.roomid, msg.self_wxid)
-                return True
-                
-            songname = parts[1].strip()
+            songname = msg.command.args
             if not songname:
                 await self.dp.sendText("请输入要点播的歌曲名称", msg.roomid, msg.self_wxid)
                 return True
@@ -7,6 +7,10 @@ import os
 import asyncio
 import random 
 class ShortVideoParsePlugin(PluginBase):
+    on_msg_types = (1,)
+    max_concurrency = 4  # 解析接口较慢，限制同时解析的数量
+    timeout = 45
+
     def __init__(self):
         super().__init__()
         self.dp = WeChatApi()         
@@ -33,7 +37,7 @@ class ShortVideoParsePlugin(PluginBase):
                 'AppSecret': self.dpKey,
                 'text': shortVideoUrl
             }
-            jsonData = await self.tools.async_get(self.dpApi, params=params, return_json=True)
+            jsonData = await self.tools.async_get(self.dpApi, params=params, return_json=True, coalesce=True)
             if not jsonData:
                 logger.warning(f'{self.name} 请求API失败')
                 return {}
@@ -64,9 +68,6 @@ class ShortVideoParsePlugin(PluginBase):
     async def handle_message(self, msg) -> bool:
         """处理消息"""
         try:
-            if msg.type != 1:  # 只处理文本消息
-                return False
-                
             if not self.tools.judgeInListWord(msg.content, self.dyWord):
                 return False
                 
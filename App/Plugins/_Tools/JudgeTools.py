@@ -1,7 +1,30 @@
 from Config.logger import logger
+from Core.Command import Command, normalize
+
+
+def _raw(recvWord) -> str:
+    """接收消息原文，recvWord 可以是字符串或 msg.command"""
+    return recvWord.raw if isinstance(recvWord, Command) else recvWord
+
+
+def _stripped(recvWord) -> str:
+    """完全匹配用的接收消息（全角转半角、合并空白），msg.command 还去掉了 @ 部分且已经算好，不再重复计算"""
+    return recvWord.normalized if isinstance(recvWord, Command) else normalize(recvWord)
+
+
 class JudgeTools:
     def __init__(self):
-        pass
+        # 触发关键字列表 -> 规整（normalize）后的集合，避免每条消息都对整个列表做一遍
+        self._word_set_cache = {}
+
+    def _word_set(self, systemListWord) -> frozenset:
+        """返回关键字列表对应的集合（按列表对象缓存，列表长度变化时重新计算）"""
+        cached = self._word_set_cache.get(id(systemListWord))
+        if cached is None or cached[0] is not systemListWord or cached[1] != len(systemListWord):
+            cached = (systemListWord, len(systemListWord),
+                      frozenset(normalize(word) for word in systemListWord if isinstance(word, str)))
+            self._word_set_cache[id(systemListWord)] = cached
+        return cached[2]
 
     def judgeOneEqualListWord(self, recvWord, systemListWord):
         """
@@ -10,6 +33,7 @@ class JudgeTools:
         :param systemListWord:
         :return:
         """
+        recvWord = _raw(recvWord)
         for systemWord in systemListWord:
             if recvWord.startswith(systemWord):
                 return True
@@ -23,7 +47,7 @@ class JudgeTools:
         :param systemWord: 触发关键字
         :return:
         """
-        if recvWord.strip() == systemWord.strip():
+        if _stripped(recvWord) == normalize(systemWord):
             return True
         return False
 
@@ -35,10 +59,9 @@ class JudgeTools:
         :param systemListWord: 触发关键字列表
         :return:
         """
-        for listWord in systemListWord:
-            if listWord.strip() == recvWord.strip():
-                return True
-        return False
+        if not systemListWord:
+            return False
+        return _stripped(recvWord) in self._word_set(systemListWord)
 
     def judgeInWord(self, recvWord, systemListWord):
         """
@@ -48,6 +71,7 @@ class JudgeTools:
         :param systemListWord: 触发关键字列表
         :return: bool
         """
+        recvWord = _raw(recvWord)
         for systemWord in systemListWord:
             if systemWord in recvWord:
                 return True
@@ -60,6 +84,7 @@ class JudgeTools:
         :param systemListWord:
         :return:
         """
+        recvWord = _raw(recvWord)
         for listWord in systemListWord:
             if listWord in recvWord:
                 return True
@@ -68,17 +93,16 @@ class JudgeTools:
     def judgeSplitAllEqualWord(self, recvWord, systemListWord):
         """
         接收消息以空格切割，判断第一个元素是否在触发关键字列表中则返回True
+        按 msg.command 的 head/args 判断：指令词与关键字相同且带有参数（如 "点歌 晴天"、"点歌　晴天"），
+        recvWord 为字符串时按同样规则切分，结果相同
         :param recvWord:
         :param systemListWord:
         :return:
         """
-        if ' ' in recvWord:
-            recvWord = recvWord.split(' ')[0]
-            for listWord in systemListWord:
-                if recvWord == listWord:
-                    return True
+        if not systemListWord:
             return False
-        return False
+        command = recvWord if isinstance(recvWord, Command) else Command(recvWord)
+        return command.has_args and command.head in self._word_set(systemListWord)
 
     def judgePointFunction(self, senderPoint, functionPoint):
         """
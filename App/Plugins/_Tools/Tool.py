@@ -4,6 +4,7 @@ import httpx
 import base64
 from typing import Optional, Dict, Union, Any
 from Config.logger import logger
+from Core.SingleFlight import upstream_flights, request_key
 
 
 class Tool:
@@ -46,7 +47,8 @@ class Tool:
                      headers: Optional[Dict] = None,
                      timeout: int = 10,
                      return_json: bool = True,
-                     return_base64: bool = False) -> Optional[Union[Dict, str, bytes]]:
+                     return_base64: bool = False,
+                     coalesce: bool = False) -> Optional[Union[Dict, str, bytes]]:
         """
         异步 GET 请求
         Args:
@@ -56,12 +58,24 @@ class Tool:
             timeout: 超时时间（秒）
             return_json: 是否返回JSON数据
             return_base64: 是否返回base64编码的数据
+            coalesce: 同一插件的相同请求正在进行时是否直接共享其结果（返回的对象为共享对象，不要修改）。
+                      只用于相同请求得到相同结果的接口（文案、解析、搜索等），随机图片/视频等接口不要开启
         Returns:
             Optional[Union[Dict, str, bytes]]: 
             - return_json=True: 返回字典或None
             - return_base64=True: 返回base64字符串或None
             - 其他情况: 返回bytes或None
         """
+        if not coalesce:
+            return await self._get(url, params, headers, timeout, return_json, return_base64)
+        key = request_key("GET", url, params, headers, return_json, return_base64)
+        return await upstream_flights.do(
+            key, lambda: self._get(url, params, headers, timeout, return_json, return_base64)
+        )
+
+    async def _get(self, url: str, params: Optional[Dict], headers: Optional[Dict], timeout: int,
+                   return_json: bool, return_base64: bool) -> Optional[Union[Dict, str, bytes]]:
+        """发起 GET 请求，参数见 async_get"""
         try:
             if headers is None:
                 headers = self._get_default_headers()
@@ -1,5 +1,5 @@
 from Config.ConfigServer import *
-from Config.logger import logger
+from Config.logger import logger, log_sample, brief
 import httpx
 from typing import Optional, Dict, Any
 
@@ -51,7 +51,8 @@ async def sendPostReq(reqPath: str, data: Dict[str, Any], timeout: int = 30) ->
     """
     api = f'http://{DPBotApi.replace("0.0.0.0", "127.0.0.1")}:{DPBotPort}/api/{reqPath}'
     
-    logger.debug(f"发送请求: {api}")
+    if log_sample("http"):
+        logger.debug("发送请求: {} {}", api, brief(data))
     try:
         client = await get_client()
         headers = {
@@ -66,7 +67,8 @@ async def sendPostReq(reqPath: str, data: Dict[str, Any], timeout: int = 30) ->
         )
         response.raise_for_status()  # 确保响应状态码是 2xx
         jsonData = response.json()
-        logger.debug(f"请求返回: {jsonData}")
+        if log_sample("http"):
+            logger.debug("请求返回: {}", brief(jsonData))
         return jsonData
     except httpx.RequestError as e:
         logger.error(f"HTTP请求失败: {str(e)}, API: {api}")
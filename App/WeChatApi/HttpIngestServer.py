@@ -0,0 +1,102 @@
+from Config.logger import logger, log_sample, brief
+from aiohttp import web
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class HttpIngestServer:
+    """
+    HTTP消息推送接收服务
+    对应 Wxapi 配置中的 syncmessagebusinessuri = "http://127.0.0.1:8088/msg/SyncMessage/{0}"
+    收到的每条消息包装成与WS推送相同的格式，交给同一个消息处理函数
+    """
+    def __init__(self,
+                 handler: Callable[[str], Awaitable[None]],
+                 wxid: str,
+                 host: str = "127.0.0.1",
+                 port: int = 8088,
+                 keepalive_timeout: float = 75):
+        """
+        Args:
+            handler: 处理单条原始消息的协程函数（与 WsClient.handle_message 同签名）
+            wxid: 机器人wxid，只接收推送给该账号的消息
+            host: 监听地址
+            port: 监听端口
+            keepalive_timeout: HTTP长连接空闲保持时间（秒）
+        """
+        self.handler = handler
+        self.wxid = wxid
+        self.host = host
+        self.port = int(port)
+        self.keepalive_timeout = keepalive_timeout
+        self._runner: Optional[web.AppRunner] = None
+        self.received = 0  # 累计收到的消息数
+
+    @staticmethod
+    def extract_messages(payload: Any) -> List[Dict[str, Any]]:
+        """
+        从推送内容中取出消息列表
+        兼容 /Msg/Sync 返回格式（Data.AddMsgs）、AddMsgs 列表、Data 消息数组、WS推送格式（data）和消息数组
+        """
+        if isinstance(payload, list):
+            return [m for m in payload if isinstance(m, dict)]
+        if not isinstance(payload, dict):
+            return []
+        data = payload.get("Data") or payload
+        if isinstance(data, list):
+            return [m for m in data if isinstance(m, dict)]
+        if isinstance(data, dict) and "AddMsgs" in data:
+            return data.get("AddMsgs") or []
+        if "data" in payload:
+            inner = payload.get("data")
+            return [inner] if isinstance(inner, dict) else HttpIngestServer.extract_messages(inner)
+        if "MsgId" in payload or "NewMsgId" in payload:
+            return [payload]
+        return []
+
+    @staticmethod
+    def _is_empty_sync(payload: Any) -> bool:
+        """是否为没有新消息的同步结果（AddMsgs 为空），这种推送不需要告警"""
+        data = (payload.get("Data") or payload) if isinstance(payload, dict) else None
+        return isinstance(data, dict) and "AddMsgs" in data
+
+    async def _handle_sync_message(self, request: web.Request) -> web.Response:
+        """处理 POST /msg/SyncMessage/{wxid}"""
+        wxid = request.match_info.get("wxid", "")
+        if wxid != self.wxid:
+            logger.warning(f"收到非本机器人账号的消息推送: {wxid}")
+            return web.json_response({"Code": -1, "Success": False, "Message": "wxid不匹配"}, status=404)
+
+        try:
+            body = await request.text()
+            if log_sample("ws"):
+                logger.debug("HTTP收到推送: {}", brief(body))
+            payload = json.loads(body)
+            messages = self.extract_messages(payload)
+        except json.JSONDecodeError as e:
+            logger.error(f"推送消息解析失败: {e}")
+            return web.json_response({"Code": -1, "Success": False, "Message": "JSON解析失败"}, status=400)
+        if not messages and payload and not self._is_empty_sync(payload):
+            logger.warning("推送内容中没有可识别的消息: {}", brief(body))
+
+        for message in messages:
+            self.received += 1
+            await self.handler(json.dumps({"data": message}, ensure_ascii=False))
+        return web.json_response({"Code": 0, "Success": True, "Message": ""})
+
+    async def start(self) -> None:
+        """启动HTTP服务"""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/msg/SyncMessage/{wxid}", self._handle_sync_message)
+        self._runner = web.AppRunner(app, access_log=None, keepalive_timeout=self.keepalive_timeout)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.success(f"HTTP消息推送接收服务已启动: http://{self.host}:{self.port}/msg/SyncMessage/{self.wxid}")
+
+    async def close(self) -> None:
+        """关闭HTTP服务"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+            logger.info(f"HTTP消息推送接收服务已关闭，共收到 {self.received} 条消息")
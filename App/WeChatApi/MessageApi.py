@@ -9,17 +9,14 @@ from urllib.parse import urlparse
 import aiofiles
 from pathlib import Path
 import tempfile
-import cv2
-import numpy as np
 import math
 from io import BytesIO
-import pysilk
-from pydub import AudioSegment
 import mimetypes
-from PIL import Image
 import random  # 添加到文件开头的导入部分
 import httpx
 
+# cv2、pydub、pysilk、PIL 导入耗时且占用内存较多，只在发送图片、视频、语音时按需导入
+
 class MessageApi:
     def __init__(self):
         # 普通消息队列(文本等)
@@ -258,14 +255,7 @@ class MessageApi:
                                 if not any(fmt in content_type.lower() for fmt in ['jpeg', 'jpg', 'png']):
                                     # 尝试转换图片格式
                                     try:
-                                        img = Image.open(BytesIO(image_data))
-                                        # 转换为RGB模式（处理RGBA等其他模式）
-                                        if img.mode != 'RGB':
-                                            img = img.convert('RGB')
-                                        # 将图片保存为JPEG格式到BytesIO
-                                        output = BytesIO()
-                                        img.save(output, format='JPEG', quality=95)
-                                        image_data = output.getvalue()
+                                        image_data = await asyncio.to_thread(self._to_jpeg, BytesIO(image_data))
                                         logger.info(f"图片已转换为JPEG格式")
                                     except Exception as e:
                                         logger.error(f"图片格式转换失败: {e}")
@@ -278,12 +268,7 @@ class MessageApi:
                             file_type = mimetypes.guess_type(imagePath)[0]
                             if not file_type or not any(fmt in file_type.lower() for fmt in ['jpeg', 'jpg', 'png']):
                                 try:
-                                    img = Image.open(imagePath)
-                                    if img.mode != 'RGB':
-                                        img = img.convert('RGB')
-                                    output = BytesIO()
-                                    img.save(output, format='JPEG', quality=95)
-                                    image_data = output.getvalue()
+                                    image_data = await asyncio.to_thread(self._to_jpeg, imagePath)
                                     logger.info(f"本地图片已转换为JPEG格式")
                                 except Exception as e:
                                     logger.error(f"本地图片格式转换失败: {e}")
@@ -311,6 +296,19 @@ class MessageApi:
 
         return await self._queue_image(_do_send)
 
+    @staticmethod
+    def _to_jpeg(source: Union[str, BytesIO]) -> bytes:
+        """把图片转换为 JPEG（CPU 密集，在线程中执行，避免阻塞事件循环）"""
+        from PIL import Image
+        img = Image.open(source)
+        # 转换为RGB模式（处理RGBA等其他模式）
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        # 将图片保存为JPEG格式到BytesIO
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=95)
+        return output.getvalue()
+
     async def sendVideo(self, videoPath: str, toWxid: str, selfWxid: str):
         """
         发送视频消息(使用专用队列)
@@ -412,35 +410,8 @@ class MessageApi:
                     video_data = await f.read()
                 temp_file_path = video_source
 
-            # 2. 使用OpenCV处理视频
-            cap = cv2.VideoCapture(temp_file_path)
-            if not cap.isOpened():
-                raise ValueError("无法打开视频文件")
-
-            try:
-                # 获取视频信息
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-                if fps > 0 and frame_count > 0:
-                    duration_seconds = int(round(frame_count / fps))
-                else:
-                    cap.set(cv2.CAP_PROP_POS_AVI_RATIO, 1)
-                    duration_seconds = int(round(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0))
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-
-                # 提取第一帧
-                ret, frame = cap.read()
-                if ret:
-                    # JPEG编码参数
-                    encode_params = [
-                        cv2.IMWRITE_JPEG_QUALITY, 100,
-                        cv2.IMWRITE_JPEG_OPTIMIZE, 1
-                    ]
-                    success, buffer = cv2.imencode('.jpg', frame, encode_params)
-                    if success:
-                        first_frame_base64 = f"data:image/jpeg;base64,{base64.b64encode(buffer).decode('utf-8')}"
-            finally:
-                cap.release()
+            # 2. 使用OpenCV处理视频（CPU 密集，在线程中执行，避免阻塞事件循环）
+            first_frame_base64, duration_seconds = await asyncio.to_thread(self._read_video_info, temp_file_path)
 
         except Exception as e:
             logger.error(f"处理视频时发生错误: {str(e)}")
@@ -455,6 +426,41 @@ class MessageApi:
 
         return first_frame_base64, video_data, duration_seconds    
 
+    @staticmethod
+    def _read_video_info(video_path: str) -> Tuple[Optional[str], Optional[int]]:
+        """用 OpenCV 读取视频时长并提取第一帧"""
+        import cv2
+        first_frame_base64: Optional[str] = None
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError("无法打开视频文件")
+
+        try:
+            # 获取视频信息
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+            if fps > 0 and frame_count > 0:
+                duration_seconds = int(round(frame_count / fps))
+            else:
+                cap.set(cv2.CAP_PROP_POS_AVI_RATIO, 1)
+                duration_seconds = int(round(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0))
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+            # 提取第一帧
+            ret, frame = cap.read()
+            if ret:
+                # JPEG编码参数
+                encode_params = [
+                    cv2.IMWRITE_JPEG_QUALITY, 100,
+                    cv2.IMWRITE_JPEG_OPTIMIZE, 1
+                ]
+                success, buffer = cv2.imencode('.jpg', frame, encode_params)
+                if success:
+                    first_frame_base64 = f"data:image/jpeg;base64,{base64.b64encode(buffer).decode('utf-8')}"
+        finally:
+            cap.release()
+        return first_frame_base64, duration_seconds
+
     async def uploadFile(self, filePath: str = "", selfWxid: str = ""):
         """
         上传文件
@@ -699,23 +705,6 @@ class MessageApi:
         # 如果无法从文件名判断，默认作为wav处理
         return 'wav'
 
-    async def _split_audio(self, audio: AudioSegment, max_duration: int = 60000) -> List[AudioSegment]:
-        """
-        将音频分段,每段最大时长为max_duration(毫秒)
-        :param audio: 音频数据
-        :param max_duration: 最大时长(毫秒),默认60秒
-        :return: 分段后的音频列表
-        """
-        segments = []
-        total_duration = len(audio)
-        
-        for start in range(0, total_duration, max_duration):
-            end = min(start + max_duration, total_duration)
-            segment = audio[start:end]
-            segments.append(segment)
-        
-        return segments
-
     async def _process_voice_data(self, voice: Union[str, bytes, os.PathLike]) -> Union[Tuple[str, int, int], List[Tuple[str, int, int]]]:
         """
         处理语音数据,返回base64、时长和实际格式类型
@@ -731,62 +720,69 @@ class MessageApi:
             # 检测格式
             detected_format = await self._detect_audio_format(voice)
             logger.debug(f"检测到音频格式: {detected_format}")
-            
-            # 处理不同格式的语音
-            if detected_format == "amr":
-                try:
-                    # AMR格式直接使用
-                    audio = AudioSegment.from_file(BytesIO(voice_byte), format="amr")
-                    voice_base64 = base64.b64encode(voice_byte).decode()
-                    format_type = 0  # AMR格式
-                    return [(voice_base64, len(audio), format_type)]
-                except Exception as e:
-                    logger.warning(f"AMR格式处理失败: {e}, 转换为SILK格式")
-                    # 尝试作为WAV处理并转换为SILK
-                    audio = AudioSegment.from_file(BytesIO(voice_byte), format="wav")
-            else:
-                # WAV/MP3格式转换为SILK
-                audio = AudioSegment.from_file(BytesIO(voice_byte), format=detected_format)
-                
-            logger.debug(f"原始音频信息: 时长={len(audio)}ms, 采样率={audio.frame_rate}Hz, 声道数={audio.channels}")
-            
-            # 转换为单声道
-            if audio.channels > 1:
-                audio = audio.set_channels(1)
-                logger.debug("已转换为单声道")
-            
-            # SILK格式要求采样率为24000Hz
-            target_rate = 24000
-            if audio.frame_rate != target_rate:
-                audio = audio.set_frame_rate(target_rate)
-                logger.debug(f"已调整采样率为: {target_rate}Hz")
-
-            # 检查是否需要分段
-            if len(audio) > 60000:  # 如果超过60秒
-                logger.info(f"音频时长超过60秒,进行分段处理: 总时长={len(audio)}ms")
-                segments = await self._split_audio(audio)
-                result = []
-                
-                for i, segment in enumerate(segments, 1):
-                    logger.debug(f"处理第{i}/{len(segments)}段音频: 时长={len(segment)}ms")
-                    # 转换为SILK格式
-                    voice_base64 = base64.b64encode(
-                        pysilk.encode(segment.raw_data, sample_rate=target_rate)
-                    ).decode()
-                    result.append((voice_base64, len(segment), 4))  # 4 表示SILK格式
-                
-                return result
-            else:
-                # 单段音频处理
-                voice_base64 = base64.b64encode(
-                    pysilk.encode(audio.raw_data, sample_rate=target_rate)
-                ).decode()
-                return [(voice_base64, len(audio), 4)]  # 4 表示SILK格式
+
+            # 解码、重采样和 SILK 编码都是 CPU 密集操作，在线程中执行，避免阻塞事件循环
+            return await asyncio.to_thread(self._encode_voice, voice_byte, detected_format)
 
         except Exception as e:
             logger.error(f"处理语音数据失败: {e}")
             raise
 
+    @staticmethod
+    def _encode_voice(voice_byte: bytes, detected_format: str, max_duration: int = 60000) -> List[Tuple[str, int, int]]:
+        """
+        把语音转换为微信支持的格式，超过 max_duration（毫秒）的音频分段编码
+        :return: [(base64编码的语音数据, 时长(毫秒), 格式类型), ...]
+        """
+        import pysilk
+        from pydub import AudioSegment
+
+        # 处理不同格式的语音
+        if detected_format == "amr":
+            try:
+                # AMR格式直接使用
+                audio = AudioSegment.from_file(BytesIO(voice_byte), format="amr")
+                voice_base64 = base64.b64encode(voice_byte).decode()
+                format_type = 0  # AMR格式
+                return [(voice_base64, len(audio), format_type)]
+            except Exception as e:
+                logger.warning(f"AMR格式处理失败: {e}, 转换为SILK格式")
+                # 尝试作为WAV处理并转换为SILK
+                audio = AudioSegment.from_file(BytesIO(voice_byte), format="wav")
+        else:
+            # WAV/MP3格式转换为SILK
+            audio = AudioSegment.from_file(BytesIO(voice_byte), format=detected_format)
+            
+        logger.debug(f"原始音频信息: 时长={len(audio)}ms, 采样率={audio.frame_rate}Hz, 声道数={audio.channels}")
+        
+        # 转换为单声道
+        if audio.channels > 1:
+            audio = audio.set_channels(1)
+            logger.debug("已转换为单声道")
+        
+        # SILK格式要求采样率为24000Hz
+        target_rate = 24000
+        if audio.frame_rate != target_rate:
+            audio = audio.set_frame_rate(target_rate)
+            logger.debug(f"已调整采样率为: {target_rate}Hz")
+
+        # 检查是否需要分段
+        if len(audio) > max_duration:  # 如果超过60秒
+            logger.info(f"音频时长超过60秒,进行分段处理: 总时长={len(audio)}ms")
+            segments = [audio[start:start + max_duration] for start in range(0, len(audio), max_duration)]
+        else:
+            segments = [audio]
+
+        result = []
+        for i, segment in enumerate(segments, 1):
+            logger.debug(f"处理第{i}/{len(segments)}段音频: 时长={len(segment)}ms")
+            # 转换为SILK格式
+            voice_base64 = base64.b64encode(
+                pysilk.encode(segment.raw_data, sample_rate=target_rate)
+            ).decode()
+            result.append((voice_base64, len(segment), 4))  # 4 表示SILK格式
+        return result
+
     async def sendVoice(self, voice: Union[str, bytes, os.PathLike], toWxid: str, selfWxid: str) -> Union[dict, List[dict]]:
         """
         发送语音消息,支持自动分段发送超过60秒的音频
@@ -1,15 +1,35 @@
-from Config.logger import logger
+from Config.logger import logger, log_sample, brief
+from .Base import sendPostReq
 import websockets
 import json
 import asyncio
+import random
 from typing import Optional, Dict, Any
 
 class WsClient:
-    def __init__(self, api: str, port: int, wxid: str):
+    def __init__(self, api: str, port: int, wxid: str, options: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            api: 协议服务地址
+            port: 协议服务端口
+            wxid: 机器人wxid
+            options: 连接参数（[IngestConfig]），包括重连退避、存活检测和断线补收
+        """
+        options = options or {}
         self.ws: Optional[websockets.WebSocketClientProtocol] = None
         self.is_connected: bool = False
-        self.reconnect_delay: int = 5  # 重连延迟时间（秒）
-        self._reconnect_task: Optional[asyncio.Task] = None
+        self.wxid = wxid
+        self.reconnect_delay: float = options.get('reconnect_base_delay', 1)  # 首次重连基础延迟（秒）
+        self.reconnect_max_delay: float = options.get('reconnect_max_delay', 60)  # 重连延迟上限（秒）
+        self.idle_timeout: float = options.get('idle_timeout', 120)  # 无消息多久后主动探活（秒）
+        self.ping_timeout: float = options.get('ping_timeout', 20)  # 探活等待pong的超时（秒）
+        self.catchup_on_reconnect: bool = options.get('catchup_on_reconnect', True)  # 重连后是否补收断线期间的消息
+        self.catchup_max_batches: int = options.get('catchup_max_batches', 10)  # 补收消息最多同步的批次
+        self._running: bool = False  # 读取循环是否在运行，保证同一时间只有一个读取者
+        self._closing: bool = False
+        self._ever_connected: bool = False
+        self._last_recv: float = 0.0
+        self._catchup_task: Optional[asyncio.Task] = None
         self.message_handlers = []
         self.ws_url = f'ws://{api}:{port}/ws/{wxid}'
         logger.debug(f"WebSocket URL: {self.ws_url}")
@@ -20,7 +40,8 @@ class WsClient:
         """
         try:
             data = json.loads(message)
-            logger.debug(f"ws收到消息: {data}")
+            if log_sample("ws"):
+                logger.debug("ws收到消息: {}", brief(message))
             # 调用所有注册的消息处理器
             for handler in self.message_handlers:
                 try:
@@ -38,47 +59,124 @@ class WsClient:
         """
         self.message_handlers.append(handler)
 
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        计算第 attempt 次重连的等待时间（指数退避 + 抖动）
+        一半固定、一半随机，既避免多个实例同时重连，又不会退化为立即重连
+        """
+        delay = min(self.reconnect_max_delay, self.reconnect_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
     async def connect(self) -> None:
         """
-        建立WebSocket连接
+        建立WebSocket连接，断线后按指数退避重连，直到调用 close()
+        同一时间只会有一个读取循环在运行
+        """
+        if self._running:
+            logger.warning("WebSocket 读取循环已在运行，忽略重复连接")
+            return
+
+        self._running = True
+        self._closing = False
+        attempt = 0
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._closing:
+                watchdog = None
+                try:
+                    # 启用内置的ping/pong机制，ping_interval=20表示每20秒发送一次ping
+                    self.ws = await websockets.connect(self.ws_url, ping_interval=20)
+                    self.is_connected = True
+                    self._last_recv = loop.time()
+                    attempt = 0
+                    logger.success("WS消息成功监听")
+
+                    if self._ever_connected and self.catchup_on_reconnect:
+                        self._start_catchup()
+                    self._ever_connected = True
+                    watchdog = asyncio.create_task(self._watchdog())
+
+                    # 开始消息接收循环
+                    async for message in self.ws:
+                        self._last_recv = loop.time()
+                        await self.handle_message(message)
+
+                    logger.warning("WebSocket连接已关闭")
+                except websockets.exceptions.ConnectionClosed:
+                    logger.warning("WebSocket连接已关闭")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"WebSocket连接错误: {e}", exc_info=True)
+                finally:
+                    self.is_connected = False
+                    if watchdog:
+                        watchdog.cancel()
+
+                if self._closing:
+                    break
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                logger.info(f"尝试在 {delay:.1f} 秒后重新连接（第 {attempt} 次）...")
+                await asyncio.sleep(delay)
+        finally:
+            self._running = False
+
+    async def _watchdog(self) -> None:
+        """
+        存活检测：长时间没有收到消息时主动ping，超时未收到pong则关闭连接触发重连
         """
-        while True:
+        loop = asyncio.get_running_loop()
+        interval = max(1.0, self.idle_timeout / 2)
+        while self.is_connected and self.ws:
+            await asyncio.sleep(interval)
+            if loop.time() - self._last_recv < self.idle_timeout:
+                continue
             try:
-                # 启用内置的ping/pong机制，ping_interval=20表示每20秒发送一次ping
-                self.ws = await websockets.connect(self.ws_url, ping_interval=20)
-                self.is_connected = True
-                logger.success("WS消息成功监听")
-                
-                # 开始消息接收循环
-                async for message in self.ws:
-                    await self.handle_message(message)
-                    
-            except websockets.exceptions.ConnectionClosed:
-                logger.warning("WebSocket连接已关闭")
-                self.is_connected = False
-                await self._reconnect()
+                pong_waiter = await self.ws.ping()
+                await asyncio.wait_for(pong_waiter, timeout=self.ping_timeout)
+                self._last_recv = loop.time()
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"WebSocket连接错误: {e}", exc_info=True)
-                self.is_connected = False
-                await self._reconnect()
+                logger.warning(f"WebSocket存活检测失败，主动断开重连: {e}")
+                await self.ws.close()
+                return
+
+    def _start_catchup(self) -> None:
+        """启动断线补收任务，已有补收任务在运行时不重复启动"""
+        if self._catchup_task is None or self._catchup_task.done():
+            self._catchup_task = asyncio.create_task(self._catch_up())
 
-    async def _reconnect(self) -> None:
+    async def _catch_up(self) -> None:
         """
-        重新连接
+        重连后通过 /Msg/Sync 分批补收断线期间的消息
+        补收的消息包装成与WS推送相同的格式，走同一条处理链路（去重窗口会过滤已处理过的消息）
         """
-        if not self.is_connected:
-            logger.info(f"尝试在 {self.reconnect_delay} 秒后重新连接...")
-            await asyncio.sleep(self.reconnect_delay)
-            if self._reconnect_task is None or self._reconnect_task.done():
-                self._reconnect_task = asyncio.create_task(self.connect())
+        total = 0
+        try:
+            for batch in range(self.catchup_max_batches):
+                result = await sendPostReq("Msg/Sync", {"Scene": 0, "Synckey": "", "Wxid": self.wxid})
+                messages = ((result or {}).get("Data") or {}).get("AddMsgs") or []
+                if not messages:
+                    break
+                for message in messages:
+                    await self.handle_message(json.dumps({"data": message}, ensure_ascii=False))
+                total += len(messages)
+            logger.info(f"断线补收完成，共同步 {total} 条消息")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"断线补收消息失败: {e}", exc_info=True)
 
     async def close(self) -> None:
         """
         关闭连接
         """
+        self._closing = True
         self.is_connected = False
-        if self._reconnect_task:
-            self._reconnect_task.cancel()
+        if self._catchup_task:
+            self._catchup_task.cancel()
         if self.ws:
             await self.ws.close()
             logger.info("WebSocket连接已关闭")
@@ -88,7 +186,7 @@ if __name__ == "__main__":
     async def main():
         client = WsClient('DPBotApi', DPBotPort, selfWxid)
         await client.connect()
-        
+
         try:
             # 保持连接运行
             await asyncio.Future()  # 永久等待
@@ -97,9 +195,3 @@ if __name__ == "__main__":
             await client.close()
 
     asyncio.run(main())
-
-
-
-
-
-
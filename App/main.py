@@ -61,6 +61,8 @@ async def shutdown(signal=None):
         await cleanup()
 
         logger.info("程序关闭完成")
+        # 等待后台日志队列写完
+        await logger.complete()
         
         # 4. 设置关闭事件
         if _shutdown_event: